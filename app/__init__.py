@@ -83,3 +83,24 @@ def create_app(config_path=None, run_mode="dev", **kwargs):
 
     app.logger.debug("ISPyB server started")
     return app
+
+
+def create_asgi_app(config_path=None, run_mode="dev", **kwargs):
+    """
+    Entry point for ASGI servers (for example uvicorn --factory).
+
+    Requests are handled by the Flask application in a pool of ASGI_THREADS
+    threads, so idle client connections do not occupy a worker. Services can
+    define get_asgi_prefetchers(app) returning coroutine functions that run
+    outbound calls of requests on the event loop.
+    """
+    from app.utils.asgi import WsgiToAsgi
+
+    app = create_app(config_path, run_mode, **kwargs)
+    prefetchers = []
+    service_module = importlib.import_module(app.config["SERVICE_NAME"])
+    if hasattr(service_module, "get_asgi_prefetchers"):
+        prefetchers = service_module.get_asgi_prefetchers(app)
+    return WsgiToAsgi(
+        app, max_workers=app.config.get("ASGI_THREADS", 32), prefetchers=prefetchers
+    )
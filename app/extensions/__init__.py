@@ -30,13 +30,19 @@ logging = Logging()
 
 from . import api
 from .auth import auth_provider
+from .jobs import job_queue
 from .user_office_link import user_office_link
 from .flask_sqlalchemy import SQLAlchemy
+from .instrumentation import Instrumentation
+from .compression import Compression
 
 db = SQLAlchemy()
 db.ENUM = ENUM
 db.LONGBLOB = LONGBLOB
 
+instrumentation = Instrumentation()
+compression = Compression()
+
 
 def init_app(app):
     """Initializes app extensions
@@ -44,5 +50,16 @@ def init_app(app):
     Args:
         app (flask app): Flask application
     """
-    for extension in (api, auth_provider, logging, db, user_office_link):
+    for extension in (
+        api,
+        auth_provider,
+        logging,
+        db,
+        instrumentation,
+        compression,
+        job_queue,
+        user_office_link,
+    ):
         extension.init_app(app)
+
+    instrumentation.add_metric_provider(db.get_pool_metric_lines)
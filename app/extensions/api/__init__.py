@@ -27,6 +27,7 @@ from copy import deepcopy
 from .api import Api
 from .namespace import Namespace
 from .http_exceptions import abort
+from .representations import get_json_serializer, output_json
 
 
 api_v1 = Api(
@@ -46,3 +47,8 @@ def init_app(app, **kwargs):
     """
     # Prevent config variable modification with runtime changes
     api_v1.authorizations = deepcopy(app.config["AUTHORIZATIONS"])
+
+    app.extensions["json_serializer"] = get_json_serializer(
+        app.config.get("JSON_SERIALIZER", "json")
+    )
+    api_v1.representations["application/json"] = output_json
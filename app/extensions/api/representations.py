@@ -0,0 +1,112 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import decimal
+import datetime
+import importlib
+import logging
+
+from flask import current_app, make_response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+log = logging.getLogger(__name__)
+
+
+def json_default(value):
+    """
+    Serializes values not supported by the JSON encoder.
+
+    Args:
+        value: value to serialize
+
+    Raises:
+        TypeError: if the value can not be serialized
+
+    Returns:
+        JSON serializable value
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    raise TypeError("Object of type %s is not JSON serializable" % type(value))
+
+
+def dumps_json(data, indent=False):
+    """Serializes data with the standard json module."""
+    return json.dumps(data, default=json_default, indent=4 if indent else None)
+
+
+def dumps_orjson(data, indent=False):
+    """Serializes data with orjson (datetime is handled natively)."""
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=json_default, option=option)
+
+
+JSON_SERIALIZERS = {"json": dumps_json, "orjson": dumps_orjson}
+
+
+def get_json_serializer(name):
+    """
+    Returns JSON serializer function.
+
+    Args:
+        name (str): json, orjson or dotted path of a function accepting data
+            and indent arguments
+
+    Returns:
+        function: serializer
+    """
+    if name == "orjson" and orjson is None:
+        log.warning("orjson is not installed, using json serializer")
+        name = "json"
+    if name in JSON_SERIALIZERS:
+        return JSON_SERIALIZERS[name]
+    module_name, function_name = name.rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def output_json(data, code, headers=None):
+    """
+    Makes a Flask response with a JSON encoded body.
+
+    Serializer is defined by JSON_SERIALIZER.
+    """
+    serializer = current_app.extensions["json_serializer"]
+    dumped = serializer(data, indent=current_app.debug)
+    if isinstance(dumped, str):
+        dumped = dumped.encode("UTF-8")
+
+    response = make_response(dumped + b"\n", code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
@@ -0,0 +1,105 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import abc
+
+
+class AbstractTokenStore(object):
+
+    """
+    Abstract token store class.
+
+    Base class for token stores. A token info is a dict:
+    {"username": str, "token": str, "roles": list, "is_admin": bool,
+    "expires": float}
+    """
+
+    __metaclass__ = abc.ABCMeta
+
+    def init_app(self, app):
+        """Initializes token store.
+
+        Args:
+            app (flask app): Flask app
+        """
+        return
+
+    @abc.abstractmethod
+    def add(self, token, username, roles, expires=None, index_username=True):
+        """Stores token.
+
+        Args:
+            token (str): token
+            username (str): username
+            roles (list): list of roles associated to the user
+            expires (float, optional): expiration unix timestamp. Token never
+                expires if None
+            index_username (bool, optional): if True then the token is returned
+                by get_by_username
+        """
+
+    @abc.abstractmethod
+    def get(self, token):
+        """Returns token info or None if the token is unknown or expired.
+
+        Args:
+            token (str): token
+        """
+
+    @abc.abstractmethod
+    def get_by_username(self, username):
+        """Returns info of the last valid token issued to the user or None.
+
+        Args:
+            username (str): username
+        """
+
+    @abc.abstractmethod
+    def remove(self, token):
+        """Removes token from the store.
+
+        Args:
+            token (str): token
+        """
+
+    @staticmethod
+    def create_token_info(token, username, roles, expires=None):
+        """Returns token info dict.
+
+        Args:
+            token (str): token
+            username (str): username
+            roles (list): list of roles associated to the user
+            expires (float, optional): expiration unix timestamp
+
+        Returns:
+            dict: token info
+        """
+        return {
+            "username": username,
+            "token": token,
+            "roles": list(roles),
+            "is_admin": any(role in ("manager", "admin") for role in roles),
+            "expires": expires,
+        }
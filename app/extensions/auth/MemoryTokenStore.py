@@ -0,0 +1,131 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import time
+import heapq
+import threading
+
+from app.extensions.auth.AbstractTokenStore import AbstractTokenStore
+
+
+class MemoryTokenStore(AbstractTokenStore):
+    """
+    Stores issued tokens in the process memory indexed by token and by
+    username. Tokens are not shared between server workers.
+
+    Expired tokens are evicted when they are accessed and when new tokens
+    are added. Expiration times are kept in a heap so that the eviction does
+    not scan all stored tokens.
+    """
+
+    def __init__(self):
+        AbstractTokenStore.__init__(self)
+
+        self._tokens = {}
+        self._user_tokens = {}
+        self._expirations = []
+        self._lock = threading.Lock()
+
+    def add(self, token, username, roles, expires=None, index_username=True):
+        """
+        Stores token.
+
+        Args:
+            token (str): token
+            username (str): username
+            roles (list): list of roles associated to the user
+            expires (float, optional): expiration unix timestamp. Token never
+                expires if None
+            index_username (bool, optional): if True then the token is returned
+                by get_by_username
+        """
+        token_info = self.create_token_info(token, username, roles, expires)
+        with self._lock:
+            self._evict_expired()
+            self._tokens[token] = token_info
+            if expires is not None:
+                heapq.heappush(self._expirations, (expires, token))
+            if index_username:
+                self._user_tokens[username] = token
+
+    def get(self, token):
+        """
+        Returns token info.
+
+        Args:
+            token (str): token
+
+        Returns:
+            dict: {"username": str, "token": str, "roles": list,
+                   "is_admin": bool, "expires": float} or None
+        """
+        with self._lock:
+            token_info = self._tokens.get(token)
+            if token_info is not None and self._is_expired(token_info):
+                self._remove(token_info)
+                token_info = None
+        return token_info
+
+    def get_by_username(self, username):
+        """
+        Returns info of the last valid token issued to the user.
+
+        Args:
+            username (str): username
+
+        Returns:
+            dict: token info or None
+        """
+        with self._lock:
+            token = self._user_tokens.get(username)
+        if token is None:
+            return None
+        return self.get(token)
+
+    def remove(self, token):
+        """Removes token from the store."""
+        with self._lock:
+            token_info = self._tokens.get(token)
+            if token_info is not None:
+                self._remove(token_info)
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _is_expired(self, token_info, now=None):
+        expires = token_info["expires"]
+        return expires is not None and expires <= (now or time.time())
+
+    def _remove(self, token_info):
+        self._tokens.pop(token_info["token"], None)
+        if self._user_tokens.get(token_info["username"]) == token_info["token"]:
+            del self._user_tokens[token_info["username"]]
+
+    def _evict_expired(self):
+        now = time.time()
+        while self._expirations and self._expirations[0][0] <= now:
+            _, token = heapq.heappop(self._expirations)
+            token_info = self._tokens.get(token)
+            if token_info is not None and self._is_expired(token_info, now):
+                self._remove(token_info)
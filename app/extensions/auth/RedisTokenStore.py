@@ -0,0 +1,100 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import time
+
+import redis
+
+from app.extensions.auth.AbstractTokenStore import AbstractTokenStore
+
+
+class RedisTokenStore(AbstractTokenStore):
+    """
+    Stores issued tokens in Redis (or a server implementing the Redis
+    protocol) so that tokens are shared between workers and hosts.
+
+    TOKEN_STORE_URI defines the Redis url (for example redis://localhost:6379/0).
+    Keys expire together with the tokens, so no explicit eviction is needed.
+    """
+
+    key_prefix = "ispyb:"
+
+    def __init__(self, client=None):
+        AbstractTokenStore.__init__(self)
+
+        self.client = client
+
+    def init_app(self, app):
+        """
+        Creates Redis client.
+
+        Args:
+            app (flask app): current flask app
+        """
+        if self.client is None:
+            assert app.config.get(
+                "TOKEN_STORE_URI"
+            ), "TOKEN_STORE_URI must be configured!"
+            self.client = redis.Redis.from_url(app.config["TOKEN_STORE_URI"])
+
+    def add(self, token, username, roles, expires=None, index_username=True):
+        token_info = self.create_token_info(token, username, roles, expires)
+        ttl = None
+        if expires is not None:
+            ttl = int(expires - time.time())
+            if ttl <= 0:
+                return
+
+        pipeline = self.client.pipeline()
+        pipeline.set(self._token_key(token), json.dumps(token_info), ex=ttl)
+        if index_username:
+            pipeline.set(self._username_key(username), token, ex=ttl)
+        pipeline.execute()
+
+    def get(self, token):
+        value = self.client.get(self._token_key(token))
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def get_by_username(self, username):
+        token = self.client.get(self._username_key(username))
+        if token is None:
+            return None
+        if isinstance(token, bytes):
+            token = token.decode("UTF-8")
+        return self.get(token)
+
+    def remove(self, token):
+        token_info = self.get(token)
+        self.client.delete(self._token_key(token))
+        if token_info and self.get_by_username(token_info["username"]) == token_info:
+            self.client.delete(self._username_key(token_info["username"]))
+
+    def _token_key(self, token):
+        return "%stoken:%s" % (self.key_prefix, token)
+
+    def _username_key(self, username):
+        return "%susername:%s" % (self.key_prefix, username)
@@ -0,0 +1,135 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import time
+import json
+import sqlite3
+import threading
+
+from app.extensions.auth.AbstractTokenStore import AbstractTokenStore
+
+
+class SQLiteTokenStore(AbstractTokenStore):
+    """
+    Stores issued tokens in a SQLite file shared by all server workers
+    running on the same host.
+
+    TOKEN_STORE_URI defines the path of the SQLite file. Tokens are looked up
+    by the primary key and by an index on the username. Expired tokens are
+    deleted when new tokens are added.
+    """
+
+    def __init__(self, path=None):
+        AbstractTokenStore.__init__(self)
+
+        self.path = path
+        self._local = threading.local()
+
+    def init_app(self, app):
+        """
+        Creates token table if it does not exist.
+
+        Args:
+            app (flask app): current flask app
+        """
+        self.path = app.config.get("TOKEN_STORE_URI") or self.path
+        assert self.path, "TOKEN_STORE_URI must be configured!"
+
+        connection = self._get_connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS token ("
+                "token TEXT PRIMARY KEY, "
+                "username TEXT NOT NULL, "
+                "roles TEXT NOT NULL, "
+                "expires REAL, "
+                "indexed INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS token_username ON token (username)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS token_expires ON token (expires)"
+            )
+
+    def add(self, token, username, roles, expires=None, index_username=True):
+        connection = self._get_connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM token WHERE expires <= ?", (time.time(),)
+            )
+            if index_username:
+                connection.execute(
+                    "UPDATE token SET indexed = 0 WHERE username = ?", (username,)
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO token "
+                "(token, username, roles, expires, indexed) VALUES (?, ?, ?, ?, ?)",
+                (token, username, json.dumps(list(roles)), expires, index_username),
+            )
+
+    def get(self, token):
+        row = (
+            self._get_connection()
+            .execute(
+                "SELECT token, username, roles, expires FROM token WHERE token = ? "
+                "AND (expires IS NULL OR expires > ?)",
+                (token, time.time()),
+            )
+            .fetchone()
+        )
+        return self._to_token_info(row)
+
+    def get_by_username(self, username):
+        row = (
+            self._get_connection()
+            .execute(
+                "SELECT token, username, roles, expires FROM token "
+                "WHERE username = ? AND indexed = 1 "
+                "AND (expires IS NULL OR expires > ?)",
+                (username, time.time()),
+            )
+            .fetchone()
+        )
+        return self._to_token_info(row)
+
+    def remove(self, token):
+        connection = self._get_connection()
+        with connection:
+            connection.execute("DELETE FROM token WHERE token = ?", (token,))
+
+    def _get_connection(self):
+        # sqlite3 connections can not be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _to_token_info(self, row):
+        if row is None:
+            return None
+        token, username, roles, expires = row
+        return self.create_token_info(token, username, json.loads(roles), expires)
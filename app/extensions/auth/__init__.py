@@ -18,15 +18,20 @@ You should have received a copy of the GNU Lesser General Public License
 along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
 
+import time
 import logging
 import datetime
 import importlib
 from functools import wraps
 
 import jwt
-from flask import current_app, request
+from flask import current_app, g, has_request_context, request
 from flask_restx._http import HTTPStatus
 
+from app.utils.cache import TTLCache
+
+from app.extensions.auth.MemoryTokenStore import MemoryTokenStore
+
 
 __license__ = "LGPLv3+"
 
@@ -38,7 +43,9 @@ class AuthProvider:
     """Allows to authentificate users and create tokens."""
 
     def __init__(self):
-        self.tokens = []
+        self.tokens = MemoryTokenStore()
+        self.claims_cache = TTLCache(ttl=None)
+        self.authorization_rules = {}
         self.site_auth = None
 
     def init_app(self, app):
@@ -50,15 +57,48 @@ class AuthProvider:
 
         assert app.config["SECRET_KEY"], "SECRET_KEY must be configured!"
 
+        if app.config.get("TOKEN_STORE_MODULE"):
+            module_name = app.config["TOKEN_STORE_MODULE"]
+            class_name = app.config["TOKEN_STORE_CLASS"]
+            cls = getattr(importlib.import_module(module_name), class_name)
+            self.tokens = cls()
+        self.tokens.init_app(app)
+
+        self.claims_cache.max_size = app.config.get("AUTH_CLAIMS_CACHE_SIZE", 1024)
+        self.authorization_rules = self.compile_authorization_rules(
+            app.config.get("AUTHORIZATION_RULES") or {}
+        )
+
         if app.config.get("MASTER_TOKEN"):
-            self.tokens.append(
-                {
-                    "username": "admin",
-                    "token": app.config.get("MASTER_TOKEN"),
-                    "roles": ["admin"],
-                }
+            self.tokens.add(
+                app.config.get("MASTER_TOKEN"),
+                "admin",
+                ["admin"],
+                index_username=False,
             )
 
+    @staticmethod
+    def compile_authorization_rules(authorization_rules):
+        """
+        Compiles AUTHORIZATION_RULES into a table of allowed roles.
+
+        Methods available for all user groups ("all" or empty list of roles)
+        are not included in the table.
+
+        Args:
+            authorization_rules (dict): {endpoint: {method: [roles]}}
+
+        Returns:
+            dict: {(endpoint, method): frozenset of roles}
+        """
+        compiled_rules = {}
+        for endpoint, methods in authorization_rules.items():
+            for method, roles in methods.items():
+                roles = frozenset(roles or ())
+                if roles and "all" not in roles:
+                    compiled_rules[(endpoint, method.lower())] = roles
+        return compiled_rules
+
     def get_roles(self, username, password):
         """
         Returns roles associated to user. Basically this is the main
@@ -88,21 +128,56 @@ class AuthProvider:
         if current_app.config.get("MASTER_TOKEN") == token:
             roles.append("admin")
         else:
-            for user_token in self.tokens:
-                if user_token["token"] == token:
-                    roles = user_token["roles"]
+            token_info = self.tokens.get(token)
+            if token_info:
+                roles = token_info["roles"]
         return roles
 
+    def decode_token(self, token):
+        """
+        Returns decoded token claims.
+
+        Decoded claims are cached until the token expires.
+
+        Args:
+            token (str): jwt token
+
+        Raises:
+            jwt.ExpiredSignatureError: if the token is expired
+            jwt.InvalidTokenError: if the token is not valid
+
+        Returns:
+            dict: token claims
+        """
+        claims = self.claims_cache.get(token)
+        if claims is None:
+            claims = jwt.decode(
+                token,
+                current_app.config["SECRET_KEY"],
+                algorithms=current_app.config["JWT_CODING_ALGORITHM"],
+            )
+            ttl = None
+            if "exp" in claims:
+                ttl = claims["exp"] - time.time()
+            self.claims_cache.set(token, claims, ttl=ttl)
+        return claims
+
     def get_user_info_by_auth_header(self, auth_header):
         """
         Returns dict with user info based on auth header.
 
+        User info is resolved once per request and stored in flask.g.
+
         Args:
             auth_header ([type]): [description]
 
         Returns:
             dict: {"username": "", "roles": [], "is_admin": bool}
         """
+        if has_request_context() and "user_info" in g:
+            if g.get("auth_header") == auth_header:
+                return g.user_info
+
         user_info = {}
         token = None
 
@@ -112,16 +187,16 @@ class AuthProvider:
         except BaseException as ex:
             print("Unable to extract token from Authorization header (%s)" % str(ex))
 
-        for token_info in self.tokens:
-            if token_info["token"] == token:
-                user_info = token_info
-        if user_info.get("roles"):
-            user_info["is_admin"] = any(
-                x in ["manager", "admin"] for x in user_info.get("roles")
-            )
+        token_info = self.tokens.get(token)
+        if token_info:
+            user_info = dict(token_info)
         else:
             user_info["is_admin"] = False
 
+        if has_request_context():
+            g.auth_header = auth_header
+            g.user_info = user_info
+
         return user_info
 
     def generate_token(self, username, roles):
@@ -135,31 +210,31 @@ class AuthProvider:
         Returns:
             str: token
         """
-        if username in self.tokens:
-            # Check if the previously generated token is still valid
-            try:
-                jwt.decode(
-                    self.tokens[username]["token"],
-                    current_app.config["SECRET_KEY"],
-                    algorithms=current_app.config["JWT_CODING_ALGORITHM"],
-                )
-                return self.tokens[username]["token"]
-            except jwt.ExpiredSignatureError:
-                pass
+        token_info = self.tokens.get_by_username(username)
+        if token_info and list(token_info["roles"]) == list(roles):
+            # Previously generated token is still valid
+            return token_info["token"]
 
+        expires = datetime.datetime.utcnow() + datetime.timedelta(
+            minutes=current_app.config["TOKEN_EXP_TIME"]
+        )
         token = jwt.encode(
             {
                 "sub": username,
                 "iat": datetime.datetime.utcnow(),
-                "exp": datetime.datetime.utcnow()
-                + datetime.timedelta(minutes=current_app.config["TOKEN_EXP_TIME"]),
+                "exp": expires,
             },
             current_app.config["SECRET_KEY"],
             algorithm=current_app.config["JWT_CODING_ALGORITHM"],
         )
         dec_token = token.decode("UTF-8")
 
-        self.tokens.append({"username": username, "token": dec_token, "roles": roles})
+        self.tokens.add(
+            dec_token,
+            username,
+            roles,
+            expires=expires.replace(tzinfo=datetime.timezone.utc).timestamp(),
+        )
 
         return dec_token
 
@@ -219,11 +294,7 @@ def token_required(func):
                 current_app.logger.info("Master token validated")
                 return func(*args, **kwargs)
         try:
-            jwt.decode(
-                token,
-                current_app.config["SECRET_KEY"],
-                algorithms=current_app.config["JWT_CODING_ALGORITHM"],
-            )
+            auth_provider.decode_token(token)
         except jwt.ExpiredSignatureError:
             current_app.logger.info("Token expired. Please log in again")
             print("Token expired. Please log in again")
@@ -259,6 +330,8 @@ def authorization_required(func):
     and method POST is accessible just for admin group.
     If an endpoint is not defined in the AUTHORIZATION_RULES then it is available
     for all user groups.
+    Rules are compiled by AuthProvider.init_app into frozen role sets, so the
+    check is a set intersection.
 
     Args:
         func (function): function
@@ -276,23 +349,25 @@ def authorization_required(func):
             [type]: [description]
         """
 
+        roles = auth_provider.authorization_rules.get((self.endpoint, func.__name__))
+        if roles is None:
+            return func(self, *args, **kwargs)
+
         user_info = auth_provider.get_user_info_by_auth_header(
             request.headers.get("Authorization")
         )
 
-        methods = current_app.config.get("AUTHORIZATION_RULES").get(self.endpoint, {})
-        roles = methods.get(func.__name__, [])
-
-        print("User roles: %s" % str(user_info.get("roles")))
-        print("Endpoint [%s] %s roles: %s" % (func.__name__, self.endpoint, roles))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "Endpoint [%s] %s roles: %s, user roles: %s"
+                % (func.__name__, self.endpoint, sorted(roles), user_info.get("roles"))
+            )
 
-        if not roles or "all" in roles or any(role in list(roles) for role in list(user_info.get("roles"))):
-            return func(self, *args, **kwargs)
-        else:
+        if roles.isdisjoint(user_info.get("roles") or ()):
             msg = "User %s (roles assigned: %s) has no appropriate role (%s) " % (
                 user_info.get("username"),
                 str(user_info.get("roles")),
-                str(roles),
+                str(sorted(roles)),
             )
             msg += " to execute method."
             return {"message": msg}, HTTPStatus.UNAUTHORIZED
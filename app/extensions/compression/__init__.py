@@ -0,0 +1,121 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Compression(object):
+    """
+    Compresses responses with brotli or gzip based on the Accept-Encoding
+    request header.
+
+    Responses smaller than COMPRESSION_MIN_SIZE bytes, streamed responses
+    and already encoded responses are not compressed.
+    """
+
+    def __init__(self, app=None):
+        self.min_size = 1024
+        self.level = 6
+        self.algorithms = ()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Registers after request handler.
+
+        Args:
+            app (flask app): Flask application
+        """
+        if not app.config.get("COMPRESSION_ENABLED", True):
+            return
+
+        self.min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+        self.level = app.config.get("COMPRESSION_LEVEL", 6)
+        self.algorithms = tuple(
+            algorithm
+            for algorithm in app.config.get("COMPRESSION_ALGORITHMS", ("br", "gzip"))
+            if algorithm == "gzip" or (algorithm == "br" and brotli is not None)
+        )
+        app.after_request(self.compress_response)
+
+    def get_encoding(self):
+        """
+        Returns preferred encoding supported by the client.
+
+        Returns:
+            str: br, gzip or None
+        """
+        accept_encoding = request.accept_encodings
+        for algorithm in self.algorithms:
+            if accept_encoding[algorithm]:
+                return algorithm
+        return None
+
+    def compress_response(self, response):
+        """
+        Compresses response body.
+
+        Args:
+            response ([type]): flask response
+
+        Returns:
+            [type]: flask response
+        """
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code >= 300
+            or "Content-Encoding" in response.headers
+            or response.content_length is None
+            or response.content_length < self.min_size
+        ):
+            return response
+
+        encoding = self.get_encoding()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if encoding == "br":
+            data = brotli.compress(data, quality=min(self.level, 11))
+        else:
+            data = gzip.compress(data, compresslevel=self.level)
+
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            # Compressed representation is not byte identical to the original
+            response.set_etag(etag, weak=True)
+        return response
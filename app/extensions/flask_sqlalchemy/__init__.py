@@ -24,16 +24,36 @@ __license__ = "LGPLv3+"
 
 import sys
 import sqlite3
+import hashlib
+import logging
 
 from flask_restx import abort
 from flask_restx._http import HTTPStatus
 
 
-from flask import current_app
+from flask import current_app, request
 import sqlalchemy
 from flask_sqlalchemy import SQLAlchemy as BaseSQLAlchemy
+from flask_restx_patched import set_validators
 
 from app.utils import create_response_item
+from app.utils.cache import TTLCache
+from app.extensions.instrumentation import record_timing
+
+from . import (
+    bulk_insert,
+    counting,
+    export,
+    filtering,
+    multi_get,
+    pagination,
+    pool,
+    projection,
+    routing,
+)
+
+
+log = logging.getLogger(__name__)
 
 
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -102,6 +122,12 @@ class SQLAlchemy(BaseSQLAlchemy):
         )
         """
         super().__init__(*args, **kwargs)
+        self.count_cache = TTLCache()
+        self.recent_writers = TTLCache(max_size=10000)
+        self.replica_lag_cache = TTLCache()
+        # Called with (session, model, mappings) before bulk inserts are
+        # committed, as bulk inserts do not emit ORM events
+        self.bulk_insert_listeners = []
 
     def init_app(self, app):
         """
@@ -119,37 +145,164 @@ class SQLAlchemy(BaseSQLAlchemy):
         if database_uri.startswith("sqlite:"):
             self.event.listens_for(sqlalchemy.engine.Engine, "connect")(set_sqlite_pragma)
 
+        self.count_cache.ttl = app.config.get("PAGINATION_COUNT_CACHE_TTL", 60)
+        self.recent_writers.ttl = app.config.get("READ_YOUR_WRITES_WINDOW", 5)
+        self.replica_lag_cache.ttl = app.config.get(
+            "READ_REPLICA_LAG_CHECK_INTERVAL", 5
+        )
+
         app.extensions["migrate"] = AlembicDatabaseMigrationConfig(
             self, compare_type=True
         )
 
-    def get_db_items(self, sql_alchemy_model, dict_schema, ma_schema, query_params):
+    def create_session(self, options):
+        """
+        Creates session factory routing GET requests to the read replica.
+
+        Args:
+            options (dict): session options
+
+        Returns:
+            [type]: session factory
+        """
+        session_factory = sqlalchemy.orm.sessionmaker(
+            class_=routing.RoutingSession, db=self, **options
+        )
+        sqlalchemy.event.listen(
+            session_factory, "after_flush", routing.mark_client_write
+        )
+        return session_factory
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        """
+        Adds create_engine options defined in the database config section.
+
+        Args:
+            app ([type]): flask app
+            sa_url ([type]): SQLAlchemy database url
+            options (dict): create_engine keyword arguments
+
+        Returns:
+            tuple: database url and create_engine keyword arguments
+        """
+        sa_url, options = super().apply_driver_hacks(app, sa_url, options)
+        options.update(
+            pool.get_engine_options(app.config.get("DATABASE"), sa_url.drivername)
+        )
+        return sa_url, options
+
+    def get_pool_metric_lines(self):
+        """
+        Returns connection pool metrics in the Prometheus text format.
+
+        Returns:
+            list: list of lines
+        """
+        return pool.get_pool_metric_lines(self.engine)
+
+    def get_db_items(
+        self, sql_alchemy_model, dict_schema, ma_schema, query_params, options=None
+    ):
         """
         Returns resource based on the passed models and query parameter
 
+        Keyset (seek) pagination is used if the "after" query parameter is
+        present. Empty "after" returns the first page and each full page
+        contains "next_cursor" that should be passed as "after" to get the
+        next page. In this mode "offset" is ignored.
+
+        The "count" query parameter defines how the total number of filtered
+        items is computed: exact, estimate (MySQL statistics), cached (exact
+        count cached for PAGINATION_COUNT_CACHE_TTL seconds) or none.
+        Default is defined by PAGINATION_COUNT_MODE.
+
+        The "fields" query parameter (comma separated field names) restricts
+        columns loaded from the db and fields returned in rows.
+
+        Besides equality filters (field=value) filters with operators
+        (field__gte=value) are supported: eq, ne, gt, gte, lt, lte, in (comma
+        separated values) and startswith. Values are converted based on
+        dict_schema types. If FILTER_REQUIRE_INDEXED_COLUMNS is True (or lists
+        the model name) then filtering by not indexed columns is refused.
+
+        The "order_by" query parameter (field name, "-" prefix for descending
+        order) sorts items by one of the keys returned by get_sort_keys.
+        Primary key is used as a tie breaker, so sorting can be combined
+        with keyset pagination. NULL values are sorted first in ascending
+        order. Cursors that can not be decoded or were issued for another
+        ordering are rejected with 400.
+
+        The "ids" query parameter (comma separated primary keys) returns
+        items keyed by id instead of a page (see get_db_items_by_ids). Other
+        filters are still applied.
+
+        If the Accept header requests application/x-ndjson or text/csv then
+        items are streamed row by row in a chunked response. In this mode
+        the total is not computed and items are limited only if "limit" is
+        explicitly passed.
+
         Args:
             sql_alchemy_model ([type]): SQLAlchemy ORM model
             dict_schema ([type]): dict with flask fields
             ma_schema ([type]): marshmallows schema
             query_params (dict): query parameters
+            options (list, optional): SQLAlchemy loader options (for example
+                joinedload of relationships dumped by nested schemas)
 
         Returns:
-            dict: {"data": {"total": int, "rows": list},
+            dict: {"data": {"total": int, "rows": list, "next_cursor": str},
                     "message" : str,
                     "error": str
                     }
+            or streamed Response if export is requested
         """
+        export_mimetype = export.get_export_mimetype(request.accept_mimetypes)
         offset = 0
         limit = current_app.config.get("PAGINATION_ITEMS_LIMIT")
         msg = None
+        next_cursor = None
 
         if "offset" in query_params.keys():
             offset = query_params.get("offset")
         if "limit" in query_params.keys():
             limit = query_params.get("limit")
+        elif export_mimetype:
+            limit = None
+        try:
+            limit = None if limit is None else int(limit)
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Invalid limit value (%s)" % str(ex))
+
+        count_mode = query_params.get(
+            "count",
+            current_app.config.get("PAGINATION_COUNT_MODE", counting.COUNT_EXACT),
+        )
+        if count_mode not in counting.COUNT_MODES:
+            abort(
+                HTTPStatus.NOT_ACCEPTABLE,
+                "Invalid count value %s (allowed values: %s)"
+                % (count_mode, ", ".join(counting.COUNT_MODES)),
+            )
+
+        try:
+            fields = projection.parse_fields(query_params.get("fields"), ma_schema)
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, str(ex))
+
+        try:
+            sort_attribute, descending = pagination.parse_order_by(
+                query_params.get("order_by"),
+                dict_schema,
+                self.get_sort_keys(sql_alchemy_model),
+            )
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, str(ex))
+        keyset_columns = pagination.get_keyset_columns(
+            sql_alchemy_model, sort_attribute, descending
+        )
 
         query = sql_alchemy_model.query
-        total = query.count()
+        total = None
 
         # Filter items based on schema keys
         schema_keys = {}
@@ -163,38 +316,257 @@ class SQLAlchemy(BaseSQLAlchemy):
             except sqlalchemy.exc.InvalidRequestError as ex:
                 print(ex)
                 msg = "Unable to filter items based on query items (%s)" % str(ex)
+                schema_keys = {}
 
-        query = query.limit(limit).offset(offset)
-        items = ma_schema.dump(query, many=True)[0]
-
-        response_dict = create_response_item(msg, total, items)
+        try:
+            filters = filtering.parse_filters(query_params, dict_schema)
+            if self._require_indexed_filters(sql_alchemy_model):
+                filtering.check_indexed(
+                    sql_alchemy_model,
+                    list(schema_keys) + [name for name, _, _ in filters],
+                )
+            query = filtering.apply_filters(query, sql_alchemy_model, filters)
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, str(ex))
+        filter_dict = dict(schema_keys)
+        for name, operator, value in filters:
+            filter_dict[name + filtering.OPERATOR_SEPARATOR + operator] = value
+
+        if "ids" in query_params.keys():
+            if options:
+                query = query.options(*options)
+            return self.get_db_items_by_ids(
+                sql_alchemy_model, ma_schema, query_params.get("ids"), fields, query
+            )
+
+        if export_mimetype:
+            count_mode = counting.COUNT_NONE
+
+        if count_mode == counting.COUNT_EXACT:
+            total = counting.get_exact_count(query)
+        elif count_mode == counting.COUNT_ESTIMATE:
+            total = counting.get_estimated_count(
+                self.session, query, sql_alchemy_model, filter_dict
+            )
+        elif count_mode == counting.COUNT_CACHED:
+            total = counting.get_cached_count(
+                self.count_cache, query, sql_alchemy_model, filter_dict
+            )
+
+        if options:
+            query = query.options(*options)
+
+        if "after" in query_params.keys():
+            query = projection.apply_projection(
+                query,
+                sql_alchemy_model,
+                fields,
+                [name for name, _, _ in keyset_columns],
+            )
+            cursor_values = None
+            if query_params.get("after"):
+                try:
+                    cursor_values = pagination.decode_cursor(
+                        query_params.get("after"), keyset_columns
+                    )
+                except ValueError as ex:
+                    abort(HTTPStatus.BAD_REQUEST, str(ex))
+            query = pagination.apply_keyset(query, keyset_columns, cursor_values)
+            if export_mimetype:
+                return export.create_stream_response(
+                    query.limit(limit),
+                    projection.get_projected_schema(ma_schema, fields),
+                    export_mimetype,
+                    current_app.config.get("EXPORT_BATCH_SIZE", 1000),
+                )
+            db_items = query.limit(limit).all()
+            next_cursor = pagination.get_next_cursor(db_items, keyset_columns, limit)
+        else:
+            query = projection.apply_projection(query, sql_alchemy_model, fields)
+            if sort_attribute:
+                query = pagination.apply_keyset(query, keyset_columns)
+            if export_mimetype:
+                return export.create_stream_response(
+                    query.limit(limit).offset(offset),
+                    projection.get_projected_schema(ma_schema, fields),
+                    export_mimetype,
+                    current_app.config.get("EXPORT_BATCH_SIZE", 1000),
+                )
+            db_items = query.limit(limit).offset(offset).all()
+
+        with record_timing("serialize"):
+            items = projection.get_projected_schema(ma_schema, fields).dump(
+                db_items, many=True
+            )[0]
+
+        response_dict = create_response_item(msg, total, items, next_cursor)
 
         return response_dict
 
-    def get_db_item_by_params(self, sql_alchemy_model, ma_schema, item_id_dict):
+    def get_sort_keys(self, sql_alchemy_model):
+        """
+        Returns attribute names that can be used in order_by.
+
+        Defined per model name in SORT_KEYS. Indexed columns are used if the
+        model is not defined.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+        Returns:
+            frozenset: attribute names
+        """
+        sort_keys = (current_app.config.get("SORT_KEYS") or {}).get(
+            sql_alchemy_model.__name__
+        )
+        if sort_keys is None:
+            return filtering.get_indexed_columns(sql_alchemy_model)
+        return frozenset(sort_keys)
+
+    def _require_indexed_filters(self, sql_alchemy_model):
+        require_indexed = current_app.config.get("FILTER_REQUIRE_INDEXED_COLUMNS")
+        if isinstance(require_indexed, (list, tuple)):
+            return sql_alchemy_model.__name__ in require_indexed
+        return bool(require_indexed)
+
+    def get_db_item_by_params(
+        self,
+        sql_alchemy_model,
+        ma_schema,
+        item_id_dict,
+        fields=None,
+        options=None,
+        conditional=False,
+    ):
         """
         Returns data base item by its Id.
 
         Args:
             item_id (int):
+            fields (str, optional): comma separated list of returned fields
+            options (list, optional): SQLAlchemy loader options
+            conditional (bool, optional): set ETag and Last-Modified of the
+                response from the item. Only for callers returning the item
+                as the whole response body. Defaults to False.
 
         Returns:
             dict: info dict
         """
-        db_item = sql_alchemy_model.query.filter_by(**item_id_dict).first_or_404(
+        try:
+            fields = projection.parse_fields(fields, ma_schema)
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, str(ex))
+
+        query = projection.apply_projection(
+            sql_alchemy_model.query, sql_alchemy_model, fields
+        )
+        if options:
+            query = query.options(*options)
+        db_item = query.filter_by(**item_id_dict).first_or_404(
             description="There is no data with item id %s" % str(item_id_dict)
         )
-        db_item_json = ma_schema.dump(db_item)[0]
+        if conditional and not options:
+            # Returns 304 before serialization if the item has not changed
+            set_validators(*self.get_item_validators(db_item, fields))
+        with record_timing("serialize"):
+            db_item_json = projection.get_projected_schema(ma_schema, fields).dump(
+                db_item
+            )[0]
 
         return db_item_json
 
-    def add_db_item(self, sql_alchemy_model, ma_schema, data):
+    def get_db_items_by_ids(
+        self, sql_alchemy_model, ma_schema, ids, fields=None, query=None
+    ):
+        """
+        Returns db items with given primary keys.
+
+        Items are loaded with IN queries of at most MULTI_GET_CHUNK_SIZE ids,
+        at most MULTI_GET_MAX_IDS ids can be requested.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            ma_schema ([type]): marshmallows schema
+            ids (str or list): comma separated ids or list of ids
+            fields (str or tuple, optional): returned fields
+            query ([type], optional): filtered SQLAlchemy query
+
+        Returns:
+            dict: {"data": {"total": int, "rows": dict of items by id,
+                    "next_cursor": None, "not_found": list of ids},
+                    "message" : str}
+        """
+        try:
+            fields = projection.parse_fields(fields, ma_schema)
+            id_name, id_attribute = multi_get.get_id_attribute(sql_alchemy_model)
+            ids = multi_get.parse_ids(
+                ids, id_attribute, current_app.config.get("MULTI_GET_MAX_IDS", 1000)
+            )
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, str(ex))
+
+        if query is None:
+            query = sql_alchemy_model.query
+        query = projection.apply_projection(query, sql_alchemy_model, fields)
+        db_items, not_found = multi_get.get_items_by_ids(
+            query,
+            id_name,
+            id_attribute,
+            ids,
+            current_app.config.get("MULTI_GET_CHUNK_SIZE", 500),
+        )
+
+        schema = projection.get_projected_schema(ma_schema, fields)
+        with record_timing("serialize"):
+            rows = {
+                item_id: schema.dump(db_items[item_id])[0]
+                for item_id in ids
+                if item_id in db_items
+            }
+        response_dict = create_response_item(None, len(rows), rows)
+        response_dict["data"]["not_found"] = not_found
+        return response_dict
+
+    def get_item_validators(self, db_item, fields=None):
+        """
+        Returns ETag and last modification time of the db item.
+
+        ETag is a hash of the loaded column values. Last modification time is
+        taken from the first LAST_MODIFIED_COLUMNS column defined in the model.
+
+        Args:
+            db_item ([type]): SQLAlchemy db item
+            fields (tuple, optional): returned fields
+
+        Returns:
+            tuple: etag (str), last modified (datetime or None)
+        """
+        state = sqlalchemy.inspect(db_item)
+        values = [
+            (key, state.dict[key])
+            for key in state.mapper.column_attrs.keys()
+            if key in state.dict
+        ]
+        etag = hashlib.sha1(
+            repr((state.mapper.class_.__name__, fields, values)).encode("UTF-8")
+        ).hexdigest()
+
+        last_modified = None
+        for key in current_app.config.get("LAST_MODIFIED_COLUMNS", ()):
+            if state.dict.get(key) is not None:
+                last_modified = state.dict[key]
+                break
+        return etag, last_modified
+
+    def add_db_item(self, sql_alchemy_model, ma_schema, data, commit=True):
         """
         Adds item to db.
 
         Args:
             sql_alchemy_model ([type]): [description]
             data (dict): [description]
+            commit (bool, optional): if False then the item is only flushed
+                and the transaction is left open. Defaults to True.
 
         Returns:
             SQLAlchemy db item: [description]
@@ -202,7 +574,7 @@ class SQLAlchemy(BaseSQLAlchemy):
         try:
             db_item = sql_alchemy_model(**data)
             self.session.add(db_item)
-            self.session.commit()
+            self._commit_or_flush(commit)
             json_data = ma_schema.dump(db_item)[0]
             return json_data, HTTPStatus.OK
         except TypeError as ex:
@@ -217,6 +589,77 @@ class SQLAlchemy(BaseSQLAlchemy):
             raise Exception(str(ex))
             
 
+    def add_db_items(self, sql_alchemy_model, data_list):
+        """
+        Adds list of items to db in a single transaction.
+
+        Items are inserted in batches of BULK_INSERT_BATCH_SIZE without
+        creating ORM objects. On MySQL and SQLite items of models with auto
+        increment primary key are inserted with multi-row INSERT statements
+        and the ids are derived from lastrowid. Other backends use
+        bulk_insert_mappings and request generated keys only if they are
+        not part of the items.
+
+        Args:
+            sql_alchemy_model ([type]): SQLAlchemy ORM model
+            data_list (list): list of dicts
+
+        Returns:
+            dict, int: response dict with primary keys of inserted items
+            and HTTP status code
+        """
+        mapper = sqlalchemy.inspect(sql_alchemy_model)
+        column_names = set(mapper.column_attrs.keys())
+        for index, data_dict in enumerate(data_list):
+            unknown_keys = set(data_dict.keys()) - column_names
+            if unknown_keys:
+                abort(
+                    HTTPStatus.NOT_ACCEPTABLE,
+                    "Item %d: attributes %s not defined in the item model"
+                    % (index, ", ".join(sorted(unknown_keys))),
+                )
+
+        pk_names = [
+            mapper.get_property_by_column(column).key for column in mapper.primary_key
+        ]
+        batch_size = current_app.config.get("BULK_INSERT_BATCH_SIZE", 1000)
+        mappings = [dict(data_dict) for data_dict in data_list]
+        return_defaults = any(
+            mapping.get(name) is None for mapping in mappings for name in pk_names
+        )
+        multi_values = return_defaults and bulk_insert.supports_multi_values(
+            self.session, sql_alchemy_model
+        )
+
+        try:
+            if multi_values:
+                bulk_insert.insert_multi_values(
+                    self.session, sql_alchemy_model, mappings, batch_size
+                )
+            else:
+                for start in range(0, len(mappings), batch_size):
+                    self.session.bulk_insert_mappings(
+                        sql_alchemy_model,
+                        mappings[start : start + batch_size],
+                        return_defaults=return_defaults,
+                    )
+            for listener in self.bulk_insert_listeners:
+                listener(self.session, sql_alchemy_model, mappings)
+            self.session.commit()
+        except (sqlalchemy.exc.DataError, sqlalchemy.exc.IntegrityError) as ex:
+            self.session.rollback()
+            log.exception("Unable to add %s items", sql_alchemy_model.__name__)
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to add db items (%s)" % str(ex))
+
+        if len(pk_names) == 1:
+            ids = [mapping.get(pk_names[0]) for mapping in mappings]
+        else:
+            ids = [
+                {name: mapping.get(name) for name in pk_names} for mapping in mappings
+            ]
+
+        return create_response_item(None, len(ids), ids), HTTPStatus.OK
+
     def update_db_item(self, sql_alchemy_model, ma_schema, item_id_dict, item_update_dict):
         """
         Updates item in db
@@ -243,7 +686,9 @@ class SQLAlchemy(BaseSQLAlchemy):
             result = ma_schema.dump(db_item)[0]
         return result
 
-    def patch_db_item(self, sql_alchemy_model, ma_schema, item_id_dict, item_data_dict):
+    def patch_db_item(
+        self, sql_alchemy_model, ma_schema, item_id_dict, item_data_dict, commit=True
+    ):
         """
         Patch db item.
 
@@ -252,6 +697,8 @@ class SQLAlchemy(BaseSQLAlchemy):
             ma_schema : Marshmallows schema
             item_id_dict ([type]): [description]
             item_data_dict ([type]): [description]
+            commit (bool, optional): if False then the change is only flushed.
+                Defaults to True.
 
         Returns:
             [type]: [description]
@@ -270,18 +717,20 @@ class SQLAlchemy(BaseSQLAlchemy):
                         HTTPStatus.NOT_ACCEPTABLE,
                         "Attribute %s not defined in the item model" % key
                     )
-            self.session.commit()
+            self._commit_or_flush(commit)
             result = ma_schema.dump(db_item)[0]
 
         return result
 
-    def delete_db_item(self, sql_alchemy_model, item_id_dict):
+    def delete_db_item(self, sql_alchemy_model, item_id_dict, commit=True):
         """
         Deletes db item
 
         Args:
             sql_alchemy_model ([type]): [description]
             item_id_dict ([type]): [description]
+            commit (bool, optional): if False then the deletion is only
+                flushed. Defaults to True.
 
         Returns:
             [type]: [description]
@@ -292,7 +741,7 @@ class SQLAlchemy(BaseSQLAlchemy):
 
         try:
             self.session.delete(db_item)
-            self.session.commit()
+            self._commit_or_flush(commit)
             return True
         except Exception as ex:
             print(ex)
@@ -300,3 +749,9 @@ class SQLAlchemy(BaseSQLAlchemy):
             self.session.rollback()
             abort(HTTPStatus.INTERNAL_SERVER_ERROR, str(ex))
 
+    def _commit_or_flush(self, commit):
+        if commit:
+            self.session.commit()
+        else:
+            self.session.flush()
+
@@ -0,0 +1,161 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+
+import sqlalchemy
+
+
+# Dialects returning lastrowid of multi-row inserts handled by insert_multi_values
+MULTI_VALUES_DIALECTS = ("mysql", "sqlite")
+
+
+def get_autoincrement_pk(sql_alchemy_model):
+    """
+    Returns single auto increment primary key of the model.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+    Returns:
+        tuple: attribute name and column or (None, None) if the model has
+            a composite or not auto increment primary key
+    """
+    columns = list(sql_alchemy_model.__table__.primary_key.columns)
+    if len(columns) != 1:
+        return None, None
+    column = columns[0]
+    if (
+        column.autoincrement not in (True, "auto")
+        or column.foreign_keys
+        or not isinstance(column.type, sqlalchemy.Integer)
+    ):
+        return None, None
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    return mapper.get_property_by_column(column).key, column
+
+
+def supports_multi_values(session, sql_alchemy_model):
+    """
+    Returns True if generated keys of multi-row inserts can be derived.
+
+    Args:
+        session ([type]): SQLAlchemy session
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+    Returns:
+        bool: True for models with single auto increment primary key in
+            MySQL or SQLite
+    """
+    pk_name, _ = get_autoincrement_pk(sql_alchemy_model)
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    return (
+        pk_name is not None
+        and session.get_bind(mapper=mapper).dialect.name in MULTI_VALUES_DIALECTS
+    )
+
+
+def group_by_keys(mappings):
+    """
+    Groups mappings with the same keys as multi-row VALUES need the same
+    columns in every row.
+
+    Args:
+        mappings (list): list of dicts
+
+    Returns:
+        list: list of lists of indexes of mappings with the same keys
+    """
+    groups = {}
+    for index, mapping in enumerate(mappings):
+        groups.setdefault(frozenset(mapping), []).append(index)
+    return list(groups.values())
+
+
+def insert_multi_values(session, sql_alchemy_model, mappings, batch_size):
+    """
+    Inserts mappings with multi-row INSERT ... VALUES statements and sets
+    the generated primary key in every mapping.
+
+    MySQL returns the id of the first row of a multi-row insert as
+    lastrowid (SQLite the id of the last row) and InnoDB assigns
+    consecutive ids to the rows of a single simple insert statement
+    (auto_increment_increment apart), so the ids of the other rows are
+    derived from it. Mappings with an explicit primary key are inserted
+    by separate statements, as they would break the sequence.
+
+    Args:
+        session ([type]): SQLAlchemy session
+        sql_alchemy_model ([type]): SQLAlchemy ORM model with single auto
+            increment primary key
+        mappings (list): list of dicts keyed by attribute names
+        batch_size (int): maximal number of rows in a statement
+    """
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    pk_name, _ = get_autoincrement_pk(sql_alchemy_model)
+    table = sql_alchemy_model.__table__
+    dialect_name = session.get_bind(mapper=mapper).dialect.name
+    increment = 1
+    if dialect_name == "mysql":
+        increment = (
+            session.execute(
+                sqlalchemy.text("SELECT @@auto_increment_increment"), mapper=mapper
+            ).scalar()
+            or 1
+        )
+
+    # Generated keys are requested only for mappings without primary key
+    generated = [mapping.get(pk_name) is None for mapping in mappings]
+    values = [
+        {
+            key: value
+            for key, value in mapping.items()
+            if key != pk_name or not is_generated
+        }
+        for mapping, is_generated in zip(mappings, generated)
+    ]
+
+    for indexes in group_by_keys(values):
+        for start in range(0, len(indexes), batch_size):
+            batch_indexes = indexes[start : start + batch_size]
+            rows = [
+                {
+                    mapper.column_attrs[key].columns[0]: value
+                    for key, value in values[index].items()
+                }
+                for index in batch_indexes
+            ]
+            if not rows[0]:
+                # Rows without values can not be inserted by a single statement
+                for index in batch_indexes:
+                    result = session.execute(table.insert(), mapper=mapper)
+                    mappings[index][pk_name] = result.lastrowid
+                continue
+            result = session.execute(table.insert().values(rows), mapper=mapper)
+            if not generated[batch_indexes[0]]:
+                continue
+            first_id = result.lastrowid
+            if dialect_name == "sqlite":
+                first_id -= (len(rows) - 1) * increment
+            for offset, index in enumerate(batch_indexes):
+                mappings[index][pk_name] = first_id + offset * increment
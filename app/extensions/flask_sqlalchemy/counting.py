@@ -0,0 +1,126 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import sqlalchemy
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_CACHED = "cached"
+COUNT_NONE = "none"
+
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_CACHED, COUNT_NONE)
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN statement wrapping a select statement"""
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "mysql")
+def visit_explain(element, compiler, **kwargs):
+    # pylint: disable=unused-argument
+    return "EXPLAIN %s" % compiler.process(element.statement, **kwargs)
+
+
+def get_exact_count(query):
+    """
+    Returns number of rows matching the query.
+
+    Args:
+        query ([type]): filtered SQLAlchemy query
+
+    Returns:
+        int: number of rows
+    """
+    return query.order_by(None).count()
+
+
+def get_estimated_count(session, query, sql_alchemy_model, filter_dict):
+    """
+    Returns estimated number of rows based on the MySQL statistics.
+
+    Unfiltered queries use TABLE_ROWS from information_schema and filtered
+    queries use the number of rows estimated by EXPLAIN. Exact count is
+    used for other database backends.
+
+    Args:
+        session ([type]): SQLAlchemy session
+        query ([type]): filtered SQLAlchemy query
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        filter_dict (dict): filters applied to the query
+
+    Returns:
+        int: estimated number of rows
+    """
+    if session.get_bind().dialect.name != "mysql":
+        return get_exact_count(query)
+
+    if not filter_dict:
+        result = session.execute(
+            sqlalchemy.text(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+            ),
+            {"table_name": sql_alchemy_model.__table__.name},
+        ).scalar()
+        return int(result or 0)
+
+    estimate = 0
+    for row in session.execute(Explain(query.order_by(None).statement)):
+        row_dict = dict(row)
+        rows = row_dict.get("rows") or 0
+        filtered = row_dict.get("filtered")
+        if filtered is not None:
+            rows = rows * float(filtered) / 100
+        estimate = max(estimate, int(rows))
+    return estimate
+
+
+def get_cached_count(cache, query, sql_alchemy_model, filter_dict):
+    """
+    Returns exact count cached per model and filter values.
+
+    Args:
+        cache (TTLCache): count cache
+        query ([type]): filtered SQLAlchemy query
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        filter_dict (dict): filters applied to the query
+
+    Returns:
+        int: number of rows
+    """
+    key = (
+        sql_alchemy_model.__name__,
+        tuple(sorted((key, str(value)) for key, value in filter_dict.items())),
+    )
+    total = cache.get(key)
+    if total is None:
+        total = get_exact_count(query)
+        cache.set(key, total)
+    return total
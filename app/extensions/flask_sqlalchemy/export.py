@@ -0,0 +1,116 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import io
+import csv
+import json
+
+from flask import Response, stream_with_context
+
+from app.utils import NDJSON_MIMETYPE
+
+
+JSON_MIMETYPE = "application/json"
+CSV_MIMETYPE = "text/csv"
+
+EXPORT_MIMETYPES = (NDJSON_MIMETYPE, CSV_MIMETYPE)
+
+
+def get_export_mimetype(accept_mimetypes):
+    """
+    Returns streaming export mimetype requested by the Accept header.
+
+    Args:
+        accept_mimetypes ([type]): flask request accept_mimetypes
+
+    Returns:
+        str: NDJSON or CSV mimetype or None if JSON response is requested
+    """
+    mimetype = accept_mimetypes.best_match((JSON_MIMETYPE,) + EXPORT_MIMETYPES)
+    if mimetype in EXPORT_MIMETYPES:
+        return mimetype
+    return None
+
+
+def stream_items(query, ma_schema, mimetype, batch_size):
+    """
+    Yields serialized items one by one.
+
+    Rows are fetched with a server side cursor in batches of batch_size
+    and each row is dumped as soon as it is fetched, so the memory usage
+    does not depend on the number of returned rows.
+
+    Args:
+        query ([type]): SQLAlchemy query
+        ma_schema ([type]): marshmallows schema
+        mimetype (str): NDJSON or CSV mimetype
+        batch_size (int): number of rows fetched from the db at once
+
+    Yields:
+        str: serialized item
+    """
+    query = query.execution_options(stream_results=True).yield_per(batch_size)
+
+    if mimetype == CSV_MIMETYPE:
+        field_names = sorted(ma_schema.fields.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(field_names)
+        for db_item in query:
+            item = ma_schema.dump(db_item)[0]
+            writer.writerow([_to_csv_value(item.get(name)) for name in field_names])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        for db_item in query:
+            item = ma_schema.dump(db_item)[0]
+            yield json.dumps(item, default=str) + "\n"
+
+
+def create_stream_response(query, ma_schema, mimetype, batch_size):
+    """
+    Creates chunked response streaming items returned by the query.
+
+    Args:
+        query ([type]): SQLAlchemy query
+        ma_schema ([type]): marshmallows schema
+        mimetype (str): NDJSON or CSV mimetype
+        batch_size (int): number of rows fetched from the db at once
+
+    Returns:
+        Response: flask response
+    """
+    return Response(
+        stream_with_context(stream_items(query, ma_schema, mimetype, batch_size)),
+        mimetype=mimetype,
+    )
+
+
+def _to_csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
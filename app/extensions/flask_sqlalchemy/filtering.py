@@ -0,0 +1,208 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+import datetime
+import threading
+
+import sqlalchemy
+from flask_restx import fields as f_fields
+
+
+OPERATOR_SEPARATOR = "__"
+
+COMPARISON_OPERATORS = {
+    "eq": lambda attribute, value: attribute == value,
+    "ne": lambda attribute, value: attribute != value,
+    "gt": lambda attribute, value: attribute > value,
+    "gte": lambda attribute, value: attribute >= value,
+    "lt": lambda attribute, value: attribute < value,
+    "lte": lambda attribute, value: attribute <= value,
+    "in": lambda attribute, value: attribute.in_(value),
+    "startswith": lambda attribute, value: attribute.startswith(
+        value, autoescape=True
+    ),
+}
+
+_indexed_columns = {}
+_indexed_columns_lock = threading.Lock()
+
+
+def parse_filters(query_params, dict_schema):
+    """
+    Parses filters with operators from query parameters.
+
+    Filter is defined as attribute__operator=value, for example
+    startTime__gte=2020-01-01T00:00:00 or runStatus__in=Successful,Failed.
+    Values are converted based on the type of the field in dict_schema.
+
+    Args:
+        query_params (dict): query parameters
+        dict_schema (dict): dict with flask fields
+
+    Raises:
+        ValueError: if attribute, operator or value is not valid
+
+    Returns:
+        list: list of (attribute name, operator, value) tuples
+    """
+    filters = []
+    for key, value in query_params.items():
+        if OPERATOR_SEPARATOR not in key:
+            continue
+        attribute_name, operator = key.rsplit(OPERATOR_SEPARATOR, 1)
+        if attribute_name not in dict_schema:
+            raise ValueError("Unable to filter by unknown field %s" % attribute_name)
+        if operator not in COMPARISON_OPERATORS:
+            raise ValueError(
+                "Invalid filter operator %s (allowed operators: %s)"
+                % (operator, ", ".join(COMPARISON_OPERATORS))
+            )
+
+        field = dict_schema[attribute_name]
+        if operator == "startswith" and not isinstance(field, f_fields.String):
+            raise ValueError("Operator startswith requires string field %s" % key)
+        if operator == "in":
+            value = [
+                convert_value(field, item, key) for item in str(value).split(",")
+            ]
+        else:
+            value = convert_value(field, value, key)
+        filters.append((attribute_name, operator, value))
+    return filters
+
+
+def convert_value(field, value, key):
+    """
+    Converts query parameter value to the type of the flask field.
+
+    Args:
+        field ([type]): flask field
+        value (str): query parameter value
+        key (str): query parameter name used in the error message
+
+    Raises:
+        ValueError: if the value can not be converted
+
+    Returns:
+        converted value
+    """
+    try:
+        if isinstance(field, f_fields.Integer):
+            return int(value)
+        if isinstance(field, (f_fields.Float, f_fields.Arbitrary)):
+            return float(value)
+        if isinstance(field, f_fields.Boolean):
+            if str(value).lower() not in ("true", "false", "1", "0"):
+                raise ValueError("boolean value expected")
+            return str(value).lower() in ("true", "1")
+        if isinstance(field, f_fields.Date):
+            return datetime.date.fromisoformat(value)
+        if isinstance(field, f_fields.DateTime):
+            return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError) as ex:
+        raise ValueError("Invalid value %s of %s (%s)" % (value, key, str(ex)))
+    return str(value)
+
+
+def apply_filters(query, sql_alchemy_model, filters):
+    """
+    Adds filter expressions to the query.
+
+    Args:
+        query ([type]): SQLAlchemy query
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        filters (list): list returned by parse_filters
+
+    Returns:
+        [type]: SQLAlchemy query
+    """
+    expressions = []
+    for attribute_name, operator, value in filters:
+        attribute = getattr(sql_alchemy_model, attribute_name, None)
+        if attribute is None:
+            raise ValueError("Unable to filter by field %s" % attribute_name)
+        expressions.append(COMPARISON_OPERATORS[operator](attribute, value))
+    if expressions:
+        query = query.filter(*expressions)
+    return query
+
+
+def get_indexed_columns(sql_alchemy_model):
+    """
+    Returns names of attributes that can be resolved by an index.
+
+    Primary key, indexed and foreign key columns (indexed by InnoDB) and
+    the first columns of table indexes are included.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+    Returns:
+        frozenset: attribute names
+    """
+    indexed_columns = _indexed_columns.get(sql_alchemy_model)
+    if indexed_columns is not None:
+        return indexed_columns
+
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    table = mapper.local_table
+    columns = set(table.primary_key.columns)
+    for column in table.columns:
+        if column.index or column.unique or column.foreign_keys:
+            columns.add(column)
+    for index in table.indexes:
+        index_columns = list(index.columns)
+        if index_columns:
+            columns.add(index_columns[0])
+
+    attribute_names = set()
+    for column in columns:
+        try:
+            attribute_names.add(mapper.get_property_by_column(column).key)
+        except sqlalchemy.orm.exc.UnmappedColumnError:
+            continue
+
+    indexed_columns = frozenset(attribute_names)
+    with _indexed_columns_lock:
+        _indexed_columns[sql_alchemy_model] = indexed_columns
+    return indexed_columns
+
+
+def check_indexed(sql_alchemy_model, attribute_names):
+    """
+    Checks that all filtered attributes are indexed.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        attribute_names (list): filtered attribute names
+
+    Raises:
+        ValueError: if an attribute is not indexed
+    """
+    indexed_columns = get_indexed_columns(sql_alchemy_model)
+    not_indexed = sorted(set(attribute_names) - indexed_columns)
+    if not_indexed:
+        raise ValueError(
+            "Filtering by not indexed fields %s is not allowed (indexed fields: %s)"
+            % (", ".join(not_indexed), ", ".join(sorted(indexed_columns)))
+        )
@@ -0,0 +1,101 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import sqlalchemy
+
+
+def get_id_attribute(sql_alchemy_model):
+    """
+    Returns name and attribute of the single column primary key.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+
+    Raises:
+        ValueError: if the model has a composite primary key
+
+    Returns:
+        tuple: attribute name, model attribute
+    """
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    if len(mapper.primary_key) != 1:
+        raise ValueError(
+            "Items of %s can not be requested by ids" % sql_alchemy_model.__name__
+        )
+    name = mapper.get_property_by_column(mapper.primary_key[0]).key
+    return name, getattr(sql_alchemy_model, name)
+
+
+def parse_ids(ids, id_attribute, max_ids=None):
+    """
+    Parses comma separated list of ids.
+
+    Args:
+        ids (str or list): comma separated ids or list of ids
+        id_attribute ([type]): primary key model attribute
+        max_ids (int, optional): maximal number of ids
+
+    Raises:
+        ValueError: if an id can not be converted or there are too many ids
+
+    Returns:
+        list: unique ids converted to the primary key python type
+    """
+    if isinstance(ids, str):
+        ids = [value.strip() for value in ids.split(",") if value.strip()]
+    if not ids:
+        raise ValueError("No ids requested")
+    if max_ids and len(ids) > max_ids:
+        raise ValueError("At most %d ids can be requested at once" % max_ids)
+
+    python_type = id_attribute.property.columns[0].type.python_type
+    try:
+        return list(dict.fromkeys(python_type(value) for value in ids))
+    except (TypeError, ValueError) as ex:
+        raise ValueError("Invalid id value (%s)" % str(ex))
+
+
+def get_items_by_ids(query, id_name, id_attribute, ids, chunk_size):
+    """
+    Returns db items with given ids.
+
+    Items are loaded with id IN (...) queries of at most chunk_size ids.
+
+    Args:
+        query ([type]): filtered SQLAlchemy query
+        id_name (str): primary key attribute name
+        id_attribute ([type]): primary key model attribute
+        ids (list): ids returned by parse_ids
+        chunk_size (int): maximal number of ids in a single query
+
+    Returns:
+        dict, list: db items by id and list of not found ids
+    """
+    db_items = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        for db_item in query.filter(id_attribute.in_(chunk)):
+            db_items[getattr(db_item, id_name)] = db_item
+    not_found = [item_id for item_id in ids if item_id not in db_items]
+    return db_items, not_found
@@ -0,0 +1,249 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import base64
+import binascii
+import datetime
+
+import sqlalchemy
+
+
+def get_keyset_columns(sql_alchemy_model, sort_attribute=None, descending=False):
+    """
+    Returns ordered list of columns used to build keyset (seek) pagination.
+
+    The optional sort column comes first and the primary key columns are
+    appended to make the ordering unique.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        sort_attribute (str, optional): model attribute used for sorting
+        descending (bool, optional): sort direction. Defaults to False.
+
+    Returns:
+        list: list of (attribute name, model attribute, descending) tuples
+    """
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    keyset_columns = []
+    if sort_attribute:
+        keyset_columns.append(
+            (sort_attribute, getattr(sql_alchemy_model, sort_attribute), descending)
+        )
+    for column in mapper.primary_key:
+        attribute_name = mapper.get_property_by_column(column).key
+        if attribute_name != sort_attribute:
+            keyset_columns.append(
+                (attribute_name, getattr(sql_alchemy_model, attribute_name), descending)
+            )
+    return keyset_columns
+
+
+def parse_order_by(order_by, dict_schema, sort_keys):
+    """
+    Parses order_by query parameter.
+
+    Descending order is requested by "-" prefix (for example -startTime).
+
+    Args:
+        order_by (str): order_by query parameter
+        dict_schema (dict): dict with flask fields
+        sort_keys (frozenset): attribute names allowed for sorting
+
+    Raises:
+        ValueError: if the attribute can not be used for sorting
+
+    Returns:
+        tuple: attribute name (None if no sorting is requested), descending
+    """
+    if not order_by:
+        return None, False
+
+    order_by = order_by.strip()
+    descending = order_by.startswith("-")
+    attribute_name = order_by.lstrip("+-")
+    if "," in attribute_name:
+        raise ValueError("Sorting by a single field is supported")
+    if attribute_name not in dict_schema:
+        raise ValueError("Unable to sort by unknown field %s" % attribute_name)
+    if attribute_name not in sort_keys:
+        raise ValueError(
+            "Sorting by %s is not allowed (allowed fields: %s)"
+            % (attribute_name, ", ".join(sorted(sort_keys)))
+        )
+    return attribute_name, descending
+
+
+def encode_cursor(values):
+    """
+    Encodes keyset values as an opaque url safe string.
+
+    Args:
+        values (list): values of the keyset columns of the last returned row
+
+    Returns:
+        str: cursor
+    """
+    payload = json.dumps(values, default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("UTF-8")).decode("UTF-8")
+
+
+def decode_cursor(cursor, keyset_columns):
+    """
+    Decodes cursor created by encode_cursor.
+
+    Args:
+        cursor (str): cursor
+        keyset_columns (list): list returned by get_keyset_columns
+
+    Raises:
+        ValueError: if the cursor does not match the keyset columns
+
+    Returns:
+        list: keyset values converted to the column python types
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("UTF-8")))
+    except (binascii.Error, UnicodeError, ValueError) as ex:
+        raise ValueError("Unable to decode cursor %s (%s)" % (cursor, str(ex)))
+
+    if not isinstance(values, list) or len(values) != len(keyset_columns):
+        raise ValueError("Cursor %s does not match the requested ordering" % cursor)
+
+    result = []
+    for value, (_, attribute, _) in zip(values, keyset_columns):
+        try:
+            result.append(_from_json_value(value, attribute))
+        except (TypeError, KeyError, ValueError) as ex:
+            raise ValueError(
+                "Invalid value %s in cursor %s (%s)" % (value, cursor, str(ex))
+            )
+    return result
+
+
+def apply_keyset(query, keyset_columns, cursor_values=None):
+    """
+    Orders the query by keyset columns and seeks past cursor values.
+
+    The seek condition is expanded to
+    (c1 > v1) OR (c1 = v1 AND c2 > v2) OR ... so that the database can
+    resolve it with an index range scan instead of skipping rows.
+
+    NULL values are ordered as by MySQL: first in ascending and last in
+    descending order. Comparisons with NULL are replaced by IS NULL and
+    IS NOT NULL conditions, so rows with NULL sort values are reachable.
+
+    Args:
+        query ([type]): SQLAlchemy query
+        keyset_columns (list): list returned by get_keyset_columns
+        cursor_values (list, optional): decoded cursor values
+
+    Returns:
+        [type]: SQLAlchemy query
+    """
+    if cursor_values:
+        conditions = []
+        for index, (_, attribute, descending) in enumerate(keyset_columns):
+            equal_conditions = [
+                _equal_condition(keyset_attribute, cursor_values[equal_index])
+                for equal_index, (_, keyset_attribute, _) in enumerate(
+                    keyset_columns[:index]
+                )
+            ]
+            seek_condition = _seek_condition(
+                attribute, cursor_values[index], descending
+            )
+            if seek_condition is not None:
+                conditions.append(
+                    sqlalchemy.and_(*(equal_conditions + [seek_condition]))
+                )
+        query = query.filter(sqlalchemy.or_(*conditions))
+
+    order_by = []
+    for _, attribute, descending in keyset_columns:
+        order_by.append(attribute.desc() if descending else attribute.asc())
+
+    return query.order_by(*order_by)
+
+
+def _equal_condition(attribute, value):
+    if value is None:
+        return attribute.is_(None)
+    return attribute == value
+
+
+def _seek_condition(attribute, value, descending):
+    # Returns None if no value follows the cursor value
+    if descending:
+        if value is None:
+            return None
+        return sqlalchemy.or_(attribute < value, attribute.is_(None))
+    if value is None:
+        return attribute.isnot(None)
+    return attribute > value
+
+
+def get_next_cursor(db_items, keyset_columns, limit):
+    """
+    Returns cursor pointing after the last item of a full page.
+
+    Args:
+        db_items (list): list of SQLAlchemy db items
+        keyset_columns (list): list returned by get_keyset_columns
+        limit (int): page size
+
+    Returns:
+        str: cursor or None if there are no more items
+    """
+    if not db_items or len(db_items) < limit:
+        return None
+    last_item = db_items[-1]
+    return encode_cursor(
+        [getattr(last_item, name) for name, _, _ in keyset_columns]
+    )
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _from_json_value(value, attribute):
+    if value is None:
+        return None
+    try:
+        python_type = attribute.property.columns[0].type.python_type
+    except NotImplementedError:
+        return value
+
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    if python_type is datetime.time:
+        return datetime.time.fromisoformat(value)
+    if python_type in (int, float):
+        return python_type(value)
+    return value
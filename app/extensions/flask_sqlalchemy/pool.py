@@ -0,0 +1,109 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import time
+
+from flask import has_request_context, request
+from sqlalchemy.pool import QueuePool
+
+from app.extensions.instrumentation import DURATION_BUCKETS, Histogram
+
+
+POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+
+pool_wait_histogram = Histogram(
+    "ispyb_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection in seconds",
+    DURATION_BUCKETS,
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool measuring how long a connection checkout waits."""
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_histogram.observe(
+                request.endpoint if has_request_context() else "unknown",
+                time.perf_counter() - start_time,
+            )
+
+
+def get_engine_options(database_config, drivername):
+    """
+    Returns create_engine options defined in the database config section.
+
+    Pool sizing options are ignored for SQLite that does not use a queue pool.
+
+    Args:
+        database_config (dict): database section of the config
+        drivername (str): SQLAlchemy driver name
+
+    Returns:
+        dict: create_engine keyword arguments
+    """
+    options = dict(database_config or {})
+    if drivername.startswith("sqlite"):
+        for key in POOL_OPTIONS:
+            options.pop(key, None)
+    else:
+        options.setdefault("poolclass", TimedQueuePool)
+    return options
+
+
+def get_pool_metric_lines(engine):
+    """
+    Returns connection pool gauges in the Prometheus text format.
+
+    Args:
+        engine ([type]): SQLAlchemy engine
+
+    Returns:
+        list: list of lines
+    """
+    lines = pool_wait_histogram.get_lines()
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return lines
+
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    gauges = (
+        ("ispyb_db_pool_size", "Configured pool size", pool.size()),
+        ("ispyb_db_pool_checked_out", "Connections in use", checked_out),
+        ("ispyb_db_pool_overflow", "Connections above pool size", pool.overflow()),
+        (
+            "ispyb_db_pool_utilization",
+            "Ratio of connections in use to maximal number of connections",
+            checked_out / capacity if capacity else 0,
+        ),
+    )
+    for name, description, value in gauges:
+        lines.append("# HELP %s %s" % (name, description))
+        lines.append("# TYPE %s gauge" % name)
+        lines.append("%s %s" % (name, value))
+    return lines
@@ -0,0 +1,121 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import threading
+
+import sqlalchemy
+from sqlalchemy.orm import load_only
+
+
+_projected_schemas = {}
+_projected_schemas_lock = threading.Lock()
+
+
+def parse_fields(fields, ma_schema):
+    """
+    Parses comma separated list of requested fields.
+
+    Args:
+        fields (str or list): comma separated field names or list of names
+        ma_schema ([type]): marshmallows schema
+
+    Raises:
+        ValueError: if a field is not defined in the schema
+
+    Returns:
+        tuple: sorted field names or None if no projection is requested
+    """
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    fields = tuple(sorted(set(field.strip() for field in fields if field.strip())))
+    if not fields:
+        return None
+
+    unknown_fields = [field for field in fields if field not in ma_schema.fields]
+    if unknown_fields:
+        raise ValueError(
+            "Unknown fields %s (available fields: %s)"
+            % (", ".join(unknown_fields), ", ".join(sorted(ma_schema.fields)))
+        )
+    return fields
+
+
+def get_projected_schema(ma_schema, fields):
+    """
+    Returns marshmallows schema restricted to the given fields.
+
+    Schemas are created once per schema class and field set and reused.
+
+    Args:
+        ma_schema ([type]): marshmallows schema
+        fields (tuple): field names returned by parse_fields
+
+    Returns:
+        [type]: marshmallows schema
+    """
+    if not fields:
+        return ma_schema
+
+    key = (ma_schema.__class__, fields)
+    projected_schema = _projected_schemas.get(key)
+    if projected_schema is None:
+        with _projected_schemas_lock:
+            projected_schema = _projected_schemas.get(key)
+            if projected_schema is None:
+                projected_schema = ma_schema.__class__(only=fields)
+                _projected_schemas[key] = projected_schema
+    return projected_schema
+
+
+def apply_projection(query, sql_alchemy_model, fields, extra_attributes=()):
+    """
+    Restricts columns loaded by the query to the requested fields.
+
+    Primary key columns are always loaded by SQLAlchemy. Fields that are
+    not mapped columns of the model are ignored.
+
+    Args:
+        query ([type]): SQLAlchemy query
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        fields (tuple): field names returned by parse_fields
+        extra_attributes (tuple, optional): attributes needed by the query
+            itself (for example keyset columns)
+
+    Returns:
+        [type]: SQLAlchemy query
+    """
+    if not fields:
+        return query
+
+    column_names = sqlalchemy.inspect(sql_alchemy_model).column_attrs.keys()
+    attributes = [
+        name
+        for name in dict.fromkeys(tuple(fields) + tuple(extra_attributes))
+        if name in column_names
+    ]
+    if not attributes:
+        return query
+    return query.options(load_only(*attributes))
@@ -0,0 +1,155 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+import logging
+
+import sqlalchemy
+from flask import g, has_request_context, request
+from flask_sqlalchemy import SignallingSession
+
+
+log = logging.getLogger(__name__)
+
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending reads of GET requests to the read replica bind.
+
+    The primary database is used if:
+        - READ_REPLICA_BIND is not configured
+        - the request is not a GET request or the session is flushing
+        - the client wrote to the database less than READ_YOUR_WRITES_WINDOW
+          seconds ago (read your writes)
+        - the replica lag exceeds READ_REPLICA_MAX_LAG seconds
+    """
+
+    def __init__(self, db, **options):
+        self.db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        replica_bind = self.app.config.get("READ_REPLICA_BIND")
+        if replica_bind and not self._flushing and use_replica(self.db):
+            if is_replica_usable(self.db, replica_bind):
+                return self.db.get_engine(self.app, bind=replica_bind)
+        return super().get_bind(mapper, clause)
+
+
+def get_client_key():
+    """
+    Returns key identifying the client of the current request.
+
+    Returns:
+        str: Authorization header or remote address
+    """
+    return request.headers.get("Authorization") or request.remote_addr
+
+
+def use_replica(db):
+    """
+    Returns True if the current request can be served by the read replica.
+
+    Args:
+        db ([type]): SQLAlchemy extension
+
+    Returns:
+        bool: True if replica can be used
+    """
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    if g.get("use_primary"):
+        return False
+    if db.recent_writers.get(get_client_key()):
+        g.use_primary = True
+        return False
+    return True
+
+
+def is_replica_usable(db, replica_bind):
+    """
+    Returns False if the replica lag exceeds READ_REPLICA_MAX_LAG.
+
+    The lag is read from SHOW SLAVE STATUS and cached for
+    READ_REPLICA_LAG_CHECK_INTERVAL seconds.
+
+    Args:
+        db ([type]): SQLAlchemy extension
+        replica_bind (str): replica bind key
+
+    Returns:
+        bool: True if replica can be used
+    """
+    max_lag = db.get_app().config.get("READ_REPLICA_MAX_LAG")
+    if max_lag is None:
+        return True
+
+    lag = db.replica_lag_cache.get(replica_bind)
+    if lag is None:
+        lag = get_replica_lag(db.get_engine(bind=replica_bind))
+        db.replica_lag_cache.set(replica_bind, lag)
+    if lag < 0 or lag > max_lag:
+        log.warning("Replica lag %s s, using primary database" % lag)
+        return False
+    return True
+
+
+def get_replica_lag(engine):
+    """
+    Returns replication lag in seconds.
+
+    Args:
+        engine ([type]): replica engine
+
+    Returns:
+        float: lag in seconds or -1 if the lag is not known
+    """
+    if engine.dialect.name != "mysql":
+        return 0
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(sqlalchemy.text("SHOW SLAVE STATUS")).first()
+    except sqlalchemy.exc.DBAPIError as ex:
+        log.warning("Unable to read replica status (%s)" % str(ex))
+        return -1
+    if row is None:
+        # Not a replica
+        return 0
+    lag = dict(row).get("Seconds_Behind_Master")
+    return -1 if lag is None else float(lag)
+
+
+def mark_client_write(session, flush_context):
+    # pylint: disable=unused-argument
+    """
+    Remembers that the client of the current request wrote to the database.
+
+    Args:
+        session ([type]): SQLAlchemy session
+        flush_context ([type]): flush context
+    """
+    if not has_request_context() or not isinstance(session, RoutingSession):
+        return
+    session.db.recent_writers.set(get_client_key(), True)
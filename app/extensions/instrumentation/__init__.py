@@ -0,0 +1,317 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+__license__ = "LGPLv3+"
+
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import sqlalchemy
+from flask import Response, g, has_request_context, request
+
+log = logging.getLogger(__name__)
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 10240, 102400, 1048576, 10485760)
+
+
+class Histogram:
+    """
+    Prometheus style histogram with values grouped by label.
+
+    Args:
+        name (str): metric name
+        description (str): metric description
+        buckets (tuple): upper bounds of the buckets
+    """
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        """
+        Adds value to the histogram.
+
+        Args:
+            label (str): endpoint name
+            value (float): observed value
+        """
+        with self._lock:
+            counts = self._values.get(label)
+            if counts is None:
+                counts = self._values[label] = [[0] * len(self.buckets), 0, 0]
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    counts[0][index] += 1
+            counts[1] += value
+            counts[2] += 1
+
+    def get_lines(self):
+        """
+        Returns histogram in the Prometheus text format.
+
+        Returns:
+            list: list of lines
+        """
+        lines = [
+            "# HELP %s %s" % (self.name, self.description),
+            "# TYPE %s histogram" % self.name,
+        ]
+        with self._lock:
+            values = [
+                (label, list(counts[0]), counts[1], counts[2])
+                for label, counts in sorted(self._values.items())
+            ]
+        for label, bucket_counts, value_sum, value_count in values:
+            for bucket, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(
+                    '%s_bucket{endpoint="%s",le="%s"} %d'
+                    % (self.name, label, bucket, bucket_count)
+                )
+            lines.append(
+                '%s_bucket{endpoint="%s",le="+Inf"} %d'
+                % (self.name, label, value_count)
+            )
+            lines.append('%s_sum{endpoint="%s"} %s' % (self.name, label, value_sum))
+            lines.append('%s_count{endpoint="%s"} %d' % (self.name, label, value_count))
+        return lines
+
+
+class RequestMetrics:
+    """Metrics collected during a single request."""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.timings = {}
+
+
+@contextmanager
+def record_timing(name):
+    """
+    Measures time spent in the block and adds it to the request metrics.
+
+    Used for example to measure marshmallow dump time.
+
+    Args:
+        name (str): timing name (used in the Server-Timing header)
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _get_request_metrics()
+        if metrics is not None:
+            metrics.timings[name] = (
+                metrics.timings.get(name, 0.0) + time.perf_counter() - start_time
+            )
+
+
+class Instrumentation(object):
+    """
+    Collects per request query count, database time, serialization time and
+    response size.
+
+    Results are returned in the Server-Timing response header, exposed
+    as Prometheus metrics and slow queries are logged.
+    Metrics are kept per process.
+    """
+
+    def __init__(self, app=None):
+        self.slow_query_threshold = None
+        self.server_timing = True
+        self.histograms = (
+            Histogram(
+                "ispyb_request_duration_seconds",
+                "Request duration in seconds",
+                DURATION_BUCKETS,
+            ),
+            Histogram(
+                "ispyb_request_db_duration_seconds",
+                "Time spent in database queries per request in seconds",
+                DURATION_BUCKETS,
+            ),
+            Histogram(
+                "ispyb_request_serialization_duration_seconds",
+                "Time spent in marshmallow dump per request in seconds",
+                DURATION_BUCKETS,
+            ),
+            Histogram(
+                "ispyb_request_queries",
+                "Number of database queries per request",
+                QUERY_COUNT_BUCKETS,
+            ),
+            Histogram(
+                "ispyb_response_size_bytes",
+                "Response size in bytes",
+                SIZE_BUCKETS,
+            ),
+        )
+        self.metric_providers = []
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Registers SQLAlchemy events, request hooks and metrics endpoint.
+
+        Args:
+            app (flask app): Flask application
+        """
+        if not app.config.get("INSTRUMENTATION_ENABLED", True):
+            return
+
+        self.slow_query_threshold = app.config.get("SLOW_QUERY_THRESHOLD")
+        self.server_timing = app.config.get("SERVER_TIMING_HEADER", True)
+
+        if not sqlalchemy.event.contains(
+            sqlalchemy.engine.Engine, "before_cursor_execute", _before_cursor_execute
+        ):
+            sqlalchemy.event.listen(
+                sqlalchemy.engine.Engine,
+                "before_cursor_execute",
+                _before_cursor_execute,
+            )
+        if not sqlalchemy.event.contains(
+            sqlalchemy.engine.Engine, "after_cursor_execute", self._after_cursor_execute
+        ):
+            sqlalchemy.event.listen(
+                sqlalchemy.engine.Engine,
+                "after_cursor_execute",
+                self._after_cursor_execute,
+            )
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+        if app.config.get("METRICS_PATH"):
+            app.add_url_rule(
+                app.config["METRICS_PATH"], "metrics", self.get_metrics_response
+            )
+
+    def add_metric_provider(self, provider):
+        """
+        Adds function returning additional metric lines (for example gauges).
+
+        Args:
+            provider (function): function returning list of lines
+        """
+        self.metric_providers.append(provider)
+
+    def get_metrics_response(self):
+        """
+        Returns metrics in the Prometheus text format.
+
+        Returns:
+            Response: flask response
+        """
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.get_lines())
+        for provider in self.metric_providers:
+            lines.extend(provider())
+        return Response("\n".join(lines) + "\n", mimetype="text/plain")
+
+    def _before_request(self):
+        g.request_metrics = RequestMetrics()
+
+    def _after_request(self, response):
+        metrics = _get_request_metrics()
+        if metrics is None:
+            return response
+
+        duration = time.perf_counter() - metrics.start_time
+        serialization_time = metrics.timings.get("serialize", 0.0)
+        endpoint = request.endpoint or "unknown"
+
+        (
+            duration_histogram,
+            db_histogram,
+            serialization_histogram,
+            query_histogram,
+            size_histogram,
+        ) = self.histograms
+        duration_histogram.observe(endpoint, duration)
+        db_histogram.observe(endpoint, metrics.db_time)
+        serialization_histogram.observe(endpoint, serialization_time)
+        query_histogram.observe(endpoint, metrics.query_count)
+        if response.content_length is not None:
+            size_histogram.observe(endpoint, response.content_length)
+
+        if self.server_timing:
+            server_timing = [
+                'db;dur=%.2f;desc="%d queries"'
+                % (metrics.db_time * 1000, metrics.query_count)
+            ]
+            for name, value in sorted(metrics.timings.items()):
+                server_timing.append("%s;dur=%.2f" % (name, value * 1000))
+            server_timing.append("total;dur=%.2f" % (duration * 1000))
+            response.headers["Server-Timing"] = ", ".join(server_timing)
+
+        return response
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        # pylint: disable=unused-argument,too-many-arguments
+        start_times = conn.info.get("query_start_time")
+        if not start_times:
+            return
+        query_time = time.perf_counter() - start_times.pop()
+
+        metrics = _get_request_metrics()
+        if metrics is not None:
+            metrics.query_count += 1
+            metrics.db_time += query_time
+
+        if (
+            self.slow_query_threshold is not None
+            and query_time >= self.slow_query_threshold
+        ):
+            log.warning(
+                "Slow query (%.3f s) in %s: %s %s"
+                % (
+                    query_time,
+                    request.endpoint if has_request_context() else None,
+                    statement,
+                    str(parameters),
+                )
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # pylint: disable=unused-argument,too-many-arguments
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _get_request_metrics():
+    if has_request_context():
+        return g.get("request_metrics")
+    return None
@@ -0,0 +1,222 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import uuid
+import logging
+import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import current_app
+
+
+log = logging.getLogger(__name__)
+
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+
+
+class JobQueue(object):
+    """
+    Runs long lasting tasks in a pool of worker threads.
+
+    Jobs are kept in an in-process job table (last JOB_HISTORY_SIZE jobs)
+    and their status can be queried by job id. Periodic jobs are submitted
+    by scheduler threads.
+
+    The job table is not shared between server processes: with several
+    gunicorn workers a job is only known to the worker that accepted it.
+    """
+
+    def __init__(self, app=None):
+        self.history_size = 100
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._schedules = {}
+        self._lock = threading.Lock()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Creates worker pool.
+
+        Args:
+            app (flask app): Flask application
+        """
+        self.history_size = app.config.get("JOB_HISTORY_SIZE", 100)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=app.config.get("JOB_WORKERS", 2),
+                thread_name_prefix="ispyb-job",
+            )
+
+    def submit(self, name, func, *args, unique=False, app=None, **kwargs):
+        """
+        Queues function call and returns immediately.
+
+        The function is executed within the application context.
+
+        Args:
+            name (str): job name
+            func (function): function to execute
+            unique (bool, optional): if True and a job with the same name is
+                queued or running then the existing job is returned
+            app (flask app, optional): application used for the context.
+                Defaults to the current application.
+
+        Returns:
+            dict: job info
+        """
+        if app is None:
+            app = current_app._get_current_object()
+
+        with self._lock:
+            if unique:
+                for job in self._jobs.values():
+                    if job["name"] == name and job["status"] in (
+                        JOB_QUEUED,
+                        JOB_RUNNING,
+                    ):
+                        return dict(job)
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "name": name,
+                "status": JOB_QUEUED,
+                "created": datetime.datetime.now(),
+                "started": None,
+                "finished": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job["id"]] = job
+            self._prune()
+            self._futures[job["id"]] = self._executor.submit(
+                self._run, app, job, func, args, kwargs
+            )
+            return dict(job)
+
+    def get(self, job_id):
+        """
+        Returns job info.
+
+        Args:
+            job_id (str): job id
+
+        Returns:
+            dict: job info or None if the job does not exist
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    def wait(self, job_id, timeout=None):
+        """
+        Waits until job is done.
+
+        Args:
+            job_id (str): job id
+            timeout (float, optional): maximal waiting time in seconds
+
+        Returns:
+            dict: job info or None if the job does not exist
+        """
+        future = self._futures.get(job_id)
+        if future is not None:
+            wait([future], timeout)
+        return self.get(job_id)
+
+    def schedule(self, name, interval, func, app):
+        """
+        Submits unique job every interval seconds.
+
+        Scheduling a job with the same name again replaces previous schedule.
+
+        Args:
+            name (str): job name
+            interval (float): interval in seconds
+            func (function): function to execute
+            app (flask app): Flask application
+        """
+        self.unschedule(name)
+        stop_event = threading.Event()
+
+        def scheduler():
+            while not stop_event.wait(interval):
+                self.submit(name, func, unique=True, app=app)
+
+        thread = threading.Thread(
+            target=scheduler, name="ispyb-scheduler-%s" % name, daemon=True
+        )
+        self._schedules[name] = stop_event
+        thread.start()
+
+    def unschedule(self, name):
+        """
+        Stops periodic submission of the job.
+
+        Args:
+            name (str): job name
+        """
+        stop_event = self._schedules.pop(name, None)
+        if stop_event is not None:
+            stop_event.set()
+
+    def _run(self, app, job, func, args, kwargs):
+        with self._lock:
+            job["status"] = JOB_RUNNING
+            job["started"] = datetime.datetime.now()
+
+        try:
+            with app.app_context():
+                result = func(*args, **kwargs)
+        except Exception as ex:
+            log.exception("Job %s (%s) failed", job["name"], job["id"])
+            status, result, error = JOB_FAILED, None, str(ex)
+        else:
+            status, error = JOB_FINISHED, None
+
+        with self._lock:
+            job["status"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished"] = datetime.datetime.now()
+            self._futures.pop(job["id"], None)
+
+    def _prune(self):
+        # Drops oldest finished jobs, queued and running jobs are kept
+        for job_id in list(self._jobs):
+            if len(self._jobs) <= self.history_size:
+                break
+            if self._jobs[job_id]["status"] in (JOB_FINISHED, JOB_FAILED):
+                del self._jobs[job_id]
+
+
+job_queue = JobQueue()
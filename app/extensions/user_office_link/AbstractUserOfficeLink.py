@@ -43,6 +43,22 @@ class AbstractUserOfficeLink(object):
     def sync_all(self):
         """Main method to sync with user office"""
 
+    @abc.abstractmethod
+    def get_changes(self, since):
+        """Returns user office items created or modified after since.
+
+        Items are dicts with ISPyB column names. Proposals reference the
+        main proposer by personLogin and sessions reference the proposal
+        by proposalCode and proposalNumber.
+
+        Args:
+            since (datetime): modification time of the last sync
+
+        Returns:
+            dict: lists of persons, proposals and sessions and
+                last_modified time used as since in the next sync
+        """
+
     @abc.abstractmethod
     def update_proposal(self, code, number):
         """Updates proposal based on the code and number.
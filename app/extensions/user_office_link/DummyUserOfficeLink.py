@@ -22,8 +22,11 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 __license__ = "LGPLv3+"
 
 
+from datetime import datetime
+
 from flask import current_app
 from app.extensions.user_office_link.AbstractUserOfficeLink import AbstractUserOfficeLink
+from ispyb_core.modules import user_office
 
 
 class DummyUserOfficeLink(AbstractUserOfficeLink):
@@ -37,8 +40,17 @@ class DummyUserOfficeLink(AbstractUserOfficeLink):
         return
     
     def sync_all(self):
-        """Main method to sync with user office"""
-        print("Sync with user office")
+        """Syncs changes (none) reported by get_changes"""
+        return user_office.sync_changes(self)
+
+    def get_changes(self, since):
+        """Returns user office items modified after since"""
+        return {
+            "persons": [],
+            "proposals": [],
+            "sessions": [],
+            "last_modified": datetime.now(),
+        }
 
     def update_proposal(self, code, number):
         """Updates proposal based on the code and number.
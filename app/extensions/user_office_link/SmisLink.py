@@ -22,13 +22,16 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 __license__ = "LGPLv3+"
 
-from datetime import datetime, timedelta
+from datetime import datetime
 from suds.client import Client
 from suds.transport.http import HttpAuthenticated
 
 
 from app.extensions.user_office_link.AbstractUserOfficeLink import AbstractUserOfficeLink
-from ispyb_core.modules import proposal 
+from ispyb_core.modules import user_office
+
+
+SMIS_DATE_FORMAT = "%d/%m/%Y"
 
 
 class SmisLink(AbstractUserOfficeLink):
@@ -51,13 +54,75 @@ class SmisLink(AbstractUserOfficeLink):
             )
 
     def sync_all(self):
-        # Get 1 month old proposals
-        print("sync proposals")
-        past_str = datetime.strftime(datetime.now() - timedelta(days=30), '%d/%m/%YYYY')
-        now_str = datetime.strftime(datetime.now(), "%d/%m/%YYYY")
-        smis_proposals = self.smis_ws.service.findNewMXProposalPKs(past_str, now_str)
-        current_proposals = proposal.get_db_proposals()
-
-        print(smis_proposals)
-        print(current_proposals)
-        print("Done!")
\ No newline at end of file
+        """Syncs proposals modified since the last sync"""
+        return user_office.sync_changes(self)
+
+    def get_changes(self, since):
+        """Returns proposals, main proposers and sessions of proposals
+        created or modified after since.
+
+        Args:
+            since (datetime): modification time of the last sync
+
+        Returns:
+            dict: lists of persons, proposals and sessions
+        """
+        now = datetime.now()
+        proposal_pks = self.smis_ws.service.findNewMXProposalPKs(
+            datetime.strftime(since, SMIS_DATE_FORMAT),
+            datetime.strftime(now, SMIS_DATE_FORMAT),
+        )
+
+        persons = {}
+        proposals = []
+        sessions = []
+        for proposal_pk in proposal_pks or []:
+            proposers = self.smis_ws.service.findMainProposersForProposal(proposal_pk)
+            if not proposers:
+                continue
+            # Proposal has a single main proposer
+            proposer = proposers[0]
+            proposal_code = proposer.categCode
+            proposal_number = str(proposer.categCounter)
+
+            login = getattr(proposer, "loginName", None)
+            if login:
+                persons[login] = {
+                    "login": login,
+                    "givenName": getattr(proposer, "scientistFirstName", None),
+                    "familyName": getattr(proposer, "scientistName", None),
+                    "emailAddress": getattr(proposer, "scientistEmail", None),
+                    "siteId": getattr(proposer, "siteId", None),
+                }
+            proposals.append(
+                {
+                    "proposalCode": proposal_code,
+                    "proposalNumber": proposal_number,
+                    "title": getattr(proposer, "proposalTitle", None),
+                    "proposalType": "MX",
+                    "personLogin": login,
+                }
+            )
+
+            service = self.smis_ws.service
+            smis_sessions = service.findRecentSessionsInfoLightForProposalPk(proposal_pk)
+            for smis_session in smis_sessions or []:
+                sessions.append(
+                    {
+                        "expSessionPk": smis_session.pk,
+                        "proposalCode": proposal_code,
+                        "proposalNumber": proposal_number,
+                        "startDate": smis_session.startDate,
+                        "endDate": smis_session.endDate,
+                        "beamLineName": getattr(smis_session, "beamlineName", None),
+                        "nbShifts": getattr(smis_session, "shifts", None),
+                        "comments": getattr(smis_session, "comment", None),
+                    }
+                )
+
+        return {
+            "persons": list(persons.values()),
+            "proposals": proposals,
+            "sessions": sessions,
+            "last_modified": now,
+        }
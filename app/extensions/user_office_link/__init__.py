@@ -23,13 +23,12 @@ import datetime
 import importlib
 
 import time
-#import gevent
-#from gevent import monkey
-#monkey.patch_all()
 
 
 from flask import current_app
 
+from app.extensions.jobs import job_queue
+
 __license__ = "LGPLv3+"
 
 
@@ -49,14 +48,24 @@ class UserOfficeLink:
         self.site_user_office = cls()
         self.site_user_office.init_app(app)
 
-        #self.sync_polling = gevent.spawn_later(
-        #    10,
-        #    self.sync_with_user_office,
-        #    app
-        #)
+        sync_interval = app.config.get("USER_OFFICE_SYNC_INTERVAL")
+        if sync_interval:
+            job_queue.schedule(
+                "user_office_sync", sync_interval, self.sync_with_user_office, app
+            )
 
     def sync_with_user_office(self):
-        self.site_user_office.sync_all()
+        return self.site_user_office.sync_all()
+
+    def submit_sync_with_user_office(self):
+        """Queues sync with user office in the job queue.
+
+        Returns:
+            dict: job info
+        """
+        return job_queue.submit(
+            "user_office_sync", self.sync_with_user_office, unique=True
+        )
 
     def update_proposal(self, code, number):
         self.site_user_office.update_proposal(code, number)
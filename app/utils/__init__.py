@@ -19,7 +19,16 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
 
 
-def create_response_item(msg=None, num_items=None, data=None):
+import json
+
+from flask_restx import abort
+from flask_restx._http import HTTPStatus
+
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def create_response_item(msg=None, num_items=None, data=None, next_cursor=None):
     """
     Creates response dictionary.
 
@@ -28,12 +37,43 @@ def create_response_item(msg=None, num_items=None, data=None):
         error_msg ([type]): [description]
         num_items ([type]): [description]
         data ([type]): [description]
+        next_cursor (str): cursor of the next page when keyset pagination is used
 
     Returns:
         [type]: [description]
     """
 
     return {
-        "data": {"total": num_items, "rows": data},
+        "data": {"total": num_items, "rows": data, "next_cursor": next_cursor},
         "message": msg,
     }
+
+
+def get_json_list(request):
+    """
+    Returns list of dicts from a JSON array or NDJSON request body.
+
+    Args:
+        request ([type]): flask request
+
+    Returns:
+        list: list of dicts
+    """
+    try:
+        if request.mimetype == NDJSON_MIMETYPE:
+            data_list = [
+                json.loads(line)
+                for line in request.get_data(as_text=True).splitlines()
+                if line.strip()
+            ]
+        else:
+            data_list = json.loads(request.get_data(as_text=True))
+    except ValueError as ex:
+        abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to parse request body (%s)" % str(ex))
+
+    if not isinstance(data_list, list) or not all(
+        isinstance(data_dict, dict) for data_dict in data_list
+    ):
+        abort(HTTPStatus.NOT_ACCEPTABLE, "Request body should be a list of objects")
+
+    return data_list
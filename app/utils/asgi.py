@@ -0,0 +1,255 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import io
+import sys
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# WSGI environ key of threading.Event set when the client disconnects
+DISCONNECTED_ENVIRON_KEY = "ispyb.disconnected"
+
+log = logging.getLogger(__name__)
+
+
+class WsgiToAsgi:
+    """ASGI application running a WSGI application in a thread pool.
+
+    The event loop accepts and keeps connections while only requests that
+    are being processed occupy a thread. Blocking database and SOAP calls
+    of the Flask application are therefore offloaded to the pool and
+    response chunks are streamed back to the ASGI server as they are
+    produced. When the client disconnects the response iterator is closed
+    before the next chunk, so streams (server-sent events) release their
+    thread.
+
+    Prefetchers are coroutine functions awaited with the WSGI environ before
+    the request is offloaded. They run outbound calls of the request on the
+    event loop (for example async service connector lookups that fill its
+    cache), so the request thread does not wait for other services.
+
+    Attributes:
+        wsgi_app: WSGI application
+        executor (ThreadPoolExecutor): pool running the WSGI application
+        prefetchers (list): coroutine functions accepting WSGI environ
+    """
+
+    def __init__(self, wsgi_app, max_workers=None, executor=None, prefetchers=None):
+        self.wsgi_app = wsgi_app
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="asgi"
+            )
+        self.executor = executor
+        self.prefetchers = list(prefetchers or [])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.handle_lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError("Unsupported ASGI scope type %s" % scope["type"])
+
+        body = await read_body(receive)
+        if body is None:
+            return
+        environ = build_environ(scope, body)
+        await self.prefetch(environ)
+        disconnected = threading.Event()
+        environ[DISCONNECTED_ENVIRON_KEY] = disconnected
+        loop = asyncio.get_running_loop()
+        watcher = loop.create_task(watch_disconnect(receive, disconnected))
+        try:
+            await loop.run_in_executor(
+                self.executor, self.run_wsgi_app, environ, loop, send, disconnected
+            )
+        finally:
+            watcher.cancel()
+
+    async def prefetch(self, environ):
+        """Runs prefetchers concurrently.
+
+        Failed prefetchers are only logged, as the WSGI application repeats
+        the calls that were not prefetched.
+
+        Args:
+            environ (dict): WSGI environ
+        """
+        if not self.prefetchers:
+            return
+        results = await asyncio.gather(
+            *[prefetcher(environ) for prefetcher in self.prefetchers],
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning("ASGI prefetch failed (%s)", str(result))
+
+    async def handle_lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def run_wsgi_app(self, environ, loop, send, disconnected):
+        """Runs WSGI application in a worker thread.
+
+        Args:
+            environ (dict): WSGI environ
+            loop: event loop of the ASGI server
+            send: ASGI send coroutine
+            disconnected (threading.Event): set when the client disconnects
+        """
+        if disconnected.is_set():
+            return
+        response_start = {}
+
+        def call_send(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response_start.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response_start["status"] = int(status.split(" ", 1)[0])
+            response_start["headers"] = [
+                (name.lower().encode("latin1"), value.encode("latin1"))
+                for name, value in headers
+            ]
+
+        def send_response_start():
+            if not response_start.get("sent"):
+                response_start["sent"] = True
+                call_send(
+                    {
+                        "type": "http.response.start",
+                        "status": response_start["status"],
+                        "headers": response_start["headers"],
+                    }
+                )
+
+        response = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in response:
+                if disconnected.is_set():
+                    return
+                if chunk:
+                    send_response_start()
+                    call_send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+            send_response_start()
+            call_send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+
+
+async def read_body(receive):
+    """Reads the whole request body.
+
+    Args:
+        receive: ASGI receive coroutine
+
+    Returns:
+        bytes: request body or None if the client disconnected
+    """
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def watch_disconnect(receive, disconnected):
+    """Sets disconnected event when the client disconnects.
+
+    Args:
+        receive: ASGI receive coroutine
+        disconnected (threading.Event): event
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            disconnected.set()
+            return
+
+
+def build_environ(scope, body):
+    """Builds WSGI environ from ASGI http scope.
+
+    Args:
+        scope (dict): ASGI http scope
+        body (bytes): request body
+
+    Returns:
+        dict: WSGI environ
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path) :]
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("UTF-8").decode("latin1"),
+        "PATH_INFO": path.encode("UTF-8").decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/%s" % scope.get("http_version", "1.1"),
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1")
+        value = value.decode("latin1")
+        if name == "content-length":
+            continue
+        if name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        if key in environ:
+            value = environ[key] + "," + value
+        environ[key] = value
+    return environ
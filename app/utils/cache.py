@@ -0,0 +1,97 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """In-process cache with time to live and least recently used eviction.
+
+    Attributes:
+        ttl (float): default time to live of an entry in seconds
+        max_size (int): maximal number of entries kept in the cache
+    """
+
+    def __init__(self, ttl=60, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns cached value.
+
+        Args:
+            key (hashable): cache key
+            default (optional): value returned if the key is missing or expired
+
+        Returns:
+            cached value or default
+        """
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires is not None and expires < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Stores value in the cache.
+
+        Args:
+            key (hashable): cache key
+            value: value to store
+            ttl (float, optional): time to live in seconds. If None then the
+                default ttl is used. Zero or negative ttl disables caching.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is not None and ttl <= 0:
+            return
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._items[key] = (expires, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Removes key from the cache and returns its value."""
+        with self._lock:
+            item = self._items.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
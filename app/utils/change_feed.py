@@ -0,0 +1,224 @@
+"""Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import time
+import base64
+import binascii
+import threading
+
+import sqlalchemy
+
+
+class ChangeFeed:
+    """Feed of rows inserted into database tables.
+
+    Events are not kept in memory, they are read from the database tables.
+    Cursors contain the last auto increment id seen by the reader for each
+    table, so a cursor issued by one server process can be continued by any
+    other process (or after a restart) and rows written outside of the
+    application are reported as well.
+
+    Ids are allocated when rows are inserted, so a row of a transaction
+    committed after a transaction with a newer id is not reported.
+
+    Waiting readers of the process share the last ids of the tables, which
+    are read from the database at most once per poll_interval. notify()
+    (called after local commits) forces the next read and wakes up the
+    waiting readers.
+
+    Attributes:
+        feed_models (dict): event type -> SQLAlchemy ORM model with a single
+            auto increment primary key
+        poll_interval (float): in seconds
+    """
+
+    def __init__(self, feed_models, poll_interval=1):
+        self.feed_models = feed_models
+        self.poll_interval = poll_interval
+        self._last_ids = {}
+        self._read_time = None
+        self._read_generation = None
+        self._generation = 0
+        self._read_lock = threading.Lock()
+        self._condition = threading.Condition()
+
+    def notify(self):
+        """Wakes up waiting readers after new rows were committed."""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def get_last_ids(self, bind):
+        """Returns last ids of the feed tables.
+
+        Args:
+            bind ([type]): SQLAlchemy engine
+
+        Returns:
+            dict: event type -> last id
+        """
+        with self._read_lock:
+            with self._condition:
+                generation = self._generation
+            if (
+                self._read_generation == generation
+                and time.monotonic() - self._read_time < self.poll_interval
+            ):
+                return dict(self._last_ids)
+            self._last_ids = read_last_ids(bind, self.feed_models)
+            self._read_time = time.monotonic()
+            self._read_generation = generation
+            return dict(self._last_ids)
+
+    def read(self, bind, last_ids, limit=None):
+        """Returns rows inserted after last_ids.
+
+        Args:
+            bind ([type]): SQLAlchemy engine
+            last_ids (dict): event type -> last id known by the reader
+            limit (int, optional): maximal number of returned rows
+
+        Returns:
+            list: list of (event type, id, dict of column values) ordered by
+                event type and id
+        """
+        rows = []
+        with bind.connect() as connection:
+            for event_type, last_id in last_ids.items():
+                if limit and len(rows) >= limit:
+                    break
+                model = self.feed_models[event_type]
+                mapper = sqlalchemy.inspect(model)
+                id_column = mapper.primary_key[0]
+                query = (
+                    sqlalchemy.select([model.__table__])
+                    .where(id_column > last_id)
+                    .order_by(id_column)
+                )
+                if limit:
+                    query = query.limit(limit - len(rows))
+                for row in connection.execute(query):
+                    data = {
+                        prop.key: row[prop.columns[0]] for prop in mapper.column_attrs
+                    }
+                    rows.append((event_type, row[id_column], data))
+        return rows
+
+    def wait(self, bind, last_ids, timeout, disconnected=None):
+        """Waits until rows newer than last_ids are inserted.
+
+        Args:
+            bind ([type]): SQLAlchemy engine
+            last_ids (dict): event type -> last id known by the reader
+            timeout (float): maximal waiting time in seconds
+            disconnected (threading.Event, optional): set when the client
+                disconnects, waiting stops within poll_interval
+
+        Returns:
+            bool: True if there are new rows
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                generation = self._generation
+            current_ids = self.get_last_ids(bind)
+            if any(
+                current_ids.get(event_type, 0) > last_id
+                for event_type, last_id in last_ids.items()
+            ):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if disconnected is not None and disconnected.is_set():
+                return False
+            with self._condition:
+                if self._generation == generation:
+                    self._condition.wait(min(remaining, self.poll_interval))
+
+
+def read_last_ids(bind, feed_models):
+    """Returns max primary key value of each model table.
+
+    A new connection is used, so the rows committed since the previous call
+    are visible (a long lasting session would keep its snapshot).
+
+    Args:
+        bind ([type]): SQLAlchemy engine
+        feed_models (dict): event type -> SQLAlchemy ORM model
+
+    Returns:
+        dict: event type -> last id (0 if the table is empty)
+    """
+    last_ids = {}
+    with bind.connect() as connection:
+        for event_type, model in feed_models.items():
+            id_column = sqlalchemy.inspect(model).primary_key[0]
+            query = sqlalchemy.select([sqlalchemy.func.max(id_column)])
+            last_ids[event_type] = connection.execute(query).scalar() or 0
+    return last_ids
+
+
+def encode_cursor(last_ids):
+    """Encodes last ids as an opaque url safe string.
+
+    Args:
+        last_ids (dict): event type -> last id
+
+    Returns:
+        str: cursor
+    """
+    payload = json.dumps(last_ids, sort_keys=True, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("UTF-8")).decode("UTF-8")
+
+
+def decode_cursor(cursor, event_types):
+    """Decodes cursor created by encode_cursor.
+
+    Args:
+        cursor (str): cursor
+        event_types (list): event types of the feed
+
+    Raises:
+        ValueError: if the cursor is not valid
+
+    Returns:
+        dict: event type -> last id
+    """
+    try:
+        last_ids = json.loads(base64.urlsafe_b64decode(str(cursor).encode("UTF-8")))
+    except (binascii.Error, UnicodeError, ValueError) as ex:
+        raise ValueError("Invalid change feed cursor %s (%s)" % (cursor, str(ex)))
+
+    if (
+        not isinstance(last_ids, dict)
+        or set(last_ids) != set(event_types)
+        or not all(
+            isinstance(last_id, int) and not isinstance(last_id, bool)
+            for last_id in last_ids.values()
+        )
+    ):
+        raise ValueError("Invalid change feed cursor %s" % cursor)
+    return last_ids
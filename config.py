@@ -36,9 +36,46 @@ class BaseConfig:
     API_ROOT = "/ispyb/api/v1"
     SECRET_KEY = os.urandom(16)
     SQLALCHEMY_TRACK_MODIFICATIONS = True
-    # SQLALCHEMY_POOL_RECYCLE = 2999
-    # SQLALCHEMY_POOL_TIMEOUT = 20
+    # create_engine options (pool_size, max_overflow, pool_timeout, pool_recycle,
+    # pool_pre_ping, isolation_level). Can be defined in the database section
+    # of the config file. Pool size is per worker process.
+    DATABASE = {"pool_pre_ping": True}
+    # Reads of GET requests use this SQLALCHEMY_BINDS key if defined
+    READ_REPLICA_BIND = None
+    READ_YOUR_WRITES_WINDOW = 5  # in seconds, reads after a write use primary
+    READ_REPLICA_MAX_LAG = None  # in seconds, None disables the lag check
+    READ_REPLICA_LAG_CHECK_INTERVAL = 5  # in seconds
     PAGINATION_ITEMS_LIMIT = 20
+    # exact, estimate, cached or none. Can be overwritten by count query parameter
+    PAGINATION_COUNT_MODE = "exact"
+    PAGINATION_COUNT_CACHE_TTL = 60  # in seconds
+    # True or list of model names (for example ["DataCollection", "Image"])
+    # where filtering by not indexed columns is refused
+    FILTER_REQUIRE_INDEXED_COLUMNS = False
+    # Fields allowed in order_by per model name. Indexed columns are used for
+    # models not defined here
+    SORT_KEYS = {}
+    # ETag / Last-Modified headers and 304 responses for GET requests
+    CONDITIONAL_GET_ENABLED = True
+    # BLSession.lastUpdate is the session end time and is not used
+    LAST_MODIFIED_COLUMNS = ("recordTimeStamp",)
+
+    # br is used only if brotli package is installed
+    COMPRESSION_ENABLED = True
+    COMPRESSION_ALGORITHMS = ("br", "gzip")
+    COMPRESSION_MIN_SIZE = 1024  # in bytes
+    COMPRESSION_LEVEL = 6
+    # json, orjson or dotted path of a serializer function
+    JSON_SERIALIZER = "orjson"
+
+    CHANGE_FEED_POLL_INTERVAL = 1  # in seconds, database polling of waiting readers
+    CHANGE_FEED_MAX_TIMEOUT = 30  # in seconds, long polling timeout
+    CHANGE_FEED_SSE_DURATION = 300  # in seconds, server-sent events stream
+    BULK_INSERT_BATCH_SIZE = 1000
+    EXPORT_BATCH_SIZE = 1000  # rows fetched at once by NDJSON/CSV export
+    MULTI_GET_MAX_IDS = 1000  # ids accepted by a single ids= request
+    MULTI_GET_CHUNK_SIZE = 500  # ids in a single IN (...) query
+    BATCH_MAX_OPERATIONS = 1000  # operations accepted by a single /batch request
 
     DEBUG = True
     ERROR_404_HELP = False
@@ -64,7 +101,13 @@ class BaseConfig:
     AUTH_CLASS = "DummyAuth"
     JWT_CODING_ALGORITHM = "HS256"
     TOKEN_EXP_TIME = 60  # in minutes
+    AUTH_CLAIMS_CACHE_SIZE = 1024  # number of decoded tokens kept in memory
     MASTER_TOKEN = "MasterToken"
+    # Tokens are shared between workers by SQLiteTokenStore (TOKEN_STORE_URI is
+    # a file path) or RedisTokenStore (TOKEN_STORE_URI is a redis url)
+    TOKEN_STORE_MODULE = "app.extensions.auth.MemoryTokenStore"
+    TOKEN_STORE_CLASS = "MemoryTokenStore"
+    TOKEN_STORE_URI = None
 
     SWAGGER_UI_JSONEDITOR = True
     SWAGGER_UI_OAUTH_CLIENT_ID = "documentation"
@@ -73,10 +116,45 @@ class BaseConfig:
 
     CSRF_ENABLED = True
 
+    # Names of the imported route modules (for example ["proposals", "schemas"]),
+    # None imports all routes of the service
+    ENABLED_ROUTES = None
+
+    SCHEMAS_PRELOAD = False  # serializes all JSON schemas at startup
+    SCHEMAS_MAX_AGE = 86400  # Cache-Control max-age of schema responses in seconds
+
+    INSTRUMENTATION_ENABLED = True
+    SERVER_TIMING_HEADER = True
+    METRICS_PATH = "/metrics"
+    SLOW_QUERY_THRESHOLD = 1  # in seconds, None disables slow query log
+
     USER_OFFICE_LINK_MODULE = "app.extensions.user_office_link.DummyUserOfficeLink"
     USER_OFFICE_LINK_CLASS = "DummyUserOfficeLink"
-    #USER_OFFICE_SYNC_INTERVAL = 60 * 60 * 5 #in seconds
-    USER_OFFICE_SYNC_INTERVAL = 30
+    # Periodic sync in seconds (for example 60 * 60 * 5). It is scheduled by
+    # every server process, so enable it only in one process (for example a
+    # single worker or a dedicated instance). None disables it
+    USER_OFFICE_SYNC_INTERVAL = None
+    USER_OFFICE_SYNC_INITIAL_DAYS = 30  # first sync ever covers 30 days
+    USER_OFFICE_SYNC_BATCH_SIZE = 500  # rows written by a single statement
+
+    # Requests to other ISPyB services via API gateway
+    SERVICE_CONNECTOR_POOL_SIZE = 10  # kept alive connections
+    SERVICE_CONNECTOR_TIMEOUT = (3.05, 30)  # connect and read timeout in seconds
+    SERVICE_CONNECTOR_RETRIES = 0
+    SERVICE_AVAILABILITY_CACHE_TTL = 30  # in seconds
+    SERVICE_RESOURCE_CACHE_TTL = 60  # in seconds
+    SERVICE_RESOURCE_CACHE_SIZE = 1024  # number of cached responses
+
+    # The job table is kept in memory of each server process. Job status at
+    # /jobs/<job_id> is therefore available only when requests reach the
+    # process that accepted the job (single worker deployment or sticky
+    # sessions)
+    JOB_WORKERS = 2  # number of background job threads
+    JOB_HISTORY_SIZE = 100  # number of finished jobs kept in the job table
+
+    # Threads handling requests in ASGI mode (app:create_asgi_app). Keep it
+    # close to the database pool_size + max_overflow
+    ASGI_THREADS = 32
 
     def __init__(self, config_filename=None):
         with open(config_filename) as f:
@@ -85,6 +163,9 @@ class BaseConfig:
             for key, value in config["server"].items():
                 setattr(self, key, value)
 
+            if config.get("database") is not None:
+                self.DATABASE = {**self.DATABASE, **config["database"]}
+
             if config.get("authorization_rules") is not None:
                 self.AUTHORIZATION_RULES = {}
                 for key, value in config["authorization_rules"].items():
@@ -0,0 +1,2 @@
+cd ..
+uvicorn --factory --host 127.0.0.1 --port 4000 "app:create_asgi_app"
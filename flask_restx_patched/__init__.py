@@ -5,3 +5,4 @@ from .api import Api
 from .namespace import Namespace
 from .parameters import Parameters, PostFormParameters, PatchJSONParameters
 from .resource import Resource
+from .conditional import NotModified, set_validators
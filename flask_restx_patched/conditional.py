@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import flask
+from werkzeug.http import is_resource_modified
+
+
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+class NotModified(Exception):
+    """
+    Raised when the requested resource has not been modified since the version
+    identified by the conditional request headers.
+    """
+
+
+def set_validators(etag=None, last_modified=None):
+    """
+    Sets ETag and Last-Modified of the returned resource.
+
+    Called before the resource is serialized. If the request contains
+    If-None-Match or If-Modified-Since headers matching the validators then
+    NotModified is raised and Resource returns 304 without building the body.
+
+    :param str etag: entity tag of the resource
+    :param datetime last_modified: last modification of the resource
+    """
+    if not flask.has_request_context():
+        return
+    if flask.request.method not in CONDITIONAL_METHODS:
+        return
+    if not flask.current_app.config.get("CONDITIONAL_GET_ENABLED", True):
+        return
+
+    flask.g.etag = etag
+    flask.g.last_modified = last_modified
+    if not is_resource_modified(
+        flask.request.environ, etag=etag, last_modified=last_modified
+    ):
+        raise NotModified()
@@ -3,14 +3,58 @@
 import flask
 from flask_restx import Resource as OriginalResource
 from flask_restx._http import HTTPStatus
+from flask_restx.utils import unpack
 from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers import BaseResponse
+
+from .conditional import CONDITIONAL_METHODS, NotModified
 
 
 class Resource(OriginalResource):
     """
-    Extended Flast-RESTPlus Resource to add options method
+    Extended Flast-RESTPlus Resource to add options method and conditional
+    GET (ETag / Last-Modified) handling
     """
 
+    def dispatch_request(self, *args, **kwargs):
+        """
+        Adds ETag and Last-Modified headers to GET responses and returns 304
+        if the resource matches If-None-Match or If-Modified-Since headers.
+
+        Validators set by ``conditional.set_validators`` are used if the
+        method set them, otherwise ETag is a hash of the response body.
+        """
+        if (
+            flask.request.method not in CONDITIONAL_METHODS
+            or not flask.current_app.config.get("CONDITIONAL_GET_ENABLED", True)
+        ):
+            return super(Resource, self).dispatch_request(*args, **kwargs)
+
+        flask.g.etag = None
+        flask.g.last_modified = None
+        try:
+            response = super(Resource, self).dispatch_request(*args, **kwargs)
+        except NotModified:
+            response = flask.Response(status=HTTPStatus.NOT_MODIFIED)
+            response.set_etag(flask.g.etag)
+            if flask.g.last_modified:
+                response.last_modified = flask.g.last_modified
+            return response
+
+        if not isinstance(response, BaseResponse):
+            data, code, headers = unpack(response)
+            response = self.api.make_response(data, code, headers=headers)
+        if response.status_code != HTTPStatus.OK or response.is_streamed:
+            return response
+
+        if flask.g.etag:
+            response.set_etag(flask.g.etag)
+        else:
+            response.add_etag()
+        if flask.g.last_modified:
+            response.last_modified = flask.g.last_modified
+        return response.make_conditional(flask.request)
+
     @classmethod
     def _apply_decorator_to_methods(cls, decorator):
         """
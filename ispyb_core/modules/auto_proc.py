@@ -20,6 +20,7 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
 from app.extensions import db
+from app.utils import get_json_list
 from ispyb_core import models, schemas
 
 
@@ -40,19 +41,24 @@ def get_auto_procs(request):
     )
 
 
-def get_auto_proc_by_id(auto_proc_id):
+def get_auto_proc_by_id(auto_proc_id, fields=None):
     """
     Returns auto_proc by its id
 
     Args:
         auto_proc_id (int): corresponds to autoProcId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about auto_proc as dict
     """
     data_dict = {"autoProcId": auto_proc_id}
     return db.get_db_item_by_params(
-        models.AutoProc, schemas.auto_proc.ma_schema, data_dict
+        models.AutoProc,
+        schemas.auto_proc.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -86,19 +92,24 @@ def get_auto_proc_status(request):
     )
 
 
-def get_auto_proc_status_by_id(auto_proc_status_id):
+def get_auto_proc_status_by_id(auto_proc_status_id, fields=None):
     """
     Returns auto_proc_status by its auto_proc_statusId.
 
     Args:
         auto_proc_status (int): corresponds to auto_proc_statusId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about auto_proc_status as dict
     """
     data_dict = {"auto_proc_statusId": auto_proc_status_id}
     return db.get_db_item_by_params(
-        models.AutoProcStatus, schemas.auto_proc_status.ma_schema, data_dict
+        models.AutoProcStatus,
+        schemas.auto_proc_status.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -134,19 +145,24 @@ def get_auto_proc_programs(request):
     )
 
 
-def get_auto_proc_program_by_id(auto_proc_program_id):
+def get_auto_proc_program_by_id(auto_proc_program_id, fields=None):
     """
     Returns auto_proc_program by its auto_proc_programId
 
     Args:
         auto_proc_program (int): corresponds to auto_proc_programId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about auto_proc_program as dict
     """
     data_dict = {"autoProcProgramId": auto_proc_program_id}
     return db.get_db_item_by_params(
-        models.AutoProcProgram, schemas.auto_proc_program.ma_schema, data_dict
+        models.AutoProcProgram,
+        schemas.auto_proc_program.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -182,12 +198,15 @@ def get_auto_proc_program_attachments(request):
     )
 
 
-def get_auto_proc_program_attachment_by_id(auto_proc_program_attachment_id):
+def get_auto_proc_program_attachment_by_id(
+    auto_proc_program_attachment_id, fields=None
+):
     """
     Returns auto_proc_program_attachment by its auto_proc_program_attachmentId
 
     Args:
         auto_proc_program_attachment (int): corresponds to autoProcProgramAttachmentId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about auto_proc_program_attachment as dict
@@ -197,6 +216,8 @@ def get_auto_proc_program_attachment_by_id(auto_proc_program_attachment_id):
         models.AutoProcProgramAttachment,
         schemas.auto_proc_program_attachment.ma_schema,
         data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -234,12 +255,13 @@ def get_auto_proc_program_messages(request):
     )
 
 
-def get_auto_proc_program_message_by_id(auto_proc_program_message_id):
+def get_auto_proc_program_message_by_id(auto_proc_program_message_id, fields=None):
     """
     Returns auto_proc_program_message by its autoProcProgramMessageId
 
     Args:
         auto_proc_program_message (int): corresponds to autoProcProgramMessageId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about auto_proc_program_message as dict
@@ -249,6 +271,8 @@ def get_auto_proc_program_message_by_id(auto_proc_program_message_id):
         models.AutoProcProgramMessage,
         schemas.auto_proc_program_message.ma_schema,
         data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -267,3 +291,16 @@ def add_auto_proc_program_message(data_dict):
         schemas.auto_proc_program_message.ma_schema,
         data_dict,
     )
+
+
+def add_auto_proc_program_messages(request):
+    """
+    Adds list of auto_proc_program_message items in a single transaction
+
+    Args:
+        request ([type]): flask request with JSON array or NDJSON body
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_items(models.AutoProcProgramMessage, get_json_list(request))
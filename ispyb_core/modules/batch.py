@@ -0,0 +1,349 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import logging
+
+import sqlalchemy
+from flask import current_app
+from flask_restx import abort
+from flask_restx._http import HTTPStatus
+from werkzeug.exceptions import HTTPException
+
+from app.extensions import db
+from app.extensions.auth import auth_provider
+from app.utils import create_response_item
+
+from ispyb_core import models
+from ispyb_core.schemas import container as container_schemas
+from ispyb_core.schemas import crystal as crystal_schemas
+from ispyb_core.schemas import dewar as dewar_schemas
+from ispyb_core.schemas import protein as protein_schemas
+from ispyb_core.schemas import sample as sample_schemas
+from ispyb_core.schemas import shipping as shipping_schemas
+
+
+log = logging.getLogger(__name__)
+
+
+OPERATION_CREATE = "create"
+OPERATION_PATCH = "patch"
+OPERATION_DELETE = "delete"
+OPERATIONS = (OPERATION_CREATE, OPERATION_PATCH, OPERATION_DELETE)
+
+REF_KEY = "$ref"
+
+# Resources that can be written by a batch:
+# name -> (model, marshmallows schema, collection endpoint, item endpoint,
+#          allowed operations)
+# Allowed operations match the write methods of the resource routes and
+# endpoints are used to look up AUTHORIZATION_RULES of the operations
+BATCH_RESOURCES = {
+    "Shipping": (
+        models.Shipping,
+        shipping_schemas.ma_schema,
+        "shipments",
+        "shipment_by_id",
+        OPERATIONS,
+    ),
+    "Dewar": (
+        models.Dewar,
+        dewar_schemas.ma_schema,
+        "dewars",
+        "dewar_by_id",
+        (OPERATION_CREATE,),
+    ),
+    "Container": (
+        models.Container,
+        container_schemas.ma_schema,
+        "containers",
+        "container_by_id",
+        (OPERATION_CREATE,),
+    ),
+    "BLSample": (
+        models.BLSample,
+        sample_schemas.ma_schema,
+        "samples",
+        "sample_by_id",
+        (OPERATION_CREATE,),
+    ),
+    "Crystal": (
+        models.Crystal,
+        crystal_schemas.ma_schema,
+        "crystals",
+        "crystal_by_id",
+        (OPERATION_CREATE,),
+    ),
+    "Protein": (
+        models.Protein,
+        protein_schemas.ma_schema,
+        "proteins",
+        None,
+        (OPERATION_CREATE,),
+    ),
+}
+
+
+def run_batch(operations, auth_header=None):
+    """
+    Runs ordered list of create, patch and delete operations in a single
+    transaction.
+
+    Each operation is a dict:
+        {"op": "create", "resource": "Dewar", "data": {...}, "ref": "dewar1"}
+        {"op": "patch", "resource": "Dewar", "id": 1, "data": {...}}
+        {"op": "delete", "resource": "Dewar", "id": 1}
+
+    Values in data and id can be {"$ref": "dewar1"} (primary key of the item
+    created by the operation labelled dewar1) or {"$ref": "dewar1.code"}
+    (attribute of the item). Operations can also be referenced by their
+    index. Changes are flushed after every operation and committed once at
+    the end. If an operation fails then the whole batch is rolled back.
+
+    Before the transaction is opened every operation is checked against the
+    authorization rules of the resource endpoints (see check_authorization).
+
+    Args:
+        operations (list): list of operation dicts
+        auth_header (str, optional): Authorization header of the request
+
+    Returns:
+        dict, int: response dict with results of the operations and
+            HTTP status code
+    """
+    if not isinstance(operations, list) or not operations:
+        abort(HTTPStatus.NOT_ACCEPTABLE, "List of operations expected")
+    max_operations = current_app.config.get("BATCH_MAX_OPERATIONS", 1000)
+    if len(operations) > max_operations:
+        abort(
+            HTTPStatus.NOT_ACCEPTABLE,
+            "At most %d operations can be sent in a batch" % max_operations,
+        )
+    check_authorization(operations, auth_header)
+
+    results = []
+    results_by_ref = {}
+    for index, operation in enumerate(operations):
+        try:
+            result = run_operation(operation, results_by_ref)
+        except HTTPException as ex:
+            db.session.rollback()
+            message = getattr(ex, "data", {}).get("message") or ex.description
+            abort(ex.code, "Operation %d: %s" % (index, message))
+        except ValueError as ex:
+            db.session.rollback()
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Operation %d: %s" % (index, str(ex)))
+        except Exception as ex:
+            # db helpers re-raise database errors as Exception
+            log.exception("Batch operation %d failed", index)
+            db.session.rollback()
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Operation %d: %s" % (index, str(ex)))
+
+        results.append(result)
+        results_by_ref[str(index)] = result
+        if operation.get("ref") is not None:
+            results_by_ref[str(operation["ref"])] = result
+
+    try:
+        db.session.commit()
+    except sqlalchemy.exc.SQLAlchemyError as ex:
+        db.session.rollback()
+        abort(HTTPStatus.NOT_ACCEPTABLE, "Unable to commit batch (%s)" % str(ex))
+
+    return create_response_item(None, len(results), results), HTTPStatus.OK
+
+
+def run_operation(operation, results_by_ref):
+    """
+    Runs single batch operation without commit.
+
+    Args:
+        operation (dict): operation dict
+        results_by_ref (dict): results of the previous operations by
+            reference name
+
+    Raises:
+        ValueError: if the operation is not valid
+
+    Returns:
+        dict: operation result with resource, id and data
+    """
+    op, resource = get_operation_resource(operation)
+    sql_alchemy_model, ma_schema, _, _, _ = BATCH_RESOURCES[resource]
+    pk_name = get_pk_name(sql_alchemy_model)
+    data = resolve_refs(operation.get("data", {}), results_by_ref)
+    if not isinstance(data, dict):
+        raise ValueError("Data dict expected")
+
+    if op == OPERATION_CREATE:
+        item, _ = db.add_db_item(sql_alchemy_model, ma_schema, data, commit=False)
+        return {"op": op, "resource": resource, "id": item[pk_name], "data": item}
+
+    if "id" not in operation:
+        raise ValueError("Item id is required by %s operation" % op)
+    item_id_dict = {pk_name: resolve_refs(operation["id"], results_by_ref)}
+    if op == OPERATION_PATCH:
+        item = db.patch_db_item(
+            sql_alchemy_model, ma_schema, item_id_dict, data, commit=False
+        )
+        return {"op": op, "resource": resource, "id": item[pk_name], "data": item}
+
+    db.delete_db_item(sql_alchemy_model, item_id_dict, commit=False)
+    return {"op": op, "resource": resource, "id": item_id_dict[pk_name]}
+
+
+def get_operation_resource(operation):
+    """
+    Returns operation and resource names of a valid operation dict.
+
+    Args:
+        operation (dict): operation dict
+
+    Raises:
+        ValueError: if the operation or resource is not known or the
+            operation is not allowed on the resource
+
+    Returns:
+        str, str: operation and resource names
+    """
+    if not isinstance(operation, dict):
+        raise ValueError("Operation dict expected")
+    op = operation.get("op")
+    if op not in OPERATIONS:
+        raise ValueError(
+            "Unknown operation %s (available operations: %s)"
+            % (op, ", ".join(OPERATIONS))
+        )
+    resource = operation.get("resource")
+    if resource not in BATCH_RESOURCES:
+        raise ValueError(
+            "Unknown resource %s (available resources: %s)"
+            % (resource, ", ".join(sorted(BATCH_RESOURCES)))
+        )
+    allowed_operations = BATCH_RESOURCES[resource][4]
+    if op not in allowed_operations:
+        raise ValueError(
+            "Operation %s is not allowed on %s (allowed operations: %s)"
+            % (op, resource, ", ".join(allowed_operations))
+        )
+    return op, resource
+
+
+def get_operation_rules(op, resource):
+    """
+    Returns authorization rule keys that apply to a batch operation.
+
+    Create is allowed by the POST rule of the collection endpoint. Patch and
+    delete need the POST rule of the collection endpoint and the PATCH or
+    DELETE rule of the item endpoint.
+
+    Args:
+        op (str): operation name
+        resource (str): resource name
+
+    Returns:
+        list, list: (endpoint, method) tuples of rules applied if defined
+            and of rules that have to be defined
+    """
+    _, _, endpoint, item_endpoint, _ = BATCH_RESOURCES[resource]
+    if op == OPERATION_CREATE:
+        return [(endpoint, "post")], []
+    return [(endpoint, "post")], [(item_endpoint, op)]
+
+
+def check_authorization(operations, auth_header):
+    """
+    Aborts if the user is not allowed to run all operations.
+
+    Operations not allowed on the resource are refused with 406. Patch and
+    delete are refused with 401 unless the item endpoint has an
+    authorization rule granting the method to the user, so a batch never
+    writes more than the resource routes allow.
+
+    Args:
+        operations (list): list of operation dicts
+        auth_header (str): Authorization header of the request
+    """
+    user_roles = None
+    for index, operation in enumerate(operations):
+        try:
+            op, resource = get_operation_resource(operation)
+        except ValueError as ex:
+            abort(HTTPStatus.NOT_ACCEPTABLE, "Operation %d: %s" % (index, str(ex)))
+        rules, required_rules = get_operation_rules(op, resource)
+        for rule in rules + required_rules:
+            roles = auth_provider.authorization_rules.get(rule)
+            if roles is None:
+                if rule in required_rules:
+                    abort(
+                        HTTPStatus.UNAUTHORIZED,
+                        "Operation %d: no authorization rule allows to %s %s"
+                        % (index, op, resource),
+                    )
+                continue
+            if user_roles is None:
+                user_info = auth_provider.get_user_info_by_auth_header(auth_header)
+                user_roles = user_info.get("roles") or ()
+            if roles.isdisjoint(user_roles):
+                abort(
+                    HTTPStatus.UNAUTHORIZED,
+                    "Operation %d: roles %s have no appropriate role (%s) to %s %s"
+                    % (index, str(user_roles), str(sorted(roles)), op, resource),
+                )
+
+
+def resolve_refs(value, results_by_ref):
+    """
+    Replaces {"$ref": "name"} and {"$ref": "name.attribute"} values by the
+    primary key or attribute of previously created or patched item.
+
+    Args:
+        value: value possibly containing references
+        results_by_ref (dict): results of the previous operations
+
+    Raises:
+        ValueError: if the reference does not exist
+
+    Returns:
+        value with resolved references
+    """
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            ref_name, _, attribute = str(value[REF_KEY]).partition(".")
+            result = results_by_ref.get(ref_name)
+            if result is None:
+                raise ValueError("Unknown reference %s" % value[REF_KEY])
+            if not attribute:
+                return result["id"]
+            if attribute not in result.get("data", {}):
+                raise ValueError("Unknown reference %s" % value[REF_KEY])
+            return result["data"][attribute]
+        return {key: resolve_refs(item, results_by_ref) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(item, results_by_ref) for item in value]
+    return value
+
+
+def get_pk_name(sql_alchemy_model):
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    return mapper.get_property_by_column(mapper.primary_key[0]).key
@@ -73,5 +73,8 @@ def get_beamline_setup_by_id(beamline_setup_id):
     """
     data_dict = {"beamLineSetupId": beamline_setup_id}
     return db.get_db_item_by_params(
-        models.BeamLineSetup, schemas.beamline_setup.ma_schema, data_dict
+        models.BeamLineSetup,
+        schemas.beamline_setup.ma_schema,
+        data_dict,
+        conditional=True,
     )
@@ -0,0 +1,336 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import json
+import time
+import logging
+
+import sqlalchemy
+from flask import Response, current_app, has_app_context, stream_with_context
+from flask_restx._http import HTTPStatus
+
+from app.extensions import db
+from app.extensions.auth import auth_provider
+from app.utils import create_response_item
+from app.utils.asgi import DISCONNECTED_ENVIRON_KEY
+from app.utils.change_feed import ChangeFeed, decode_cursor, encode_cursor
+
+from ispyb_core import models
+from ispyb_core.schemas import auto_proc_program as auto_proc_program_schemas
+from ispyb_core.schemas import (
+    auto_proc_program_message as auto_proc_program_message_schemas,
+)
+from ispyb_core.schemas import auto_proc_status as auto_proc_status_schemas
+from ispyb_core.schemas import data_collection as data_collection_schemas
+
+
+log = logging.getLogger(__name__)
+
+
+# Tables with a single auto increment primary key
+FEED_MODELS = {
+    "AutoProcStatus": (models.AutoProcStatus, auto_proc_status_schemas.ma_schema),
+    "AutoProcProgram": (models.AutoProcProgram, auto_proc_program_schemas.ma_schema),
+    "AutoProcProgramMessage": (
+        models.AutoProcProgramMessage,
+        auto_proc_program_message_schemas.ma_schema,
+    ),
+    "DataCollection": (models.DataCollection, data_collection_schemas.ma_schema),
+}
+
+SESSION_INFO_KEY = "change_feed_inserts"
+
+
+def init_app(app, **kwargs):
+    # pylint: disable=unused-argument
+    """
+    Creates the change feed of the app and registers SQLAlchemy events
+    waking up waiting readers after local inserts.
+
+    Args:
+        app (Flask app): flask app
+    """
+    app.extensions["change_feed"] = ChangeFeed(
+        {event_type: model for event_type, (model, _) in FEED_MODELS.items()},
+        app.config.get("CHANGE_FEED_POLL_INTERVAL", 1),
+    )
+
+    for model, _ in FEED_MODELS.values():
+        if not sqlalchemy.event.contains(model, "after_insert", record_insert):
+            sqlalchemy.event.listen(model, "after_insert", record_insert)
+
+    if record_bulk_insert not in db.bulk_insert_listeners:
+        db.bulk_insert_listeners.append(record_bulk_insert)
+
+    for event_name, listener in (
+        ("after_commit", notify_changes),
+        ("after_rollback", discard_changes),
+    ):
+        if not sqlalchemy.event.contains(sqlalchemy.orm.Session, event_name, listener):
+            sqlalchemy.event.listen(sqlalchemy.orm.Session, event_name, listener)
+
+
+def get_change_feed():
+    """Returns change feed of the current app."""
+    return current_app.extensions["change_feed"]
+
+
+def create_event(event_type, row_id, data, cursor):
+    """
+    Returns change event.
+
+    Args:
+        event_type (str): name of the model in FEED_MODELS
+        row_id (int): primary key value
+        data (dict): column values
+        cursor (str): cursor pointing after the event
+
+    Returns:
+        dict: change event
+    """
+    model, ma_schema = FEED_MODELS[event_type]
+    mapper = sqlalchemy.inspect(model)
+    return {
+        "type": event_type,
+        "action": "insert",
+        "key": {mapper.get_property_by_column(mapper.primary_key[0]).key: row_id},
+        "data": ma_schema.dump(data)[0],
+        "cursor": cursor,
+    }
+
+
+def record_insert(mapper, connection, target):
+    # pylint: disable=unused-argument
+    """Marks the session of the inserted db item."""
+    session = sqlalchemy.inspect(target).session
+    if session is not None:
+        session.info[SESSION_INFO_KEY] = True
+
+
+def record_bulk_insert(session, sql_alchemy_model, mappings):
+    # pylint: disable=unused-argument
+    """Marks the session of items inserted by add_db_items."""
+    if sql_alchemy_model.__name__ in FEED_MODELS:
+        session.info[SESSION_INFO_KEY] = True
+
+
+def notify_changes(session):
+    """Wakes up waiting readers of this process after commit of inserts."""
+    if session.info.pop(SESSION_INFO_KEY, False) and has_app_context():
+        change_feed = current_app.extensions.get("change_feed")
+        if change_feed is not None:
+            change_feed.notify()
+
+
+def discard_changes(session):
+    """Discards inserts of the rolled back session."""
+    session.info.pop(SESSION_INFO_KEY, None)
+
+
+def get_changes(request):
+    """
+    Returns items inserted after the since cursor.
+
+    Waits up to timeout seconds (long polling) if there are no new items.
+    Returned next_cursor should be passed as since in the next request.
+    Items are read from the database, so the cursor can be used with any
+    server process and items inserted by other applications are returned.
+
+    Args:
+        request ([type]): flask request
+
+    Returns:
+        dict, int: response dict and HTTP status code
+    """
+    user_info = auth_provider.get_user_info_by_auth_header(
+        request.headers.get("Authorization")
+    )
+    if not user_info.get("is_admin"):
+        return {"message": "Change feed is available for managers"}, (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    try:
+        since, timeout, limit, event_types = parse_feed_params(request.args)
+    except ValueError as ex:
+        return {"message": str(ex)}, HTTPStatus.NOT_ACCEPTABLE
+
+    events, next_cursor = read_changes(
+        since,
+        timeout,
+        event_types,
+        limit,
+        request.environ.get(DISCONNECTED_ENVIRON_KEY),
+    )
+    return (
+        create_response_item(None, len(events), events, next_cursor),
+        HTTPStatus.OK,
+    )
+
+
+def read_changes(since, timeout, event_types=None, limit=None, disconnected=None):
+    """
+    Returns change events of the items inserted after the since cursor.
+
+    Args:
+        since (str): cursor returned by the previous call or None
+        timeout (float): maximal waiting time in seconds
+        event_types (list, optional): returned event types
+        limit (int, optional): maximal number of returned events
+        disconnected (threading.Event, optional): set when the client
+            disconnects, waiting stops within CHANGE_FEED_POLL_INTERVAL
+
+    Returns:
+        tuple: list of events, next cursor
+    """
+    change_feed = get_change_feed()
+    bind = db.engine
+
+    if since is None:
+        return [], encode_cursor(change_feed.get_last_ids(bind))
+
+    cursor_ids = decode_cursor(since, FEED_MODELS)
+    if event_types:
+        # Not requested types are skipped
+        current_ids = change_feed.get_last_ids(bind)
+        for event_type in set(FEED_MODELS) - set(event_types):
+            cursor_ids[event_type] = max(
+                cursor_ids[event_type], current_ids[event_type]
+            )
+    read_ids = {
+        event_type: cursor_ids[event_type]
+        for event_type in FEED_MODELS
+        if not event_types or event_type in event_types
+    }
+
+    rows = change_feed.read(bind, read_ids, limit)
+    if not rows and timeout > 0:
+        if change_feed.wait(bind, read_ids, timeout, disconnected):
+            rows = change_feed.read(bind, read_ids, limit)
+
+    events = []
+    for event_type, row_id, data in rows:
+        cursor_ids[event_type] = row_id
+        events.append(create_event(event_type, row_id, data, encode_cursor(cursor_ids)))
+    return events, encode_cursor(cursor_ids)
+
+
+def get_changes_stream(request):
+    """
+    Returns server-sent events stream with change events.
+
+    Stream is closed after CHANGE_FEED_SSE_DURATION seconds and the client
+    reconnects with the Last-Event-ID header.
+
+    Args:
+        request ([type]): flask request
+
+    Returns:
+        Response: flask response
+    """
+    user_info = auth_provider.get_user_info_by_auth_header(
+        request.headers.get("Authorization")
+    )
+    if not user_info.get("is_admin"):
+        return {"message": "Change feed is available for managers"}, (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    query_params = request.args.to_dict()
+    if request.headers.get("Last-Event-ID"):
+        query_params["since"] = request.headers.get("Last-Event-ID")
+    try:
+        since, _, limit, event_types = parse_feed_params(query_params)
+    except ValueError as ex:
+        return {"message": str(ex)}, HTTPStatus.NOT_ACCEPTABLE
+
+    duration = current_app.config.get("CHANGE_FEED_SSE_DURATION", 300)
+    keepalive = current_app.config.get("CHANGE_FEED_MAX_TIMEOUT", 30)
+
+    disconnected = request.environ.get(DISCONNECTED_ENVIRON_KEY)
+
+    def generate(since):
+        if since is None:
+            _, since = read_changes(None, 0)
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            if disconnected is not None and disconnected.is_set():
+                return
+            events, since = read_changes(
+                since,
+                min(keepalive, deadline - time.monotonic()),
+                event_types,
+                limit,
+                disconnected,
+            )
+            for event in events:
+                yield "id: %s\nevent: %s\ndata: %s\n\n" % (
+                    event["cursor"],
+                    event["type"],
+                    json.dumps(event, default=str),
+                )
+            if not events:
+                yield ": keepalive\n\n"
+
+    return Response(
+        stream_with_context(generate(since)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def parse_feed_params(query_params):
+    """
+    Parses since, timeout, limit and types query parameters.
+
+    Args:
+        query_params (dict): query parameters
+
+    Raises:
+        ValueError: if a parameter is not valid
+
+    Returns:
+        tuple: since cursor (str or None), timeout (float), limit (int),
+            event types
+    """
+    since = query_params.get("since") or None
+    if since is not None:
+        decode_cursor(since, FEED_MODELS)
+    timeout = min(
+        float(query_params.get("timeout", 0)),
+        current_app.config.get("CHANGE_FEED_MAX_TIMEOUT", 30),
+    )
+    limit = int(
+        query_params.get("limit", current_app.config.get("PAGINATION_ITEMS_LIMIT"))
+    )
+    event_types = None
+    if query_params.get("types"):
+        event_types = query_params.get("types").split(",")
+        unknown_types = set(event_types) - set(FEED_MODELS)
+        if unknown_types:
+            raise ValueError(
+                "Unknown event types %s (available types: %s)"
+                % (", ".join(sorted(unknown_types)), ", ".join(FEED_MODELS))
+            )
+    return since, max(timeout, 0), limit, event_types
@@ -40,16 +40,19 @@ def get_persons(request):
     )
 
 
-def get_person_by_params(param_dict):
+def get_person_by_params(param_dict, conditional=False):
     """Returns person by its id.
 
     Args:
         person_id (int): corresponds to personId in db
+        conditional (bool, optional): set ETag of the response from the person
 
     Returns:
         dict: info about person as dict
     """
-    return db.get_db_item_by_params(models.Person, schemas.person.ma_schema, param_dict)
+    return db.get_db_item_by_params(
+        models.Person, schemas.person.ma_schema, param_dict, conditional=conditional
+    )
 
 
 def get_person_id_by_login(login_name):
@@ -140,9 +143,12 @@ def get_lab_contacts(request):
     )
 
 
-def get_lab_contact_by_params(param_dict):
+def get_lab_contact_by_params(param_dict, conditional=False):
     return db.get_db_item_by_params(
-        models.LabContact, schemas.lab_contact.ma_schema, param_dict
+        models.LabContact,
+        schemas.lab_contact.ma_schema,
+        param_dict,
+        conditional=conditional,
     )
 
 
@@ -200,18 +206,23 @@ def add_laboratory(data_dict):
     return db.add_db_item(models.Laboratory, schemas.laboratory.ma_schema, data_dict)
 
 
-def get_laboratory_by_id(laboratory_id):
+def get_laboratory_by_id(laboratory_id, fields=None):
     """Returns laboratory info by its laboratoryId
 
     Args:
         laboratory_id (int): corresponds to laboratoryId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about laboratory as dict
     """
     data_dict = {"laboratoryId": laboratory_id}
     return db.get_db_item_by_params(
-        models.Laboratory, schemas.laboratory.ma_schema, data_dict
+        models.Laboratory,
+        schemas.laboratory.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
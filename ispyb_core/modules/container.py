@@ -43,18 +43,23 @@ def get_containers(request):
     )
 
 
-def get_container_by_id(container_id):
+def get_container_by_id(container_id, fields=None):
     """Returns container by its container_id
 
     Args:
         container_id (int): corresponds to containerId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about container as dict
     """
     id_dict = {"containerId": container_id}
     return db.get_db_item_by_params(
-        models.Container, schemas.container.ma_schema, id_dict
+        models.Container,
+        schemas.container.ma_schema,
+        id_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
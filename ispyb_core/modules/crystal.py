@@ -42,19 +42,24 @@ def get_crystals(request):
     )
 
 
-def get_crystal_by_id(crystal_id):
+def get_crystal_by_id(crystal_id, fields=None):
     """
     Returns crystal by its crystalId
 
     Args:
         crystal_id (int): corresponds to crystalId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about crystal as dict
     """
     data_dict = {"crystalId": crystal_id}
     return db.get_db_item_by_params(
-        models.Crystal, schemas.crystal.ma_schema, data_dict
+        models.Crystal,
+        schemas.crystal.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -25,6 +25,7 @@ __license__ = "LGPLv3+"
 import logging
 
 from app.extensions import db
+from app.utils import get_json_list
 
 from ispyb_core import models, schemas
 
@@ -67,19 +68,50 @@ def add_data_collection(data_dict):
     )
 
 
-def get_data_collection_by_id(data_collection_id):
+def add_data_collections(request):
+    """
+    Adds list of data collection items in a single transaction
+
+    Args:
+        request ([type]): flask request with JSON array or NDJSON body
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_items(models.DataCollection, get_json_list(request))
+
+
+def add_images(request):
+    """
+    Adds list of image items in a single transaction
+
+    Args:
+        request ([type]): flask request with JSON array or NDJSON body
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_items(models.Image, get_json_list(request))
+
+
+def get_data_collection_by_id(data_collection_id, fields=None):
     """
     Returns data_collection by its id
 
     Args:
         data_collection_id (int): corresponds to dataCollectionId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about data_collection as dict
     """
     data_dict = {"dataCollectionId": data_collection_id}
     return db.get_db_item_by_params(
-        models.DataCollection, schemas.data_collection.ma_schema, data_dict
+        models.DataCollection,
+        schemas.data_collection.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -119,12 +151,13 @@ def add_data_collection_group(data_dict):
     )
 
 
-def get_data_collection_group_by_id(data_collection_group_id):
+def get_data_collection_group_by_id(data_collection_group_id, fields=None):
     """
     Returns data collection group by its id.
 
     Args:
         data_collection_group_id (int): corresponds to dataCollectionGroupId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about data collection group as dict
@@ -132,5 +165,9 @@ def get_data_collection_group_by_id(data_collection_group_id):
     data_dict = {"dataCollectionGroupId": data_collection_group_id}
 
     return db.get_db_item_by_params(
-        models.DataCollectionGroup, schemas.data_collection_group.ma_schema, data_dict
+        models.DataCollectionGroup,
+        schemas.data_collection_group.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
@@ -43,17 +43,24 @@ def get_dewars(request):
     )
 
 
-def get_dewar_by_id(dewar_id):
+def get_dewar_by_id(dewar_id, fields=None):
     """Returns dewar by its dewar_id
 
     Args:
         dewar_id (int): corresponds to dewarId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about dewar as dict
     """
     id_dict = {"dewarId": dewar_id}
-    return db.get_db_item_by_params(models.Dewar, schemas.dewar.ma_schema, id_dict)
+    return db.get_db_item_by_params(
+        models.Dewar,
+        schemas.dewar.ma_schema,
+        id_dict,
+        fields=fields,
+        conditional=True,
+    )
 
 
 def add_dewar(data_dict):
@@ -22,6 +22,9 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 __license__ = "LGPLv3+"
 
 
+from app.extensions import db
+from app.utils import get_json_list
+
 from ispyb_core import models, schemas
 
 
@@ -36,3 +39,16 @@ def get_image_quality_indicators():
     return schemas.image_quality_indicators.ma_schema.dump(
         image_quality_indicators_list
     )
+
+
+def add_image_quality_indicators(request):
+    """
+    Adds list of image quality indicators in a single transaction
+
+    Args:
+        request ([type]): flask request with JSON array or NDJSON body
+
+    Returns:
+        [type]: [description]
+    """
+    return db.add_db_items(models.ImageQualityIndicator, get_json_list(request))
@@ -24,12 +24,14 @@ __license__ = "LGPLv3+"
 
 import logging
 from flask_restx._http import HTTPStatus
+from sqlalchemy.orm import joinedload
 
 from app.extensions import db, auth_provider
 from app.utils import create_response_item
 
 from ispyb_core import models, schemas
-from ispyb_core.modules import contacts, session
+from ispyb_core.modules import contacts
+from ispyb_core.schemas import proposal_info as proposal_info_schemas
 
 
 log = logging.getLogger(__name__)
@@ -56,10 +58,8 @@ def get_proposals(request):
         query_params["personId"] = person_id
 
     if run_query:
-        return (
-            get_db_proposals(query_params),
-            HTTPStatus.OK,
-        )
+        # Returned without status code as it can be a streamed response
+        return get_db_proposals(query_params)
     else:
         msg = "No proposals associated to the username %s" % user_info["username"]
         return create_response_item(msg=msg), HTTPStatus.OK
@@ -74,25 +74,33 @@ def get_db_proposals(query_params={}):
     )
 
 
-def get_proposal_by_id(proposal_id):
+def get_proposal_by_id(proposal_id, fields=None):
     """
     Returns proposal by its proposalId
 
     Args:
         proposal_id (int): corresponds to proposalId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about proposal as dict
     """
     id_dict = {"proposalId": proposal_id}
     return db.get_db_item_by_params(
-        models.Proposal, schemas.proposal.ma_schema, id_dict
+        models.Proposal,
+        schemas.proposal.ma_schema,
+        id_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
 def get_proposal_info_by_id(proposal_id):
     """
-    Returns proposal by its proposalId
+    Returns proposal with its person and sessions by its proposalId
+
+    Person is joined in the proposal query and sessions are loaded
+    with a second query.
 
     Args:
         proposal_id (int): corresponds to proposalId in db
@@ -100,13 +108,18 @@ def get_proposal_info_by_id(proposal_id):
     Returns:
         dict: info about proposal as dict
     """
-    proposal_json = get_proposal_by_id(proposal_id)
-
-    person_json = contacts.get_person_by_params({"personId": proposal_json["personId"]})
-    proposal_json["person"] = person_json
+    id_dict = {"proposalId": proposal_id}
+    proposal_json = db.get_db_item_by_params(
+        models.Proposal,
+        proposal_info_schemas.ma_schema,
+        id_dict,
+        options=(joinedload(models.Proposal.Person),),
+    )
 
-    sessions_json = session.get_sessions({"proposalId": proposal_id})
-    proposal_json["sessions"] = sessions_json
+    session_list = models.BLSession.query.filter_by(proposalId=proposal_id).all()
+    proposal_json["sessions"] = schemas.session.ma_schema.dump(
+        session_list, many=True
+    )[0]
 
     return proposal_json
 
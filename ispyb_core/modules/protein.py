@@ -42,19 +42,24 @@ def get_proteins(request):
     )
 
 
-def get_protein_by_id(protein_id):
+def get_protein_by_id(protein_id, fields=None):
     """
     Returns protein by its proteinId
 
     Args:
         protein (int): corresponds to proteinId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about protein as dict
     """
     data_dict = {"proteinId": protein_id}
     return db.get_db_item_by_params(
-        models.Protein, schemas.protein.ma_schema, data_dict
+        models.Protein,
+        schemas.protein.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
@@ -43,19 +43,24 @@ def get_samples(request):
     )
 
 
-def get_sample_by_id(sample_id):
+def get_sample_by_id(sample_id, fields=None):
     """
     Returns sample by its sampleId.
 
     Args:
         sample (int): corresponds to sampleId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about sample as dict
     """
     data_dict = {"sampleId": sample_id}
     return db.get_db_item_by_params(
-        models.BLSample, schemas.sample.ma_schema, data_dict
+        models.BLSample,
+        schemas.sample.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
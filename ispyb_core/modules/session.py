@@ -23,11 +23,17 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 __license__ = "LGPLv3+"
 
 
+from sqlalchemy.orm import joinedload
+
 from app.extensions import db
 
 from ispyb_core import models, schemas
+from ispyb_core.schemas import session_info as session_info_schemas
 
-from ispyb_core.modules import beamline_setup, data_collection, proposal
+SESSION_INFO_OPTIONS = (
+    joinedload(models.BLSession.Proposal),
+    joinedload(models.BLSession.BeamLineSetup),
+)
 
 
 def get_sessions(request):
@@ -61,41 +67,66 @@ def add_session(data_dict):
     return db.add_db_item(models.BLSession, schemas.session.ma_schema, data_dict)
 
 
-def get_session_by_id(session_id):
+def get_session_by_id(session_id, fields=None):
     """Returns session info by its sessionId
 
     Args:
         session_id (int): corresponds to sessionId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about session as dict
     """
     data_dict = {"sessionId": session_id}
     return db.get_db_item_by_params(
-        models.BLSession, schemas.session.ma_schema, data_dict
+        models.BLSession,
+        schemas.session.ma_schema,
+        data_dict,
+        fields=fields,
+        conditional=True,
+    )
+
+
+def get_sessions_info(request):
+    """Returns sessions with proposal and beamline setup based on query parameters.
+
+    Proposal and beamline setup are joined in the same query.
+
+    Args:
+        request ([type]): flask request
+
+    Returns:
+        dict: response dict
+    """
+    query_params = request.args.to_dict()
+
+    return db.get_db_items(
+        models.BLSession,
+        schemas.session.dict_schema,
+        session_info_schemas.ma_schema,
+        query_params,
+        options=SESSION_INFO_OPTIONS,
     )
 
 
 def get_session_info_by_id(session_id):
     """Returns session info by its sessionId
 
+    Proposal and beamline setup are joined in the same query.
+
     Args:
         session_id (int): corresponds to sessionId in db
 
     Returns:
         dict: info about session as dict
     """
-    session_json = get_session_by_id(session_id)
-    if session_json:
-        session_json["proposal"] = proposal.get_proposal_by_id(
-            session_json["proposalId"]
-        )
-        session_json["beamline_setup"] = beamline_setup.get_beamline_setup_by_id(
-            session_json["beamLineSetupId"]
-        )
-        # session_json["data_collections_groups"] = data_collection.get_data_collection_groups({"sessionId" : session_id})["data"]["rows"]
-
-    return session_json
+    data_dict = {"sessionId": session_id}
+    return db.get_db_item_by_params(
+        models.BLSession,
+        session_info_schemas.ma_schema,
+        data_dict,
+        options=SESSION_INFO_OPTIONS,
+    )
 
 
 def get_sessions_by_date(start_date=None, end_date=None, beamline=None):
@@ -40,19 +40,24 @@ def get_shipments(request):
     )
 
 
-def get_shipment_by_id(shipment_id):
+def get_shipment_by_id(shipment_id, fields=None):
     """
     Returns shipment by its shipmentId
 
     Args:
         shipment_id (int): corresponds to shipmentId in db
+        fields (str, optional): comma separated list of returned fields
 
     Returns:
         dict: info about shipment as dict
     """
     id_dict = {"shippingId": shipment_id}
     return db.get_db_item_by_params(
-        models.Shipping, schemas.shipping.ma_schema, id_dict
+        models.Shipping,
+        schemas.shipping.ma_schema,
+        id_dict,
+        fields=fields,
+        conditional=True,
     )
 
 
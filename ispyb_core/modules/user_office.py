@@ -0,0 +1,373 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+import logging
+import datetime
+
+import sqlalchemy
+from flask import current_app
+from sqlalchemy.dialects import mysql
+
+from app.extensions import db
+from app.extensions.flask_sqlalchemy import bulk_insert
+
+from ispyb_core import models
+
+
+log = logging.getLogger(__name__)
+
+
+# Attributes identifying user office items in ISPyB
+PERSON_KEY = ("login",)
+PROPOSAL_KEY = ("proposalCode", "proposalNumber")
+SESSION_KEY = ("expSessionPk",)
+
+# AdminVar name of the modification time up to which changes are synced
+HIGH_WATER_MARK_NAME = "userOfficeSyncHighWaterMark"
+
+
+def sync_changes(user_office_link):
+    """
+    Applies changes reported by the user office since the last sync.
+
+    Persons, proposals and sessions returned by
+    user_office_link.get_changes are compared with the db items having the
+    same keys and only new or modified items are written. All changes are
+    applied in a single transaction together with the high water mark,
+    which is stored in the AdminVar table so that it is shared by server
+    processes and kept across restarts.
+
+    Args:
+        user_office_link (AbstractUserOfficeLink): user office link
+
+    Returns:
+        dict: number of inserted and updated items per item type
+    """
+    since = get_high_water_mark()
+    if since is None:
+        since = datetime.datetime.now() - datetime.timedelta(
+            days=current_app.config.get("USER_OFFICE_SYNC_INITIAL_DAYS", 30)
+        )
+    changes = user_office_link.get_changes(since)
+    batch_size = current_app.config.get("USER_OFFICE_SYNC_BATCH_SIZE", 500)
+
+    summary = {}
+    try:
+        person_ids, summary["persons"] = sync_items(
+            models.Person, PERSON_KEY, changes.get("persons", []), batch_size
+        )
+
+        proposals = resolve_ids(
+            changes.get("proposals", []),
+            ("personLogin",),
+            person_ids,
+            models.Person,
+            PERSON_KEY,
+            "personId",
+        )
+        proposal_ids, summary["proposals"] = sync_items(
+            models.Proposal, PROPOSAL_KEY, proposals, batch_size
+        )
+
+        sessions = resolve_ids(
+            changes.get("sessions", []),
+            PROPOSAL_KEY,
+            proposal_ids,
+            models.Proposal,
+            PROPOSAL_KEY,
+            "proposalId",
+        )
+        _, summary["sessions"] = sync_items(
+            models.BLSession, SESSION_KEY, sessions, batch_size
+        )
+
+        set_high_water_mark(changes.get("last_modified") or since)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    log.info("Sync with user office since %s: %s", since, summary)
+    return summary
+
+
+def get_high_water_mark():
+    """
+    Returns the modification time up to which changes are synced.
+
+    Returns:
+        datetime: high water mark or None if never synced
+    """
+    value = (
+        db.session.query(models.AdminVar.value)
+        .filter(models.AdminVar.name == HIGH_WATER_MARK_NAME)
+        .scalar()
+    )
+    if value is None:
+        return None
+    return datetime.datetime.fromisoformat(value)
+
+
+def set_high_water_mark(high_water_mark):
+    """
+    Stores the modification time up to which changes are synced (without commit).
+
+    Args:
+        high_water_mark (datetime): modification time of the last sync
+    """
+    admin_var = models.AdminVar.query.filter_by(name=HIGH_WATER_MARK_NAME).first()
+    if admin_var is None:
+        admin_var = models.AdminVar(name=HIGH_WATER_MARK_NAME)
+        db.session.add(admin_var)
+    admin_var.value = high_water_mark.isoformat()
+
+
+def resolve_ids(items, reference_names, ids, sql_alchemy_model, key_names, id_name):
+    """
+    Replaces references to other items by their primary keys.
+
+    Keys missing in ids are fetched from db with a single query.
+
+    Args:
+        items (list): list of dicts
+        reference_names (tuple): item attributes referencing other item key
+        ids (dict): known primary keys by item key
+        sql_alchemy_model ([type]): SQLAlchemy ORM model of referenced items
+        key_names (tuple): key attribute names of referenced items
+        id_name (str): attribute name set to the primary key
+
+    Raises:
+        ValueError: if the referenced item does not exist
+
+    Returns:
+        list: list of dicts with primary keys
+    """
+    resolved_items = []
+    for item in items:
+        item = dict(item)
+        reference = tuple(item.pop(name, None) for name in reference_names)
+        resolved_items.append((reference, item))
+
+    missing_keys = set(
+        reference
+        for reference, _ in resolved_items
+        if reference not in ids and None not in reference
+    )
+    if missing_keys:
+        ids = dict(ids)
+        ids.update(get_ids(sql_alchemy_model, key_names, missing_keys))
+
+    for reference, item in resolved_items:
+        if None in reference:
+            continue
+        if reference not in ids:
+            raise ValueError(
+                "%s %s referenced by %s not found"
+                % (sql_alchemy_model.__name__, "".join(reference), item)
+            )
+        item[id_name] = ids[reference]
+    return [item for _, item in resolved_items]
+
+
+def sync_items(sql_alchemy_model, key_names, items, batch_size):
+    """
+    Inserts new items and updates modified items (without commit).
+
+    New items are inserted with multi-row INSERT statements where the
+    generated keys can be derived (see bulk_insert.insert_multi_values).
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        key_names (tuple): attribute names identifying an item
+        items (list): list of dicts with column values
+        batch_size (int): number of rows written by a single statement
+
+    Returns:
+        dict, dict: primary keys of synced items by item key and
+            number of inserted and updated items
+    """
+    pk_name = get_pk_name(sql_alchemy_model)
+    items_by_key = {}
+    for item in items:
+        items_by_key[tuple(item[name] for name in key_names)] = item
+
+    attribute_names = set(key_names)
+    for item in items_by_key.values():
+        attribute_names.update(item.keys())
+    existing_rows = get_existing_rows(
+        sql_alchemy_model, key_names, attribute_names, items_by_key.keys()
+    )
+    new_items, modified_items = diff_items(items_by_key, existing_rows, pk_name)
+
+    if bulk_insert.supports_multi_values(db.session, sql_alchemy_model):
+        bulk_insert.insert_multi_values(
+            db.session, sql_alchemy_model, new_items, batch_size
+        )
+    else:
+        for start in range(0, len(new_items), batch_size):
+            db.session.bulk_insert_mappings(
+                sql_alchemy_model,
+                new_items[start : start + batch_size],
+                return_defaults=True,
+            )
+    for start in range(0, len(modified_items), batch_size):
+        upsert_rows(sql_alchemy_model, modified_items[start : start + batch_size])
+
+    ids = {key: row[pk_name] for key, row in existing_rows.items()}
+    for item in new_items:
+        ids[tuple(item[name] for name in key_names)] = item[pk_name]
+    return ids, {"inserted": len(new_items), "updated": len(modified_items)}
+
+
+def diff_items(items_by_key, existing_rows, pk_name):
+    """
+    Splits items into new items and items that differ from the db rows.
+
+    None values of existing items are left out, so attributes not reported
+    by the user office do not overwrite the db values.
+
+    Args:
+        items_by_key (dict): item dicts by item key
+        existing_rows (dict): db rows (dicts with primary key) by item key
+        pk_name (str): primary key attribute name
+
+    Returns:
+        list, list: new items, modified items with primary key
+    """
+    new_items = []
+    modified_items = []
+    for key, item in items_by_key.items():
+        row = existing_rows.get(key)
+        if row is None:
+            new_items.append(dict(item))
+            continue
+        modified_item = {
+            name: value for name, value in item.items() if value is not None
+        }
+        if any(row.get(name) != value for name, value in modified_item.items()):
+            modified_item[pk_name] = row[pk_name]
+            modified_items.append(modified_item)
+    return new_items, modified_items
+
+
+def get_existing_rows(sql_alchemy_model, key_names, attribute_names, keys, chunk=500):
+    """
+    Returns db rows with given keys.
+
+    Only the compared attributes are loaded and rows are fetched with
+    IN queries, so the cost depends on the number of synced items.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        key_names (tuple): attribute names identifying an item
+        attribute_names (set): loaded attribute names
+        keys (iterable): item keys
+        chunk (int, optional): number of keys per query
+
+    Returns:
+        dict: row dicts by item key
+    """
+    pk_name = get_pk_name(sql_alchemy_model)
+    attribute_names = [pk_name] + sorted(set(attribute_names) - {pk_name})
+    columns = [getattr(sql_alchemy_model, name) for name in attribute_names]
+
+    rows = {}
+    keys = list(keys)
+    for start in range(0, len(keys), chunk):
+        query = db.session.query(*columns).filter(
+            get_key_filter(sql_alchemy_model, key_names, keys[start : start + chunk])
+        )
+        for values in query:
+            row = dict(zip(attribute_names, values))
+            rows[tuple(row[name] for name in key_names)] = row
+    return rows
+
+
+def get_ids(sql_alchemy_model, key_names, keys):
+    """
+    Returns primary keys of db items with given keys.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        key_names (tuple): attribute names identifying an item
+        keys (iterable): item keys
+
+    Returns:
+        dict: primary keys by item key
+    """
+    pk_name = get_pk_name(sql_alchemy_model)
+    rows = get_existing_rows(sql_alchemy_model, key_names, key_names, keys)
+    return {key: row[pk_name] for key, row in rows.items()}
+
+
+def get_key_filter(sql_alchemy_model, key_names, keys):
+    attributes = [getattr(sql_alchemy_model, name) for name in key_names]
+    if len(attributes) == 1:
+        return attributes[0].in_([key[0] for key in keys])
+    return sqlalchemy.tuple_(*attributes).in_(keys)
+
+
+def get_pk_name(sql_alchemy_model):
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    return mapper.get_property_by_column(mapper.primary_key[0]).key
+
+
+def upsert_rows(sql_alchemy_model, rows):
+    """
+    Writes rows identified by their primary key.
+
+    MySQL uses a single INSERT ... ON DUPLICATE KEY UPDATE statement,
+    other databases use bulk UPDATE.
+
+    Args:
+        sql_alchemy_model ([type]): SQLAlchemy ORM model
+        rows (list): list of dicts with primary key and updated values
+    """
+    mapper = sqlalchemy.inspect(sql_alchemy_model)
+    if db.session.get_bind(mapper=mapper).dialect.name != "mysql":
+        db.session.bulk_update_mappings(sql_alchemy_model, rows)
+        return
+
+    # Rows of a multi row insert must have the same columns
+    for names, group in group_by_attributes(rows).items():
+        table_rows = [
+            {mapper.get_property(name).columns[0].name: row[name] for name in names}
+            for row in group
+        ]
+        statement = mysql.insert(sql_alchemy_model.__table__).values(table_rows)
+        statement = statement.on_duplicate_key_update(
+            {
+                column.name: statement.inserted[column.name]
+                for column in (mapper.get_property(name).columns[0] for name in names)
+                if not column.primary_key
+            }
+        )
+        db.session.execute(statement)
+
+
+def group_by_attributes(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
@@ -28,8 +28,14 @@ __license__ = "LGPLv3+"
 
 def init_app(app, **kwargs):
 
+    # Only namespaces served by the deployment are imported if ENABLED_ROUTES
+    # lists route module names
+    enabled_routes = app.config.get("ENABLED_ROUTES")
+
     for module_name in os.listdir(os.path.dirname(__file__)):
         if not module_name.startswith("__") and module_name.endswith(".py"):
+            if enabled_routes is not None and module_name[:-3] not in enabled_routes:
+                continue
             module = import_module(".%s" % module_name[:-3], package=__name__)
             if hasattr(module, "init_app"):
                 module.init_app(app, **kwargs)
@@ -84,7 +84,7 @@ class AutoProcById(Resource):
     @authorization_required
     def get(self, auto_proc_id):
         """Returns a auto_proc by auto_procId"""
-        return auto_proc.get_auto_proc_by_id(auto_proc_id)
+        return auto_proc.get_auto_proc_by_id(auto_proc_id, request.args.get("fields"))
 
 
 @api.route("/status", endpoint="auto_proc_status")
@@ -126,7 +126,9 @@ class AutoProcStatusById(Resource):
     @authorization_required
     def get(self, status_id):
         """Returns a auto_proc by auto_procId"""
-        return auto_proc.get_auto_proc_status_by_id(status_id)
+        return auto_proc.get_auto_proc_status_by_id(
+            status_id, request.args.get("fields")
+        )
 
 
 @api.route("/programs", endpoint="auto_proc_programs")
@@ -168,7 +170,22 @@ class AutoProcProgramById(Resource):
     @authorization_required
     def get(self, program_id):
         """Returns a auto_proc by auto_procId"""
-        return auto_proc.get_auto_proc_program_by_id(program_id)
+        return auto_proc.get_auto_proc_program_by_id(
+            program_id, request.args.get("fields")
+        )
+
+
+@api.route("/programs/messages/bulk", endpoint="auto_proc_program_messages_bulk")
+@api.doc(security="apikey")
+class AutoProcProgramMessagesBulk(Resource):
+    """Allows to add many auto proc program messages in one request"""
+
+    @api.expect([auto_proc_program_message_schemas.f_schema])
+    @token_required
+    @authorization_required
+    def post(self):
+        """Adds auto proc program messages from JSON array or NDJSON body"""
+        return auto_proc.add_auto_proc_program_messages(request)
 
 
 @api.route("/programs/attachments", endpoint="auto_proc_program_attachments")
@@ -214,4 +231,6 @@ class AutoProcProgramAttachmentById(Resource):
     @authorization_required
     def get(self, attachment_id):
         """Returns a auto_proc by attachment_id"""
-        return auto_proc.get_auto_proc_program_attachment_by_id(attachment_id)
+        return auto_proc.get_auto_proc_program_attachment_by_id(
+            attachment_id, request.args.get("fields")
+        )
@@ -0,0 +1,60 @@
+"""
+Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+from flask import request
+
+from flask_restx_patched import Resource
+
+from app.extensions.api import api_v1, Namespace
+from app.extensions.auth import token_required, authorization_required
+
+from ispyb_core.modules import batch
+
+
+api = Namespace(
+    "Batch", description="Transactional batch of write operations", path="/batch"
+)
+api_v1.add_namespace(api)
+
+
+@api.route("", endpoint="batch")
+@api.doc(security="apikey")
+class Batch(Resource):
+
+    """Runs create, patch and delete operations in a single transaction"""
+
+    @token_required
+    @authorization_required
+    def post(self):
+        """Runs list of operations in a single transaction
+
+        Operations are dicts with op (create, patch or delete), resource
+        (Shipping, Dewar, Container, BLSample, Crystal or Protein), id
+        (patch and delete) and data. Only shipments can be patched and
+        deleted. Values {"$ref": "name"} are replaced by the id of the item
+        created by the operation with "ref": "name". Every operation is
+        checked against the authorization rules of the resource endpoints
+        and patch or delete need a rule of the item endpoint.
+        """
+        return batch.run_batch(api.payload, request.headers.get("Authorization"))
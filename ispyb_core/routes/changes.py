@@ -0,0 +1,65 @@
+"""
+Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from flask import request
+from flask_restx_patched import Resource
+
+from app.extensions.api import api_v1, Namespace
+from app.extensions.auth import token_required, authorization_required
+
+from ispyb_core.modules import change_feed
+
+
+__license__ = "LGPLv3+"
+
+
+api = Namespace(
+    "Changes",
+    description="Change feed of auto processing and data collection items",
+    path="/changes",
+)
+
+api_v1.add_namespace(api)
+
+
+@api.route("", endpoint="changes")
+@api.doc(security="apikey")
+class Changes(Resource):
+    """Allows to get new items"""
+
+    @token_required
+    @authorization_required
+    @api.doc(
+        params={
+            "since": "Cursor of the last received event (next_cursor of the response)",
+            "timeout": "Seconds to wait for new events (long polling)",
+            "types": "Comma separated event types (AutoProcStatus, "
+            "AutoProcProgram, AutoProcProgramMessage, DataCollection)",
+        }
+    )
+    def get(self):
+        """Returns items inserted after since
+
+        Server-sent events are streamed if text/event-stream is accepted.
+        """
+        if request.accept_mimetypes.best == "text/event-stream":
+            return change_feed.get_changes_stream(request)
+        return change_feed.get_changes(request)
@@ -70,7 +70,7 @@ class PersonById(Resource):
     def get(self, person_id):
         """Returns a person by personId"""
         params = {"personId": person_id}
-        return contacts.get_person_by_params(params)
+        return contacts.get_person_by_params(params, conditional=True)
 
     @api.expect(person_schemas.f_schema)
     @api.marshal_with(person_schemas.f_schema, code=HTTPStatus.CREATED)
@@ -104,7 +104,7 @@ class LabContacts(Resource):
     @authorization_required
     def get(self):
         """Returns list of local contacts."""
-        return contacts.get_lab_contacts(request), HTTPStatus.OK
+        return contacts.get_lab_contacts(request)
 
     @api.expect(lab_contact_schemas.f_schema)
     @api.marshal_with(lab_contact_schemas.f_schema, code=201)
@@ -129,7 +129,7 @@ class LabContactById(Resource):
     def get(self, lab_contact_id):
         """Returns a lab contact by lab_contact_id"""
         params = {"labContactId": lab_contact_id}
-        return contacts.get_lab_contact_by_params(params)
+        return contacts.get_lab_contact_by_params(params, conditional=True)
 
     @api.expect(lab_contact_schemas.f_schema)
     @api.marshal_with(lab_contact_schemas.f_schema, code=HTTPStatus.CREATED)
@@ -193,7 +193,7 @@ class LaboratoryById(Resource):
     @authorization_required
     def get(self, laboratory_id):
         """Returns a laboratory by laboratoryId"""
-        return contacts.get_laboratory_by_id(laboratory_id)
+        return contacts.get_laboratory_by_id(laboratory_id, request.args.get("fields"))
 
     @api.expect(laboratory_schemas.f_schema)
     @api.marshal_with(laboratory_schemas.f_schema, code=HTTPStatus.CREATED)
@@ -69,4 +69,4 @@ class ContainerById(Resource):
     @authorization_required
     def get(self, container_id):
         """Returns a container by container_id"""
-        return container.get_container_by_id(container_id)
+        return container.get_container_by_id(container_id, request.args.get("fields"))
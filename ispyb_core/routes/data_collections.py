@@ -28,7 +28,7 @@ from app.extensions.api import api_v1, Namespace
 from app.extensions.auth import token_required, authorization_required
 
 from ispyb_core.schemas import data_collection as data_collection_schemas
-from ispyb_core.modules import data_collection
+from ispyb_core.modules import data_collection, image_quality_indicators
 
 
 __license__ = "LGPLv3+"
@@ -56,6 +56,43 @@ class DataColletions(Resource):
         return data_collection.get_data_collections(request)
 
 
+@api.route("/bulk", endpoint="data_collections_bulk")
+@api.doc(security="apikey")
+class DataCollectionsBulk(Resource):
+    """Allows to add many data collections in one request"""
+
+    @api.expect([data_collection_schemas.f_schema])
+    @token_required
+    @authorization_required
+    def post(self):
+        """Adds data collections from JSON array or NDJSON body"""
+        return data_collection.add_data_collections(request)
+
+
+@api.route("/images/bulk", endpoint="images_bulk")
+@api.doc(security="apikey")
+class ImagesBulk(Resource):
+    """Allows to add many images in one request"""
+
+    @token_required
+    @authorization_required
+    def post(self):
+        """Adds images from JSON array or NDJSON body"""
+        return data_collection.add_images(request)
+
+
+@api.route("/image_quality_indicators/bulk", endpoint="image_quality_indicators_bulk")
+@api.doc(security="apikey")
+class ImageQualityIndicatorsBulk(Resource):
+    """Allows to add many image quality indicators in one request"""
+
+    @token_required
+    @authorization_required
+    def post(self):
+        """Adds image quality indicators from JSON array or NDJSON body"""
+        return image_quality_indicators.add_image_quality_indicators(request)
+
+
 @api.route("/<int:data_collection_id>")
 @api.param("data_collection_id", "data_collection id (integer)")
 @api.doc(security="apikey")
@@ -73,7 +110,9 @@ class DataCollectionById(Resource):
     @authorization_required
     def get(self, data_collection_id):
         """Returns a data_collection by data_collectionId"""
-        return data_collection.get_data_collection_by_id(data_collection_id)
+        return data_collection.get_data_collection_by_id(
+            data_collection_id, request.args.get("fields")
+        )
 
 
 @api.route("/groups")
@@ -67,4 +67,4 @@ class DewarById(Resource):
     @authorization_required
     def get(self, dewar_id):
         """Returns a sample by sampleId"""
-        return dewar.get_dewar_by_id(dewar_id)
+        return dewar.get_dewar_by_id(dewar_id, request.args.get("fields"))
@@ -0,0 +1,60 @@
+"""
+Project: py-ispyb.
+
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+from flask_restx._http import HTTPStatus
+
+from flask_restx_patched import Resource
+
+from app.extensions.api import api_v1, Namespace
+from app.extensions.auth import token_required, authorization_required
+from app.extensions.jobs import job_queue
+
+
+api = Namespace("Jobs", description="Background jobs namespace", path="/jobs")
+api_v1.add_namespace(api)
+
+
+@api.route("/<string:job_id>", endpoint="job_by_id")
+@api.param("job_id", "Job id (string)")
+@api.doc(security="apikey")
+class JobById(Resource):
+
+    """Allows to get status of a background job"""
+
+    @token_required
+    @authorization_required
+    def get(self, job_id):
+        """Returns job status
+
+        Jobs are kept by the server process that accepted them, so the
+        status is available only in single worker deployments or when
+        requests of a client reach the same worker.
+        """
+
+        job = job_queue.get(job_id)
+        if job is None:
+            return {
+                "message": "Job with id %s not found in this server process" % job_id
+            }, HTTPStatus.NOT_FOUND
+        return job, HTTPStatus.OK
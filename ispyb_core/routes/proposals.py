@@ -42,6 +42,7 @@ from flask_restx_patched import Resource
 from app.extensions.api import api_v1, Namespace
 from app.extensions.auth import token_required, authorization_required
 from ispyb_core.schemas import proposal as proposal_schemas
+from ispyb_core.schemas import proposal_info as proposal_info_schemas
 from ispyb_core.modules import proposal
 
 
@@ -91,7 +92,7 @@ class ProposalById(Resource):
     @authorization_required
     def get(self, proposal_id):
         """Returns a proposal by proposalId"""
-        return proposal.get_proposal_by_id(proposal_id)
+        return proposal.get_proposal_by_id(proposal_id, request.args.get("fields"))
 
     @api.expect(proposal_schemas.f_schema)
     @api.marshal_with(proposal_schemas.f_schema, code=HTTPStatus.CREATED)
@@ -127,7 +128,9 @@ class ProposalInfoById(Resource):
     """Returns full information of a proposal"""
 
     @api.doc(description="proposal_id should be an integer ")
-    # @api.marshal_with(proposal_desc_f_schema)
+    @api.marshal_with(
+        proposal_info_schemas.f_schema, skip_none=True, code=HTTPStatus.OK
+    )
     @token_required
     @authorization_required
     def get(self, proposal_id):
@@ -69,7 +69,7 @@ class SampleById(Resource):
     @authorization_required
     def get(self, sample_id):
         """Returns a sample by sampleId"""
-        return sample.get_sample_by_id(sample_id)
+        return sample.get_sample_by_id(sample_id, request.args.get("fields"))
 
 
 @api.route("/crystals", endpoint="crystals")
@@ -105,7 +105,7 @@ class CrystalById(Resource):
     @authorization_required
     def get(self, crystal_id):
         """Returns a crystal by crystalId"""
-        return crystal.get_crystal_by_id(crystal_id)
+        return crystal.get_crystal_by_id(crystal_id, request.args.get("fields"))
 
 
 @api.route("/proteins", endpoint="proteins")
@@ -19,10 +19,8 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
 
 
-import importlib
-
-from flask import current_app
-from flask_restx_patched import Resource, HTTPStatus
+from flask import current_app, Response
+from flask_restx_patched import Resource, HTTPStatus, set_validators
 
 from app.extensions.api import api_v1, Namespace
 
@@ -38,6 +36,32 @@ api = Namespace("Schemas", description="Schemas related namespace", path="/schem
 api_v1.add_namespace(api)
 
 
+def init_app(app, **kwargs):
+    # pylint: disable=unused-argument
+    if app.config.get("SCHEMAS_PRELOAD"):
+        schemas.load_json_schemas()
+
+
+def make_schema_response(serialized):
+    """
+    Returns response with pre-serialized JSON document.
+
+    Returns 304 if the client sent matching If-None-Match header.
+
+    Args:
+        serialized (tuple): JSON bytes and entity tag
+
+    Returns:
+        Response: flask response
+    """
+    body, etag = serialized
+    set_validators(etag=etag)
+    response = Response(body, mimetype="application/json")
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("SCHEMAS_MAX_AGE", 86400)
+    return response
+
+
 @api.route("/available_names", endpoint="available_schemas_names")
 class SchemasList(Resource):
 
@@ -48,14 +72,7 @@ class SchemasList(Resource):
         Returns:
             list: list of names
         """
-        current_app.logger.info("Get all schemas")
-        # TODO I guess there is oneliner fancy code that can do this...
-        result = []
-        for item in dir(schemas):
-            if not item.startswith("__"):
-                result.append(item)
-
-        return result
+        return make_schema_response(schemas.get_serialized_schema_names())
 
 
 @api.route("/<string:name>", endpoint="schema_by_name")
@@ -74,10 +91,10 @@ class Schemas(Resource):
             json: schema as json
         """
         try:
-            schemas_module = importlib.import_module("ispyb_core.schemas." + name)
-            return getattr(schemas_module, "json_schema")
+            serialized = schemas.get_serialized_json_schema(name)
         except Exception as ex:
             return (
                 "Unable to return schema with name %s (%s)" % (name, str(ex)),
                 HTTPStatus.NOT_FOUND,
             )
+        return make_schema_response(serialized)
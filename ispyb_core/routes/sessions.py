@@ -28,6 +28,7 @@ from app.extensions.api import api_v1, Namespace
 from app.extensions.auth import token_required, authorization_required
 
 from ispyb_core.schemas import session as session_schemas
+from ispyb_core.schemas import session_info as session_info_schemas
 from ispyb_core.modules import session
 
 
@@ -75,7 +76,7 @@ class SessionById(Resource):
     @authorization_required
     def get(self, session_id):
         """Returns a session by sessionId"""
-        return session.get_session_by_id(session_id)
+        return session.get_session_by_id(session_id, request.args.get("fields"))
 
 
 @api.route("/<int:session_id>/info", endpoint="session_info_by_id")
@@ -86,7 +87,9 @@ class SessionInfoById(Resource):
     """Returns full information of a session"""
 
     @api.doc(description="session_id should be an integer ")
-    # @api.marshal_with(session_desc_f_schema)
+    @api.marshal_with(
+        session_info_schemas.f_schema, skip_none=True, code=HTTPStatus.OK
+    )
     @token_required
     @authorization_required
     def get(self, session_id):
@@ -94,6 +97,23 @@ class SessionInfoById(Resource):
         return session.get_session_info_by_id(session_id)
 
 
+@api.route("/info", endpoint="sessions_info")
+@api.doc(security="apikey")
+class SessionsInfo(Resource):
+    """Allows to get sessions with proposal and beamline setup"""
+
+    @api.response(
+        code=HTTPStatus.OK,
+        description="Sessions with proposal and beamline setup",
+        model=session_info_schemas.f_list_schema,
+    )
+    @token_required
+    @authorization_required
+    def get(self):
+        """Returns list of sessions with proposal and beamline setup"""
+        return session.get_sessions_info(request)
+
+
 @api.route("/date", endpoint="sessions_by_date")
 @api.doc(security="apikey")
 class SessionsByDateBeamline(Resource):
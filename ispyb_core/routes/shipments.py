@@ -62,7 +62,7 @@ class Shipments(Resource):
     @authorization_required
     def get(self):
         """Returns list of shipments"""
-        return shipping.get_shipments(request), HTTPStatus.OK
+        return shipping.get_shipments(request)
 
     @api.expect(shipping_schemas.f_schema)
     @api.marshal_with(shipping_schemas.f_schema, code=201)
@@ -88,7 +88,7 @@ class ShipmentById(Resource):
     @authorization_required
     def get(self, shipment_id):
         """Returns a shipment by shipmentId"""
-        return shipping.get_shipment_by_id(shipment_id)
+        return shipping.get_shipment_by_id(shipment_id, request.args.get("fields"))
 
     @api.expect(shipping_schemas.f_schema)
     @api.marshal_with(shipping_schemas.f_schema, code=HTTPStatus.CREATED)
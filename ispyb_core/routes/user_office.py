@@ -24,7 +24,7 @@ along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 __license__ = "LGPLv3+"
 
-from flask import request, current_app
+from flask import request, current_app, url_for
 from flask_restx._http import HTTPStatus
 
 from flask_restx_patched import Resource
@@ -49,11 +49,18 @@ class SyncAll(Resource):
     @token_required
     @authorization_required
     def post(self):
-        """Sync with user office"""
-
-        api.logger.info("Sync with uer office")
-        user_office_link.sync_with_user_office()
-        return HTTPStatus.OK, {"message": "Done!"}
+        """Queues sync with user office
+
+        Returns job id, status of the job is available at /jobs/<job_id>.
+        """
+
+        api.logger.info("Sync with user office")
+        job = user_office_link.submit_sync_with_user_office()
+        return (
+            {"message": "Sync with user office queued", "job_id": job["id"]},
+            HTTPStatus.ACCEPTED,
+            {"Location": url_for("api.job_by_id", job_id=job["id"])},
+        )
 
 
 @api.route(
@@ -14,3 +14,112 @@ GNU Lesser General Public License for more details.
 You should have received a copy of the GNU Lesser General Public License
 along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 """
+
+
+__license__ = "LGPLv3+"
+
+
+import os
+import json
+import hashlib
+import threading
+from importlib import import_module
+
+from marshmallow_jsonschema import JSONSchema
+
+
+# Names of the schema modules, listed once without importing them
+SCHEMA_NAMES = tuple(
+    sorted(
+        module_name[:-3]
+        for module_name in os.listdir(os.path.dirname(__file__))
+        if not module_name.startswith("__") and module_name.endswith(".py")
+    )
+)
+
+_json_schemas = {}
+_serialized_json_schemas = {}
+_json_schemas_lock = threading.Lock()
+
+
+def get_schema_names():
+    """
+    Returns names of the schema modules.
+
+    Returns:
+        tuple: sorted schema names
+    """
+    return SCHEMA_NAMES
+
+
+def get_json_schema(name):
+    """
+    Returns JSON schema of the marshmallows schema defined in the module.
+
+    Schema module is imported and the JSON schema is generated on the first
+    call, following calls return the memoised schema.
+
+    Args:
+        name (str): schema module name
+
+    Raises:
+        ValueError: if there is no schema with the given name
+
+    Returns:
+        dict: JSON schema
+    """
+    json_schema = _json_schemas.get(name)
+    if json_schema is None:
+        if name not in SCHEMA_NAMES:
+            raise ValueError("Schema %s does not exist" % name)
+        with _json_schemas_lock:
+            json_schema = _json_schemas.get(name)
+            if json_schema is None:
+                schema_module = import_module("%s.%s" % (__name__, name))
+                json_schema = JSONSchema().dump(schema_module.ma_schema)[0]
+                _json_schemas[name] = json_schema
+    return json_schema
+
+
+def get_serialized_json_schema(name):
+    """
+    Returns JSON schema serialized to bytes and its entity tag.
+
+    Args:
+        name (str): schema module name
+
+    Raises:
+        ValueError: if there is no schema with the given name
+
+    Returns:
+        bytes, str: JSON document and entity tag
+    """
+    serialized = _serialized_json_schemas.get(name)
+    if serialized is None:
+        serialized = serialize(get_json_schema(name))
+        _serialized_json_schemas[name] = serialized
+    return serialized
+
+
+def get_serialized_schema_names():
+    """
+    Returns list of schema names serialized to bytes and its entity tag.
+
+    Returns:
+        bytes, str: JSON document and entity tag
+    """
+    return _serialized_schema_names
+
+
+def load_json_schemas():
+    """Generates and serializes all JSON schemas."""
+    for name in SCHEMA_NAMES:
+        get_serialized_json_schema(name)
+
+
+def serialize(data):
+    body = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("UTF-8")
+    return body, hashlib.sha1(body).hexdigest()
+
+
+_serialized_schema_names = serialize(list(SCHEMA_NAMES))
@@ -25,7 +25,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -82,4 +81,3 @@ class AutoProcIntegrationSchema(Schema):
 
 f_schema = api.model('AutoProcIntegration', dict_schema)
 ma_schema = AutoProcIntegrationSchema()
-json_schema = JSONSchema().dump(ma_schema)
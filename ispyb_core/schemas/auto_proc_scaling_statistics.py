@@ -25,7 +25,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -84,4 +83,3 @@ class AutoProcScalingStatisticsSchema(Schema):
 
 f_schema = api.model('AutoProcScalingStatistics', dict_schema)
 ma_schema = AutoProcScalingStatisticsSchema()
-json_schema = JSONSchema().dump(ma_schema)
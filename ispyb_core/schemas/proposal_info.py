@@ -0,0 +1,46 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from marshmallow import fields as ma_fields
+from flask_restx import fields as f_fields
+
+from app.extensions.api import api_v1 as api
+
+from ispyb_core.schemas import person, proposal, session
+
+
+dict_schema = dict(proposal.dict_schema)
+dict_schema["person"] = f_fields.Nested(person.f_schema, allow_null=True)
+dict_schema["sessions"] = f_fields.List(f_fields.Nested(session.f_schema))
+
+
+class ProposalInfoSchema(proposal.ProposalSchema):
+    """Marshmallows schema class representing Proposal with its person
+    loaded via relationship. Sessions are added by the proposal module"""
+
+    person = ma_fields.Nested(person.PersonSchema, attribute="Person")
+
+
+f_schema = api.model("ProposalInfo", dict_schema)
+ma_schema = ProposalInfoSchema()
@@ -0,0 +1,67 @@
+"""
+Project: py-ispyb
+https://github.com/ispyb/py-ispyb
+
+This file is part of py-ispyb software.
+
+py-ispyb is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+py-ispyb is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+
+__license__ = "LGPLv3+"
+
+
+from marshmallow import fields as ma_fields
+from flask_restx import fields as f_fields
+
+from app.extensions.api import api_v1 as api
+
+from ispyb_core.schemas import beamline_setup, proposal, session
+
+
+dict_schema = dict(session.dict_schema)
+dict_schema["proposal"] = f_fields.Nested(proposal.f_schema, allow_null=True)
+dict_schema["beamline_setup"] = f_fields.Nested(
+    beamline_setup.f_schema, allow_null=True
+)
+
+
+class SessionInfoSchema(session.SessionSchema):
+    """Marshmallows schema class representing Session with its proposal and
+    beamline setup loaded via relationships"""
+
+    proposal = ma_fields.Nested(proposal.ProposalSchema, attribute="Proposal")
+    beamline_setup = ma_fields.Nested(
+        beamline_setup.BeamLineSetupSchema, attribute="BeamLineSetup"
+    )
+
+
+f_schema = api.model("SessionInfo", dict_schema)
+f_list_schema = api.model(
+    "SessionInfoList",
+    {
+        "data": f_fields.Nested(
+            api.model(
+                "SessionInfoRows",
+                {
+                    "total": f_fields.Integer(),
+                    "rows": f_fields.List(f_fields.Nested(f_schema)),
+                    "next_cursor": f_fields.String(),
+                },
+            )
+        ),
+        "message": f_fields.String(),
+    },
+)
+ma_schema = SessionInfoSchema()
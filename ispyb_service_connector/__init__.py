@@ -19,40 +19,279 @@
 #  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
 from flask import current_app
-from requests import get, post
-from requests import ConnectionError
+from requests.adapters import HTTPAdapter
+
+from app.utils.cache import TTLCache
 
 
 __license__ = "LGPLv3+"
 
 
+_session = None
+_session_lock = threading.Lock()
+_executor = None
+
+# Results of the availability probe and GET responses by service and path
+_availability_cache = TTLCache(ttl=30, max_size=64)
+_resource_cache = TTLCache(ttl=60, max_size=1024)
+
+
+def get_session():
+    """
+    Returns requests session shared by all calls.
+
+    The session keeps connections to the API gateway alive and reuses them
+    from a pool of SERVICE_CONNECTOR_POOL_SIZE connections.
+
+    Returns:
+        requests.Session: session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = current_app.config.get("SERVICE_CONNECTOR_POOL_SIZE", 10)
+                adapter = HTTPAdapter(
+                    pool_connections=pool_size,
+                    pool_maxsize=pool_size,
+                    max_retries=current_app.config.get("SERVICE_CONNECTOR_RETRIES", 0),
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _resource_cache.max_size = current_app.config.get(
+                    "SERVICE_RESOURCE_CACHE_SIZE", 1024
+                )
+                _session = session
+    return _session
+
+
+def request_service(service_name, path, params=None):
+    """
+    Sends GET request to the service via API gateway.
+
+    Args:
+        service_name (str): name of the service (for example ispyb_core)
+        path (str): resource path
+        params (dict, optional): query parameters
+
+    Returns:
+        int, dict: HTTP status code and response data
+    """
+    headers = {
+        "Authorization": "Bearer %s" % current_app.config["MASTER_TOKEN"],
+        "Host": service_name,
+    }
+    try:
+        response = get_session().get(
+            current_app.config["API_GATEWAY_URL"] + path,
+            headers=headers,
+            params=params,
+            timeout=current_app.config.get("SERVICE_CONNECTOR_TIMEOUT", (3.05, 30)),
+        )
+        return response.status_code, response.json()
+    except (requests.RequestException, ValueError) as ex:
+        return 400, "ISPyB service %s is not available (%s)" % (service_name, str(ex))
+
+
 def is_resource_available(service_name):
-    status_code = 400
-    data = "ISPyB service %s is not available" % service_name
-    #000try:
-    if True:
-        headers = {
-            "Authorization": "Bearer %s" % current_app.config["MASTER_TOKEN"],
-            "Host": service_name}
-        response = get(current_app.config["API_GATEWAY_URL"] + "/schemas/available_names", headers=headers)
-        data = response.json()
-        status_code = response.status_code
-    #except ConnectionError:
-    #    pass
-    return status_code, data
-
-
-def get_ispyb_resource(service_name, path):
-    status_code, data = is_resource_available("ispyb_core")
+    """
+    Checks if the service is available.
+
+    Successful result is cached for SERVICE_AVAILABILITY_CACHE_TTL seconds.
+
+    Args:
+        service_name (str): name of the service
+
+    Returns:
+        int, dict: HTTP status code and available schema names
+    """
+    result = _availability_cache.get(service_name)
+    if result is None:
+        result = request_service(service_name, "/schemas/available_names")
+        if result[0] == 200:
+            _availability_cache.set(
+                service_name,
+                result,
+                current_app.config.get("SERVICE_AVAILABILITY_CACHE_TTL", 30),
+            )
+    return result
+
+
+def get_ispyb_resource(service_name, path, use_cache=True):
+    """
+    Returns resource of the service.
+
+    Successful responses are cached for SERVICE_RESOURCE_CACHE_TTL seconds.
+
+    Args:
+        service_name (str): name of the service
+        path (str): resource path (for example /samples/crystals/1)
+        use_cache (bool, optional): if False then cached response is ignored
+
+    Returns:
+        int, dict: HTTP status code and response data
+    """
+    key = (service_name, path)
+    if use_cache:
+        result = _resource_cache.get(key)
+        if result is not None:
+            return result
+
+    status_code, data = is_resource_available(service_name)
     if status_code != 200:
         return status_code, data
-    else:
-        headers = {
-            "Authorization": "Bearer %s" % current_app.config["MASTER_TOKEN"],
-            "Host": service_name}
-        response = get(
-            current_app.config["API_GATEWAY_URL"] + path,
-            headers=headers)
-        data = response.json()
-        return response.status_code, data
+
+    result = request_service(service_name, path)
+    if result[0] == 200:
+        _resource_cache.set(
+            key, result, current_app.config.get("SERVICE_RESOURCE_CACHE_TTL", 60)
+        )
+    return result
+
+
+def get_ispyb_resources(service_name, path, id_name, ids):
+    """
+    Returns many resources of the service in a single request.
+
+    Resources are requested with an id_name__in filter and stored in the
+    resource cache under path/<id>, so that following get_ispyb_resource
+    calls are served from the cache.
+
+    Args:
+        service_name (str): name of the service
+        path (str): collection path (for example /samples/crystals)
+        id_name (str): id attribute name (for example crystalId)
+        ids (list): resource ids
+
+    Returns:
+        int, dict: HTTP status code and resources by id. Ids of not existing
+            resources are missing in the dict.
+    """
+    ttl = current_app.config.get("SERVICE_RESOURCE_CACHE_TTL", 60)
+    resources = {}
+    missing_ids = []
+    for resource_id in dict.fromkeys(ids):
+        result = _resource_cache.get((service_name, "%s/%s" % (path, resource_id)))
+        if result is None:
+            missing_ids.append(resource_id)
+        else:
+            resources[resource_id] = result[1]
+    if not missing_ids:
+        return 200, resources
+
+    status_code, data = is_resource_available(service_name)
+    if status_code != 200:
+        return status_code, data
+
+    params = {
+        "%s__in" % id_name: ",".join(str(resource_id) for resource_id in missing_ids),
+        "limit": len(missing_ids),
+    }
+    status_code, data = request_service(service_name, path, params)
+    if status_code != 200:
+        return status_code, data
+
+    for item in data["data"]["rows"]:
+        resources[item[id_name]] = item
+        _resource_cache.set(
+            (service_name, "%s/%s" % (path, item[id_name])), (200, item), ttl
+        )
+    return 200, resources
+
+
+def get_executor():
+    """
+    Returns thread pool running requests of the async functions.
+
+    The pool has SERVICE_CONNECTOR_POOL_SIZE threads, one per pooled
+    connection of the shared session.
+
+    Returns:
+        ThreadPoolExecutor: executor
+    """
+    global _executor
+    if _executor is None:
+        with _session_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config.get(
+                        "SERVICE_CONNECTOR_POOL_SIZE", 10
+                    ),
+                    thread_name_prefix="service_connector",
+                )
+    return _executor
+
+
+def _call_in_app_context(app, func, args):
+    with app.app_context():
+        return func(*args)
+
+
+async def run_async(func, *args, app=None):
+    """
+    Runs connector function without blocking the event loop.
+
+    The function runs in the connector thread pool, so the threads handling
+    requests (ASGI_THREADS) do not wait for other services.
+
+    Args:
+        func: connector function (for example get_ispyb_resource)
+        args: function arguments
+        app (flask app, optional): application passed to the worker thread,
+            current application if not defined
+
+    Returns:
+        result of the function
+    """
+    if app is None:
+        app = current_app._get_current_object()
+    with app.app_context():
+        executor = get_executor()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _call_in_app_context, app, func, args)
+
+
+async def request_service_async(service_name, path, params=None, app=None):
+    """Async version of request_service."""
+    return await run_async(request_service, service_name, path, params, app=app)
+
+
+async def get_ispyb_resource_async(service_name, path, use_cache=True, app=None):
+    """Async version of get_ispyb_resource."""
+    return await run_async(get_ispyb_resource, service_name, path, use_cache, app=app)
+
+
+async def get_ispyb_resources_async(service_name, path, id_name, ids, app=None):
+    """Async version of get_ispyb_resources."""
+    return await run_async(
+        get_ispyb_resources, service_name, path, id_name, ids, app=app
+    )
+
+
+async def gather_ispyb_resources(service_name, paths, use_cache=True, app=None):
+    """
+    Requests several resources of the service concurrently.
+
+    Args:
+        service_name (str): name of the service
+        paths (list): resource paths
+        use_cache (bool, optional): if False then cached responses are ignored
+        app (flask app, optional): application, current application if not
+            defined
+
+    Returns:
+        list: (HTTP status code, response data) tuple per path
+    """
+    return await asyncio.gather(
+        *[
+            get_ispyb_resource_async(service_name, path, use_cache, app=app)
+            for path in paths
+        ]
+    )
@@ -20,6 +20,9 @@
 #  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
+import functools
+
+
 __license__ = "LGPLv3+"
 
 
@@ -32,3 +35,11 @@ def init_app(app):
     from . import routes
 
     routes.init_app(app)
+
+
+def get_asgi_prefetchers(app):
+    """Returns coroutine functions prefetching outbound calls in ASGI mode."""
+
+    from .modules import loaded_sample
+
+    return [functools.partial(loaded_sample.prefetch_crystals, app)]
@@ -22,6 +22,7 @@
 __license__ = "LGPLv3+"
 
 
+import json
 import logging
 
 from flask_restx import abort
@@ -30,6 +31,7 @@ from flask_restx._http import HTTPStatus
 
 import ispyb_service_connector
 from app.extensions import db, auth_provider
+from app.utils import NDJSON_MIMETYPE, get_json_list
 
 from ispyb_ssx import models, schemas
 
@@ -42,14 +44,12 @@ def get_loaded_samples(request):
 
     query_params = request.args.to_dict()
 
-    return (
-        db.get_db_items(
-            models.LoadedSample,
-            schemas.loaded_sample.dict_schema,
-            schemas.loaded_sample.ma_schema,
-            query_params,
-        ),
-        HTTPStatus.OK,
+    # Returned without status code as it can be a streamed response
+    return db.get_db_items(
+        models.LoadedSample,
+        schemas.loaded_sample.dict_schema,
+        schemas.loaded_sample.ma_schema,
+        query_params,
     )
 
 
@@ -64,7 +64,10 @@ def get_loaded_sample_by_id(loaded_sample_id):
     """
     id_dict = {"loaded_sampleId": loaded_sample_id}
     return db.get_db_item_by_params(
-        models.LoadedSample, schemas.loaded_sample.ma_schema, id_dict
+        models.LoadedSample,
+        schemas.loaded_sample.ma_schema,
+        id_dict,
+        conditional=True,
     )
 
 
@@ -92,6 +95,65 @@ def get_all_crystal_slurry():
     return schemas.crystal_slurry.ma_schema.dump(crystal_slurry_list, many=True)
 
 
+def check_crystals(crystal_ids):
+    """Checks that crystals exist in ispyb_core.
+
+    All crystals are requested in a single call of the service connector.
+
+    Args:
+        crystal_ids (list): crystal ids
+    """
+    if None in crystal_ids:
+        abort(HTTPStatus.NOT_ACCEPTABLE, "No crystalId in crystalSlurry dict")
+    status_code, crystals = ispyb_service_connector.get_ispyb_resources(
+        "ispyb_core", "/samples/crystals", "crystalId", crystal_ids
+    )
+    if status_code != 200:
+        abort(status_code, str(crystals))
+    missing_ids = [
+        str(crystal_id) for crystal_id in crystal_ids if crystal_id not in crystals
+    ]
+    if missing_ids:
+        abort(
+            HTTPStatus.NOT_ACCEPTABLE,
+            "Crystals %s not found" % ", ".join(sorted(set(missing_ids))),
+        )
+
+
+async def prefetch_crystals(app, environ):
+    """Requests crystals of crystal slurry POST requests in ASGI mode.
+
+    Crystals are requested on the event loop before the request is handled,
+    so check_crystals finds them in the service connector cache.
+
+    Args:
+        app (flask app): Flask app
+        environ (dict): WSGI environ
+    """
+    path = environ["PATH_INFO"][len(app.config["API_ROOT"]) :]
+    if environ["REQUEST_METHOD"] != "POST" or path not in (
+        "/samples/crystal_slurry",
+        "/samples/crystal_slurry/bulk",
+    ):
+        return
+    body = environ["wsgi.input"].getvalue().decode("UTF-8")
+    if environ.get("CONTENT_TYPE", "").startswith(NDJSON_MIMETYPE):
+        data = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        data = json.loads(body)
+    if isinstance(data, dict):
+        data = [data]
+    crystal_ids = [
+        data_dict["crystalId"]
+        for data_dict in data
+        if isinstance(data_dict, dict) and isinstance(data_dict.get("crystalId"), int)
+    ]
+    if crystal_ids:
+        await ispyb_service_connector.get_ispyb_resources_async(
+            "ispyb_core", "/samples/crystals", "crystalId", crystal_ids, app=app
+        )
+
+
 def add_crystal_slurry(data_dict):
     """Adds a new crystal slurry item.
 
@@ -101,18 +163,26 @@ def add_crystal_slurry(data_dict):
     Returns:
         [type]: [description]
     """
-    status_code, result = ispyb_service_connector.get_ispyb_resource(
-        "ispyb_core", "/samples/crystals/%d" % data_dict["crystalId"]
+    check_crystals([data_dict.pop("crystalId", None)])
+    return db.add_db_item(
+        models.CrystalSlurry, schemas.crystal_slurry.ma_schema, data_dict
     )
-    if status_code == 200:
-        crystal_id = data_dict.get("crystalId")
-        if crystal_id is None:
-            abort(HTTPStatus.NO_CONTENT, "No crystalId in crystalSlurry dict")
-        else:
-            data_dict.pop("crystalId")
-            return db.add_db_item(
-                models.CrystalSlurry, schemas.crystal_slurry.ma_schema, data_dict
-            )
+
+
+def add_crystal_slurries(request):
+    """Adds list of crystal slurry items in a single transaction.
+
+    Crystals of all items are checked with a single service request.
+
+    Args:
+        request ([type]): flask request with JSON array or NDJSON body
+
+    Returns:
+        [type]: [description]
+    """
+    data_list = get_json_list(request)
+    check_crystals([data_dict.pop("crystalId", None) for data_dict in data_list])
+    return db.add_db_items(models.CrystalSlurry, data_list)
 
 
 def get_crystal_size_distributions():
@@ -152,14 +222,12 @@ def get_sample_delivery_devices(request):
     """
     query_params = request.args.to_dict()
 
-    return (
-        db.get_db_items(
-            models.SampleDeliveryDevice,
-            schemas.sample_delivery_device.f_schema,
-            schemas.sample_delivery_device.ma_schema,
-            query_params,
-        ),
-        HTTPStatus.OK,
+    # Returned without status code as it can be a streamed response
+    return db.get_db_items(
+        models.SampleDeliveryDevice,
+        schemas.sample_delivery_device.f_schema,
+        schemas.sample_delivery_device.ma_schema,
+        query_params,
     )
 
 
@@ -93,6 +93,19 @@ class CrystalSlurry(Resource):
         return loaded_sample.add_crystal_slurry(api.payload)
 
 
+@api.route("/crystal_slurry/bulk", endpoint="crystal_slurry_bulk")
+@api.doc(security="apikey")
+class CrystalSlurryBulk(Resource):
+    """Allows to add many crystal slurries in one request"""
+
+    @api.expect([crystal_slurry_schemas.f_schema])
+    @token_required
+    @authorization_required
+    def post(self):
+        """Adds crystal slurries from JSON array or NDJSON body"""
+        return loaded_sample.add_crystal_slurries(request)
+
+
 @api.route("/crystal_size_distribution", endpoint="crystal_size_distribution")
 @api.doc(security="apikey")
 class CrystalSizeDistribution(Resource):
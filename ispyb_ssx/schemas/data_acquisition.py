@@ -24,7 +24,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -55,4 +54,3 @@ class DataAcquisitionSchema(Schema):
 
 data_acquisition_f_schema = api.model("DataAcquisition", data_acquisition_dict_schema)
 data_acquisition_ma_schema = DataAcquisitionSchema()
-data_acquisition_json_schema = JSONSchema().dump(data_acquisition_ma_schema)
@@ -24,7 +24,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -47,4 +46,3 @@ class MasterTriggerSchema(Schema):
 
 f_schema = api.model("MasterTrigger", dict_schema)
 ma_schema = MasterTriggerSchema()
-json_schema = JSONSchema().dump(ma_schema)
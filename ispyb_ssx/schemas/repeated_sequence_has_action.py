@@ -24,7 +24,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -51,6 +50,3 @@ repeated_sequence_has_action_f_schema = api.model(
     "RepeatedSequenceHasAction", repeated_sequence_has_action_dict_schema
 )
 repeated_sequence_has_action_ma_schema = RepeatedSequenceHasActionSchema()
-repeated_sequence_has_action_json_schema = JSONSchema().dump(
-    repeated_sequence_has_action_ma_schema
-)
@@ -24,7 +24,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -59,4 +58,3 @@ class SsxDataAcquisitionSchema(Schema):
 
 f_schema = api.model("SsxDataAcquisition", dict_schema)
 ma_schema = SsxDataAcquisitionSchema()
-json_schema = JSONSchema().dump(ma_schema)
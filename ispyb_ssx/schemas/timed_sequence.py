@@ -24,7 +24,6 @@ __license__ = "LGPLv3+"
 
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -51,4 +50,3 @@ class TimedSequenceSchema(Schema):
 
 timed_sequence_f_schema = api.model("TimedSequence", timed_sequence_dict_schema)
 timed_sequence_ma_schema = TimedSequenceSchema()
-timed_sequence_json_schema = JSONSchema().dump(timed_sequence_ma_schema)
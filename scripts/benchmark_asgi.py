@@ -0,0 +1,223 @@
+# encoding: utf-8
+#
+#  Project: py-ispyb
+#  https://github.com/ispyb/py-ispyb
+#
+#  This file is part of py-ispyb software.
+#
+#  py-ispyb is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  py-ispyb is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Compares throughput of the sync WSGI and the ASGI serving modes.
+
+Usage:
+    python3 scripts/benchmark_asgi.py [config_path] [--mode test]
+        [--path /proposals] [--clients 200] [--requests 2000]
+        [--sync-workers 4] [--asgi-threads 32] [--latency 0.02]
+
+Both modes serve the same application in process. The sync mode handles
+requests with a fixed number of workers (like gunicorn sync workers) and
+the ASGI mode with app.utils.asgi.WsgiToAsgi. Every database statement is
+delayed by --latency seconds to emulate a remote MySQL server when the
+config points to a local SQLite database.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from sqlalchemy import event
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+
+ispyb_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ispyb_root)
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.utils.asgi import WsgiToAsgi  # noqa: E402
+
+
+def add_query_latency(app, latency):
+    """Delays every database statement by latency seconds."""
+    if not latency:
+        return
+
+    def before_cursor_execute(*args, **kwargs):
+        # pylint: disable=unused-argument
+        time.sleep(latency)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def get_token(app):
+    environ = EnvironBuilder(
+        path=app.config["API_ROOT"] + "/auth/login",
+        headers={"username": "admin", "password": "benchmark"},
+    ).get_environ()
+    app_iter, status, _ = run_wsgi_app(app, environ, buffered=True)
+    if not status.startswith("200"):
+        raise RuntimeError("Unable to log in (%s)" % status)
+    return app.response_class.json_module.loads(b"".join(app_iter))["token"]
+
+
+def run_sync(app, url, headers, clients, num_requests, workers):
+    """Serves requests of concurrent clients by a fixed number of workers.
+
+    Returns:
+        float, list: elapsed time and list of request latencies in seconds
+    """
+
+    def handle_request(queued_time):
+        environ = EnvironBuilder(path=url, headers=headers).get_environ()
+        app_iter, status, _ = run_wsgi_app(app, environ, buffered=True)
+        assert status.startswith("200"), status
+        return time.perf_counter() - queued_time
+
+    latencies = []
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Every client keeps one request in flight
+        pending = set()
+        sent = 0
+        while sent < min(clients, num_requests):
+            pending.add(executor.submit(handle_request, time.perf_counter()))
+            sent += 1
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                latencies.append(future.result())
+                if sent < num_requests:
+                    pending.add(executor.submit(handle_request, time.perf_counter()))
+                    sent += 1
+    return time.perf_counter() - start_time, latencies
+
+
+def run_asgi(app, url, headers, clients, num_requests, threads):
+    """Serves requests of concurrent clients by the ASGI application.
+
+    Returns:
+        float, list: elapsed time and list of request latencies in seconds
+    """
+    asgi_app = WsgiToAsgi(app, max_workers=threads)
+    path, _, query_string = url.partition("?")
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "query_string": query_string.encode("latin1"),
+        "headers": [
+            (name.lower().encode("latin1"), value.encode("latin1"))
+            for name, value in headers.items()
+        ],
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 0),
+    }
+    latencies = []
+    counter = {"sent": 0}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def client():
+        while counter["sent"] < num_requests:
+            counter["sent"] += 1
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            start_time = time.perf_counter()
+            await asgi_app(dict(scope), receive, send)
+            assert messages[0]["status"] == 200, messages[0]["status"]
+            latencies.append(time.perf_counter() - start_time)
+
+    async def run_clients():
+        await asyncio.gather(*[client() for _ in range(clients)])
+
+    start_time = time.perf_counter()
+    asyncio.run(run_clients())
+    elapsed = time.perf_counter() - start_time
+    asgi_app.executor.shutdown()
+    return elapsed, latencies
+
+
+def print_result(name, elapsed, latencies):
+    latencies = sorted(latencies)
+    print(
+        "%-6s %10.1f %10.1f %10.1f %10.1f"
+        % (
+            name,
+            len(latencies) / elapsed,
+            statistics.median(latencies) * 1e3,
+            latencies[int(len(latencies) * 0.99) - 1] * 1e3,
+            latencies[-1] * 1e3,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "config_path",
+        nargs="?",
+        default=os.getenv("ISPYB_CONFIG", "ispyb_core_config.yml"),
+    )
+    parser.add_argument("--mode", default="test", help="run mode (dev, test, prod)")
+    parser.add_argument("--path", default="/proposals", help="requested resource")
+    parser.add_argument("--clients", type=int, default=200, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="number of requests")
+    parser.add_argument("--sync-workers", type=int, default=4, help="sync workers")
+    parser.add_argument("--asgi-threads", type=int, default=None, help="ASGI threads")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="delay per SQL statement [s]"
+    )
+    args = parser.parse_args()
+
+    app = create_app(args.config_path, args.mode)
+    add_query_latency(app, args.latency)
+    asgi_threads = args.asgi_threads or app.config.get("ASGI_THREADS", 32)
+    url = app.config["API_ROOT"] + args.path
+    headers = {"Authorization": "Bearer %s" % get_token(app)}
+
+    print(
+        "%d requests of %d clients to %s, %.0f ms per SQL statement"
+        % (args.requests, args.clients, args.path, args.latency * 1e3)
+    )
+    print(
+        "%-6s %10s %10s %10s %10s"
+        % ("Mode", "Req/s", "p50 [ms]", "p99 [ms]", "Max [ms]")
+    )
+    print_result(
+        "sync",
+        *run_sync(app, url, headers, args.clients, args.requests, args.sync_workers)
+    )
+    print_result(
+        "asgi",
+        *run_asgi(app, url, headers, args.clients, args.requests, asgi_threads)
+    )
+    print()
+    print("sync workers: %d, ASGI threads: %d" % (args.sync_workers, asgi_threads))
+
+
+if __name__ == "__main__":
+    main()
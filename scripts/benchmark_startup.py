@@ -0,0 +1,148 @@
+# encoding: utf-8
+#
+#  Project: py-ispyb
+#  https://github.com/ispyb/py-ispyb
+#
+#  This file is part of py-ispyb software.
+#
+#  py-ispyb is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  py-ispyb is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Reports application startup time and import time per module.
+
+Usage:
+    python3 scripts/benchmark_startup.py [config_path] [--mode test]
+        [--top 30] [--repeat 3] [--all]
+
+The application is created in a fresh interpreter started with
+-X importtime, so every run measures a cold start.
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+ispyb_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_PACKAGES = ("app", "ispyb_core", "ispyb_ssx", "flask_restx_patched", "config")
+
+CREATE_APP_CODE = """
+import sys
+import time
+sys.path.insert(0, %(root)r)
+start = time.perf_counter()
+from app import create_app
+create_app(%(config_path)r, %(mode)r)
+print("CREATE_APP_TIME %%f" %% (time.perf_counter() - start))
+"""
+
+
+def run_create_app(config_path, mode):
+    """Creates application in a new interpreter.
+
+    Args:
+        config_path (str): path to the yml config file
+        mode (str): run mode (dev, test, prod)
+
+    Returns:
+        float, list: create_app time in seconds and list of
+            (module name, self time, cumulative time) tuples in seconds
+    """
+    code = CREATE_APP_CODE % {
+        "root": ispyb_root,
+        "config_path": config_path,
+        "mode": mode,
+    }
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ispyb_root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+    create_app_time = None
+    for line in process.stdout.splitlines():
+        if line.startswith("CREATE_APP_TIME"):
+            create_app_time = float(line.split()[1])
+
+    import_times = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative_time, module_name = line[len("import time:") :].split("|")
+        import_times.append(
+            (
+                module_name.strip(),
+                int(self_time) / 1e6,
+                int(cumulative_time) / 1e6,
+            )
+        )
+    return create_app_time, import_times
+
+
+def is_project_module(module_name):
+    return module_name.split(".")[0] in PROJECT_PACKAGES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "config_path",
+        nargs="?",
+        default=os.getenv("ISPYB_CONFIG", "ispyb_core_config.yml"),
+    )
+    parser.add_argument("--mode", default="test", help="run mode (dev, test, prod)")
+    parser.add_argument("--top", type=int, default=30, help="number of listed modules")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    parser.add_argument(
+        "--all", action="store_true", help="list third party modules as well"
+    )
+    args = parser.parse_args()
+
+    create_app_times = []
+    for _ in range(args.repeat):
+        create_app_time, import_times = run_create_app(args.config_path, args.mode)
+        create_app_times.append(create_app_time)
+
+    if not args.all:
+        import_times = [item for item in import_times if is_project_module(item[0])]
+    import_times.sort(key=lambda item: item[1], reverse=True)
+
+    print("%-60s %10s %12s" % ("Module", "Self [ms]", "Total [ms]"))
+    for module_name, self_time, cumulative_time in import_times[: args.top]:
+        print(
+            "%-60s %10.1f %12.1f" % (module_name, self_time * 1e3, cumulative_time * 1e3)
+        )
+    print()
+    print(
+        "Import time of listed modules: %.1f ms (last run)"
+        % (sum(item[1] for item in import_times) * 1e3)
+    )
+    print(
+        "create_app time: median %.1f ms, min %.1f ms (%d runs)"
+        % (
+            statistics.median(create_app_times) * 1e3,
+            min(create_app_times) * 1e3,
+            len(create_app_times),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -63,7 +63,6 @@ licence_header_file.close()
 schema_file_header += """
 from marshmallow import Schema, fields as ma_fields
 from flask_restx import fields as f_fields
-from marshmallow_jsonschema import JSONSchema
 
 from app.extensions.api import api_v1 as api
 
@@ -127,7 +126,6 @@ for table in tables:
 
         class_text = "f_schema = api.model('%s', dict_schema)\n" % (table_name,)
         class_text += "ma_schema = %sSchema()\n" % (table_name)
-        json_text = "json_schema = JSONSchema().dump(ma_schema)\n"
 
         schema_file_path = "%s/ispyb_ssx/schemas/%s.py" % (ispyb_root, schema_name)
         if not os.path.exists(os.path.dirname(schema_file_path)):
@@ -138,7 +136,6 @@ for table in tables:
         schema_file.write(ma_text)
         schema_file.write("\n")
         schema_file.write(class_text)
-        schema_file.write(json_text)
         schema_file.close()
 
 print("done")
@@ -63,4 +63,116 @@ def test_post(ispyb_core_app, ispyb_core_token):
     assert response.status_code == 200, "[POST] %s failed" % route
     lab_contact_id = response.json["labContactId"]
     print("LabContact id: %d" % lab_contact_id)
-    assert lab_contact_id
\ No newline at end of file
+    assert lab_contact_id
+
+
+def test_bulk_post(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+
+    route = ispyb_core_app.config["API_ROOT"] + "/autoproc/programs/messages/bulk"
+    message_list = [
+        {"severity": "INFO", "message": "Bulk message 1"},
+        {"severity": "WARNING", "message": "Bulk message 2"},
+    ]
+    response = client.post(route, json=message_list, headers=headers)
+
+    assert response.status_code == 200, "[POST] %s failed" % route
+    assert response.json["data"]["total"] == 2
+    assert all(response.json["data"]["rows"])
+
+    headers["Content-Type"] = "application/x-ndjson"
+    body = '{"severity": "INFO", "message": "Bulk message 3"}\n'
+    response = client.post(route, data=body, headers=headers)
+
+    assert response.status_code == 200, "[POST] %s failed" % route
+    assert response.json["data"]["total"] == 1
+
+
+def test_batch_post(ispyb_core_app, ispyb_core_token, monkeypatch):
+    from app.extensions.auth import auth_provider
+
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+
+    # Batch patch needs the rule of the item endpoint
+    monkeypatch.setitem(
+        auth_provider.authorization_rules,
+        ("shipment_by_id", "patch"),
+        frozenset(["admin"]),
+    )
+
+    route = ispyb_core_app.config["API_ROOT"] + "/batch"
+    operations = [
+        {
+            "op": "create",
+            "resource": "Shipping",
+            "ref": "shipping",
+            "data": data.test_shippment,
+        },
+        {
+            "op": "create",
+            "resource": "Dewar",
+            "ref": "dewar",
+            "data": {
+                "shippingId": {"$ref": "shipping"},
+                "code": "Batch dewar",
+                "type": "Dewar",
+            },
+        },
+        {
+            "op": "patch",
+            "resource": "Shipping",
+            "id": {"$ref": "shipping"},
+            "data": {"comments": {"$ref": "dewar.code"}},
+        },
+    ]
+    response = client.post(route, json=operations, headers=headers)
+
+    assert response.status_code == 200, "[POST] %s failed" % route
+    rows = response.json["data"]["rows"]
+    assert rows[1]["data"]["shippingId"] == rows[0]["id"]
+    assert rows[2]["data"]["comments"] == "Batch dewar"
+
+    operations[2]["id"] = {"$ref": "unknown"}
+    response = client.post(route, json=operations, headers=headers)
+    assert response.status_code == 406, "[POST] %s should fail" % route
+
+    # Dewars have no write routes for items
+    for operation in (
+        {"op": "patch", "resource": "Dewar", "id": 1, "data": {"comments": "x"}},
+        {"op": "delete", "resource": "Dewar", "id": 1},
+    ):
+        response = client.post(route, json=[operation], headers=headers)
+        assert response.status_code == 406, "[POST] %s should be refused" % route
+
+    # Shipments can be deleted only if a rule of the item endpoint grants it
+    operations = [{"op": "delete", "resource": "Shipping", "id": 1}]
+    response = client.post(route, json=operations, headers=headers)
+    assert response.status_code == 401, "[POST] %s should be refused" % route
+
+
+def test_batch_post_authorization(ispyb_core_app, monkeypatch):
+    from app.extensions.auth import auth_provider
+
+    client = ispyb_core_app.test_client()
+    api_root = ispyb_core_app.config["API_ROOT"]
+    response = client.get(
+        api_root + "/auth/login", headers={"username": "user", "password": "pass"}
+    )
+    headers = {"Authorization": "Bearer " + response.json["token"]}
+
+    # Shipments can be created by admins only
+    monkeypatch.setitem(
+        auth_provider.authorization_rules, ("shipments", "post"), frozenset(["admin"])
+    )
+    operations = [
+        {"op": "create", "resource": "Shipping", "data": data.test_shippment},
+    ]
+    route = api_root + "/batch"
+    response = client.post(route, json=operations, headers=headers)
+    assert response.status_code == 401, "[POST] %s should be refused" % route
+
+    route = api_root + "/shipments"
+    response = client.post(route, json=data.test_shippment, headers=headers)
+    assert response.status_code == 401, "[POST] %s should be refused" % route
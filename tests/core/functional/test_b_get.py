@@ -19,6 +19,9 @@
 #  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
+import json
+
+from tests.core import data
 from tests.core.data import test_proposal
 
 
@@ -41,6 +44,18 @@ def test_get(ispyb_core_app, ispyb_core_token):
         "/contacts/persons?login=boaty",
         "/data_collections",
         "/data_collections?offset=1&limit=1",
+        "/data_collections?after=&limit=1",
+        "/proposals?after=&limit=1",
+        "/proposals?count=none",
+        "/proposals?count=cached",
+        "/data_collections?count=estimate",
+        "/data_collections?fields=dataCollectionId,startTime,runStatus",
+        "/proposals?fields=proposalId,title",
+        "/sessions/info?limit=5",
+        "/data_collections?startTime__gte=2000-01-01T00:00:00&runStatus__in=a,b",
+        "/proposals?proposalCode__startswith=c&proposalId__gt=0",
+        "/data_collections?order_by=-startTime&limit=5",
+        "/data_collections?order_by=-startTime&after=&limit=5",
 
     ]
 
@@ -54,4 +69,104 @@ def test_get(ispyb_core_app, ispyb_core_token):
         #print("[GET] %s : %s" % (route, str(data)))
 
         assert response.status_code == 200, "[GET] %s " % (route)
-        assert data, "[GET] %s No data returned" % route
\ No newline at end of file
+        assert data, "[GET] %s No data returned" % route
+
+def test_get_malformed_cursor(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+
+    for cursor in ("not a cursor", "W1sxXV0="):
+        route = ispyb_core_app.config["API_ROOT"] + "/proposals?after=" + cursor
+        response = client.get(route, headers=headers)
+
+        assert response.status_code == 400, "[GET] %s " % (route)
+
+
+def test_get_export(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    route = ispyb_core_app.config["API_ROOT"] + "/proposals?fields=proposalId,title"
+
+    headers = {
+        "Authorization": "Bearer " + ispyb_core_token,
+        "Accept": "application/x-ndjson",
+    }
+    response = client.get(route, headers=headers)
+
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines, "[GET] %s No data returned" % route
+    assert all(json.loads(line)["proposalId"] for line in lines)
+
+    headers["Accept"] = "text/csv"
+    response = client.get(route, headers=headers)
+
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert response.mimetype == "text/csv"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == "proposalId,title"
+
+
+def test_get_conditional(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+
+    for endpoint in ("/proposals", "/proposals?limit=1"):
+        route = ispyb_core_app.config["API_ROOT"] + endpoint
+        response = client.get(route, headers=headers)
+        etag = response.headers.get("ETag")
+
+        assert response.status_code == 200, "[GET] %s " % (route)
+        assert etag, "[GET] %s No ETag returned" % route
+
+        response = client.get(route, headers=dict(headers, **{"If-None-Match": etag}))
+        assert response.status_code == 304, "[GET] %s " % (route)
+
+
+def test_get_conditional_after_insert(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+    api_root = ispyb_core_app.config["API_ROOT"]
+
+    person_dict = data.get_test_person()
+    route = api_root + "/contacts/persons"
+    response = client.post(route, json=person_dict, headers=headers)
+    assert response.status_code == 200
+    person_id = response.json["personId"]
+
+    # The person lookup by login must not set the ETag of the proposal list
+    route = api_root + "/proposals?login_name=%s" % person_dict["login"]
+    response = client.get(route, headers=headers)
+    etag = response.headers.get("ETag")
+    assert response.status_code == 200, "[GET] %s " % (route)
+
+    proposal_dict = dict(data.test_proposal, personId=person_id)
+    response = client.post(api_root + "/proposals", json=proposal_dict, headers=headers)
+    assert response.status_code == 200
+
+    response = client.get(route, headers=dict(headers, **{"If-None-Match": etag}))
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert response.headers.get("ETag") != etag
+
+
+def test_get_by_ids(ispyb_core_app, ispyb_core_token):
+    client = ispyb_core_app.test_client()
+    headers = {"Authorization": "Bearer " + ispyb_core_token}
+
+    route = ispyb_core_app.config["API_ROOT"] + "/proposals?limit=2"
+    response = client.get(route, headers=headers)
+    proposal_ids = [row["proposalId"] for row in response.json["data"]["rows"]]
+
+    route = ispyb_core_app.config["API_ROOT"] + "/proposals?ids=%s,999999999" % (
+        ",".join(str(proposal_id) for proposal_id in proposal_ids)
+    )
+    response = client.get(route, headers=headers)
+    assert response.status_code == 200, "[GET] %s " % (route)
+    assert sorted(response.json["data"]["rows"]) == sorted(
+        str(proposal_id) for proposal_id in proposal_ids
+    )
+    assert response.json["data"]["not_found"] == [999999999]
+
+    route = ispyb_core_app.config["API_ROOT"] + "/proposals?ids=first"
+    response = client.get(route, headers=headers)
+    assert response.status_code == 406, "[GET] %s " % (route)
@@ -0,0 +1,100 @@
+# encoding: utf-8
+#
+#  Project: py-ispyb
+#  https://github.com/ispyb/py-ispyb
+#
+#  This file is part of py-ispyb software.
+#
+#  py-ispyb is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  py-ispyb is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
+
+import datetime
+
+from app.extensions.user_office_link.AbstractUserOfficeLink import AbstractUserOfficeLink
+from ispyb_core import models
+from ispyb_core.modules import user_office
+
+
+class FakeUserOfficeLink(AbstractUserOfficeLink):
+    def __init__(self, changes):
+        self.changes = changes
+        self.requested_since = []
+
+    def sync_all(self):
+        return user_office.sync_changes(self)
+
+    def get_changes(self, since):
+        self.requested_since.append(since)
+        return self.changes
+
+    def update_proposal(self, code, number):
+        pass
+
+
+def test_user_office_sync(ispyb_core_app):
+    last_modified = datetime.datetime(2021, 1, 1)
+    user_office_link = FakeUserOfficeLink(
+        {
+            "persons": [{"login": "sync_user", "familyName": "Sync"}],
+            "proposals": [
+                {
+                    "proposalCode": "MX",
+                    "proposalNumber": "9901",
+                    "title": "Synced proposal",
+                    "personLogin": "sync_user",
+                }
+            ],
+            "sessions": [
+                {
+                    "expSessionPk": 9901,
+                    "proposalCode": "MX",
+                    "proposalNumber": "9901",
+                    "beamLineName": "id30a1",
+                }
+            ],
+            "last_modified": last_modified,
+        }
+    )
+
+    summary = user_office_link.sync_all()
+    assert summary["proposals"] == {"inserted": 1, "updated": 0}
+    assert summary["sessions"] == {"inserted": 1, "updated": 0}
+    assert user_office.get_high_water_mark() == last_modified
+
+    proposal = models.Proposal.query.filter_by(
+        proposalCode="MX", proposalNumber="9901"
+    ).one()
+    session = models.BLSession.query.filter_by(expSessionPk=9901).one()
+    assert session.proposalId == proposal.proposalId
+
+    # Unchanged items are not written again
+    summary = user_office_link.sync_all()
+    assert summary["persons"] == {"inserted": 0, "updated": 0}
+    assert user_office_link.requested_since[-1] == last_modified
+
+    # High water mark is kept across restarts
+    restarted_link = FakeUserOfficeLink(user_office_link.changes)
+    restarted_link.sync_all()
+    assert restarted_link.requested_since == [last_modified]
+
+    user_office_link.changes["proposals"][0]["title"] = "Updated title"
+    summary = user_office_link.sync_all()
+    assert summary["proposals"] == {"inserted": 0, "updated": 1}
+    assert models.Proposal.query.get(proposal.proposalId).title == "Updated title"
+
+    # Attributes not reported by the user office are not overwritten
+    user_office_link.changes["proposals"][0]["title"] = None
+    user_office_link.changes["proposals"][0]["proposalType"] = "MX"
+    summary = user_office_link.sync_all()
+    assert summary["proposals"] == {"inserted": 0, "updated": 1}
+    assert models.Proposal.query.get(proposal.proposalId).title == "Updated title"
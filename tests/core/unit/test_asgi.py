@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+
+from flask import Flask, Response, request
+
+from app.utils.asgi import WsgiToAsgi
+
+
+def call_asgi_app(asgi_app, scope, body=b""):
+    messages = []
+    requests = [
+        {"type": "http.request", "body": body[:3], "more_body": True},
+        {"type": "http.request", "body": body[3:], "more_body": False},
+    ]
+
+    async def receive():
+        return requests.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    return messages
+
+
+def get_scope(method, path, query_string=b"", headers=()):
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "query_string": query_string,
+        "headers": list(headers),
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 1234),
+    }
+
+
+def test_asgi_request():
+    app = Flask(__name__)
+
+    @app.route("/items", methods=["POST"])
+    def post_items():
+        return {"data": request.get_json(), "limit": request.args["limit"]}
+
+    @app.route("/stream")
+    def stream():
+        return Response((str(index) for index in range(3)), mimetype="text/plain")
+
+    asgi_app = WsgiToAsgi(app, max_workers=2)
+    messages = call_asgi_app(
+        asgi_app,
+        get_scope(
+            "POST",
+            "/items",
+            b"limit=5",
+            [(b"content-type", b"application/json")],
+        ),
+        b'{"id": 1}',
+    )
+    assert messages[0]["type"] == "http.response.start"
+    assert messages[0]["status"] == 200
+    assert json.loads(messages[1]["body"]) == {
+        "data": {"id": 1},
+        "limit": "5",
+    }
+    assert messages[-1]["more_body"] is False
+
+    messages = call_asgi_app(asgi_app, get_scope("GET", "/stream"))
+    assert [message["body"] for message in messages[1:]] == [b"0", b"1", b"2", b""]
+
+    messages = call_asgi_app(asgi_app, get_scope("GET", "/unknown"))
+    assert messages[0]["status"] == 404
+
+
+def test_asgi_disconnect():
+    app = Flask(__name__)
+    closed = []
+
+    @app.route("/events")
+    def events():
+        def generate():
+            try:
+                while True:
+                    time.sleep(0.01)
+                    yield "data: {}\n\n"
+            finally:
+                closed.append(True)
+
+        return Response(generate(), mimetype="text/event-stream")
+
+    async def run():
+        messages = []
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop(0)
+            await asyncio.sleep(0.1)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        await asyncio.wait_for(
+            WsgiToAsgi(app, max_workers=1)(get_scope("GET", "/events"), receive, send),
+            timeout=5,
+        )
+        return messages
+
+    messages = asyncio.run(run())
+    assert messages[0]["status"] == 200
+    assert closed == [True]
+
+
+def test_asgi_prefetch():
+    app = Flask(__name__)
+    prefetched = {}
+
+    async def prefetch(environ):
+        await asyncio.sleep(0)
+        prefetched[environ["PATH_INFO"]] = json.loads(environ["wsgi.input"].read())
+        environ["wsgi.input"].seek(0)
+
+    async def failing_prefetch(environ):
+        raise ValueError("Service not available")
+
+    @app.route("/items", methods=["POST"])
+    def post_items():
+        return {"prefetched": prefetched.get(request.path) == request.get_json()}
+
+    asgi_app = WsgiToAsgi(
+        app, max_workers=1, prefetchers=[prefetch, failing_prefetch]
+    )
+    messages = call_asgi_app(
+        asgi_app,
+        get_scope("POST", "/items", headers=[(b"content-type", b"application/json")]),
+        b'{"crystalId": 1}',
+    )
+
+    assert messages[0]["status"] == 200
+    assert json.loads(messages[1]["body"]) == {"prefetched": True}
@@ -0,0 +1,66 @@
+import time
+
+from flask import Flask
+
+from app.extensions.auth import AuthProvider
+from app.extensions.auth.MemoryTokenStore import MemoryTokenStore
+from app.extensions.auth.SQLiteTokenStore import SQLiteTokenStore
+
+
+def test_token_store_lookup():
+    store = MemoryTokenStore()
+    store.add("token_a", "user_a", ["user"])
+    store.add("token_b", "user_b", ["manager"])
+
+    assert store.get("token_a")["username"] == "user_a"
+    assert not store.get("token_a")["is_admin"]
+    assert store.get("token_b")["is_admin"]
+    assert store.get_by_username("user_b")["token"] == "token_b"
+    assert store.get("unknown") is None
+
+
+def test_token_store_expiry():
+    store = MemoryTokenStore()
+    store.add("token_a", "user_a", ["user"], expires=time.time() - 1)
+
+    assert store.get("token_a") is None
+    assert store.get_by_username("user_a") is None
+
+    store.add("token_b", "user_b", ["user"], expires=time.time() - 1)
+    store.add("token_c", "user_c", ["user"])
+
+    assert len(store) == 1
+
+
+def test_sqlite_token_store_shared(tmp_path):
+    path = str(tmp_path / "tokens.sqlite")
+    worker_a = SQLiteTokenStore(path)
+    worker_b = SQLiteTokenStore(path)
+    app = Flask(__name__)
+    worker_a.init_app(app)
+    worker_b.init_app(app)
+
+    worker_a.add("token_a", "user_a", ["manager"], expires=time.time() + 60)
+    worker_a.add("token_b", "user_b", ["user"], expires=time.time() - 1)
+
+    assert worker_b.get("token_a")["roles"] == ["manager"]
+    assert worker_b.get("token_a")["is_admin"]
+    assert worker_b.get_by_username("user_a")["token"] == "token_a"
+    assert worker_b.get("token_b") is None
+
+    worker_b.remove("token_a")
+    assert worker_a.get("token_a") is None
+
+
+def test_compile_authorization_rules():
+    compiled_rules = AuthProvider.compile_authorization_rules(
+        {
+            "proposals": {"get": ["all"], "post": ["admin"]},
+            "proposal_by_id": {"GET": [], "put": ["admin", "manager"]},
+        }
+    )
+
+    assert compiled_rules == {
+        ("proposals", "post"): frozenset(["admin"]),
+        ("proposal_by_id", "put"): frozenset(["admin", "manager"]),
+    }
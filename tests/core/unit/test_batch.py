@@ -0,0 +1,32 @@
+import pytest
+
+from ispyb_core.modules.batch import resolve_refs
+
+
+def test_resolve_refs():
+    results_by_ref = {
+        "0": {"id": 1, "data": {"shippingId": 1, "shippingName": "Test"}},
+        "shipping": {"id": 1, "data": {"shippingId": 1, "shippingName": "Test"}},
+    }
+    value = {
+        "shippingId": {"$ref": "shipping"},
+        "comments": {"$ref": "0.shippingName"},
+        "code": "Dewar",
+        "items": [{"$ref": "0"}],
+    }
+
+    assert resolve_refs(value, results_by_ref) == {
+        "shippingId": 1,
+        "comments": "Test",
+        "code": "Dewar",
+        "items": [1],
+    }
+
+
+def test_resolve_unknown_refs():
+    results_by_ref = {"shipping": {"id": 1, "data": {"shippingId": 1}}}
+
+    with pytest.raises(ValueError):
+        resolve_refs({"$ref": "dewar"}, results_by_ref)
+    with pytest.raises(ValueError):
+        resolve_refs({"$ref": "shipping.unknown"}, results_by_ref)
@@ -0,0 +1,77 @@
+import sqlalchemy
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
+
+from app.extensions.flask_sqlalchemy import bulk_insert
+from ispyb_core import models
+
+
+Base = declarative_base()
+
+
+class Message(Base):
+    __tablename__ = "Message"
+
+    messageId = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    message = sqlalchemy.Column(sqlalchemy.String(200))
+    severity = sqlalchemy.Column(sqlalchemy.String(10))
+
+
+def test_get_autoincrement_pk():
+    pk_name, column = bulk_insert.get_autoincrement_pk(models.AutoProcProgramMessage)
+    assert pk_name == "autoProcProgramMessageId"
+    assert column.name == "autoProcProgramMessageId"
+
+    # Composite primary key
+    assert bulk_insert.get_autoincrement_pk(models.ImageQualityIndicator) == (
+        None,
+        None,
+    )
+
+
+def test_group_by_keys():
+    mappings = [
+        {"severity": "INFO", "message": "1"},
+        {"severity": "INFO"},
+        {"message": "3", "severity": "WARNING"},
+    ]
+    assert bulk_insert.group_by_keys(mappings) == [[0, 2], [1]]
+
+
+def test_multi_values_statement():
+    mapper = sqlalchemy.inspect(models.AutoProcProgramMessage)
+    rows = [
+        {mapper.column_attrs["message"].columns[0]: "message %d" % index}
+        for index in range(3)
+    ]
+    statement = models.AutoProcProgramMessage.__table__.insert().values(rows)
+    sql = str(statement.compile(dialect=mysql.dialect()))
+
+    assert sql.count("INSERT") == 1
+    assert sql.count("(%s)") == 3
+
+
+def test_insert_multi_values():
+    engine = sqlalchemy.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    session.add(Message(messageId=1, message="existing"))
+    session.flush()
+
+    mappings = [
+        {"message": "a"},
+        {"message": "b", "messageId": None},
+        {"message": "c", "messageId": 10},
+        {"message": "d"},
+        {"message": "e", "severity": "INFO"},
+        {"message": "f", "messageId": 11},
+        {"message": "g"},
+    ]
+    bulk_insert.insert_multi_values(session, Message, mappings, batch_size=2)
+
+    ids = {mapping["message"]: mapping["messageId"] for mapping in mappings}
+    assert ids["c"] == 10 and ids["f"] == 11
+    assert len(set(ids.values())) == len(mappings)
+    rows = dict(session.query(Message.message, Message.messageId))
+    assert rows == dict(ids, existing=1)
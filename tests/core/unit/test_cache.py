@@ -0,0 +1,24 @@
+import time
+
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache(ttl=0.05)
+    cache.set("key", 1)
+
+    assert cache.get("key") == 1
+    time.sleep(0.1)
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_lru_eviction():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
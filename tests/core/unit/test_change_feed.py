@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+
+from app.utils.change_feed import ChangeFeed, decode_cursor, encode_cursor
+
+
+Base = declarative_base()
+
+
+class Message(Base):
+    __tablename__ = "Message"
+
+    messageId = Column(Integer, primary_key=True)
+    message = Column(String(45))
+
+
+class Status(Base):
+    __tablename__ = "Status"
+
+    statusId = Column(Integer, primary_key=True)
+    status = Column(String(45))
+
+
+FEED_MODELS = {"Message": Message, "Status": Status}
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    db_url = "sqlite:///%s" % (tmp_path / "feed.db")
+    Base.metadata.create_all(create_engine(db_url))
+    return db_url
+
+
+def insert(engine, model, **values):
+    with engine.begin() as connection:
+        connection.execute(model.__table__.insert().values(**values))
+
+
+def test_change_feed_workers(db_url):
+    # Two server processes with their own feed and connection pool
+    engine_a, engine_b = create_engine(db_url), create_engine(db_url)
+    feed_a = ChangeFeed(FEED_MODELS, poll_interval=0)
+    feed_b = ChangeFeed(FEED_MODELS, poll_interval=0)
+
+    insert(engine_a, Message, message="old")
+    cursor = encode_cursor(feed_a.get_last_ids(engine_a))
+    assert decode_cursor(cursor, FEED_MODELS) == {"Message": 1, "Status": 0}
+
+    insert(engine_a, Message, message="a")
+    insert(engine_b, Status, status="b")
+
+    # Cursor issued by worker a is continued by worker b
+    last_ids = decode_cursor(cursor, FEED_MODELS)
+    rows = feed_b.read(engine_b, last_ids)
+    assert [(event_type, row_id) for event_type, row_id, _ in rows] == [
+        ("Message", 2),
+        ("Status", 1),
+    ]
+    assert rows[0][2] == {"messageId": 2, "message": "a"}
+
+    assert feed_b.read(engine_b, last_ids, limit=1) == rows[:1]
+    assert feed_a.read(engine_a, {"Message": 2, "Status": 1}) == []
+
+
+def test_change_feed_wait(db_url):
+    engine = create_engine(db_url)
+    feed = ChangeFeed(FEED_MODELS, poll_interval=0.1)
+    last_ids = feed.get_last_ids(engine)
+
+    assert not feed.wait(engine, last_ids, timeout=0.2)
+
+    # Row inserted outside of the process is found by polling
+    external_engine = create_engine(db_url)
+    timer = threading.Timer(0.1, insert, args=(external_engine, Message))
+    timer.start()
+    start = time.monotonic()
+    assert feed.wait(engine, last_ids, timeout=5)
+    assert time.monotonic() - start < 1
+    timer.join()
+
+    # Local commit wakes up the readers without waiting for the poll
+    feed.poll_interval = 60
+    last_ids = feed.get_last_ids(engine)
+
+    def insert_and_notify():
+        insert(engine, Status)
+        feed.notify()
+
+    timer = threading.Timer(0.1, insert_and_notify)
+    timer.start()
+    start = time.monotonic()
+    assert feed.wait(engine, last_ids, timeout=5)
+    assert time.monotonic() - start < 1
+    timer.join()
+
+    # Waiting stops when the client disconnects
+    disconnected = threading.Event()
+    disconnected.set()
+    start = time.monotonic()
+    assert not feed.wait(engine, feed.get_last_ids(engine), 5, disconnected)
+    assert time.monotonic() - start < 1
+
+
+def test_change_feed_cursor():
+    cursor = encode_cursor({"Message": 3, "Status": 0})
+    assert decode_cursor(cursor, FEED_MODELS) == {"Message": 3, "Status": 0}
+
+    for cursor in (
+        "1",
+        "abc.1",
+        encode_cursor({"Message": 3}),
+        encode_cursor({"Message": "3", "Status": 0}),
+        encode_cursor([3, 0]),
+    ):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, FEED_MODELS)
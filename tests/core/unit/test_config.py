@@ -0,0 +1,11 @@
+from config import BaseConfig
+
+
+def test_database_section(tmp_path):
+    config_file = tmp_path / "config.yml"
+    config_file.write_text("server:\n  API_ROOT: /api\ndatabase:\n  pool_size: 5\n")
+
+    config = BaseConfig(str(config_file))
+
+    assert config.DATABASE == {"pool_pre_ping": True, "pool_size": 5}
+    assert BaseConfig.DATABASE == {"pool_pre_ping": True}
@@ -0,0 +1,52 @@
+import datetime
+
+import pytest
+from flask_restx import fields as f_fields
+
+from app.extensions.flask_sqlalchemy import filtering
+from ispyb_core import models
+
+
+dict_schema = {
+    "dataCollectionId": f_fields.Integer(),
+    "startTime": f_fields.DateTime(),
+    "runStatus": f_fields.String(),
+    "resolution": f_fields.Float(),
+}
+
+
+def test_parse_filters():
+    filters = filtering.parse_filters(
+        {
+            "startTime__gte": "2020-01-01T00:00:00",
+            "runStatus__in": "Successful,Failed",
+            "resolution__lt": "2.5",
+            "runStatus": "Successful",
+            "limit": "10",
+        },
+        dict_schema,
+    )
+
+    assert filters == [
+        ("startTime", "gte", datetime.datetime(2020, 1, 1)),
+        ("runStatus", "in", ["Successful", "Failed"]),
+        ("resolution", "lt", 2.5),
+    ]
+
+
+def test_parse_filters_errors():
+    with pytest.raises(ValueError):
+        filtering.parse_filters({"resolution__lt": "high"}, dict_schema)
+    with pytest.raises(ValueError):
+        filtering.parse_filters({"resolution__like": "2"}, dict_schema)
+    with pytest.raises(ValueError):
+        filtering.parse_filters({"resolution__startswith": "2"}, dict_schema)
+    with pytest.raises(ValueError):
+        filtering.parse_filters({"unknown__gte": "2"}, dict_schema)
+
+
+def test_check_indexed():
+    filtering.check_indexed(models.DataCollection, ["startTime", "SESSIONID"])
+
+    with pytest.raises(ValueError):
+        filtering.check_indexed(models.DataCollection, ["resolution"])
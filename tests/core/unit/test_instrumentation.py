@@ -0,0 +1,46 @@
+import sqlalchemy
+
+from app.extensions.instrumentation import Histogram
+from app.extensions.flask_sqlalchemy import pool
+
+
+def test_histogram_lines():
+    histogram = Histogram("test_duration_seconds", "Test duration", (0.1, 1))
+    histogram.observe("proposals", 0.05)
+    histogram.observe("proposals", 0.5)
+    histogram.observe("proposals", 5)
+
+    lines = histogram.get_lines()
+
+    assert "# TYPE test_duration_seconds histogram" in lines
+    assert 'test_duration_seconds_bucket{endpoint="proposals",le="0.1"} 1' in lines
+    assert 'test_duration_seconds_bucket{endpoint="proposals",le="1"} 2' in lines
+    assert 'test_duration_seconds_bucket{endpoint="proposals",le="+Inf"} 3' in lines
+    assert 'test_duration_seconds_count{endpoint="proposals"} 3' in lines
+
+
+def test_pool_metric_lines(tmp_path):
+    engine = sqlalchemy.create_engine(
+        "sqlite:///%s" % (tmp_path / "pool.sqlite"),
+        poolclass=pool.TimedQueuePool,
+        pool_size=2,
+        max_overflow=2,
+    )
+    connection = engine.connect()
+
+    lines = pool.get_pool_metric_lines(engine)
+    connection.close()
+
+    assert "ispyb_db_pool_size 2" in lines
+    assert "ispyb_db_pool_checked_out 1" in lines
+    assert "ispyb_db_pool_utilization 0.25" in lines
+    assert 'ispyb_db_pool_wait_seconds_count{endpoint="unknown"} 1' in lines
+
+
+def test_engine_options():
+    database_config = {"pool_size": 5, "pool_pre_ping": True}
+
+    assert pool.get_engine_options(database_config, "sqlite") == {
+        "pool_pre_ping": True
+    }
+    assert pool.get_engine_options(database_config, "mysql")["pool_size"] == 5
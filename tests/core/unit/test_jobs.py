@@ -0,0 +1,54 @@
+import time
+
+from flask import Flask
+
+from app.extensions.jobs import JobQueue, JOB_FAILED, JOB_FINISHED
+from app.extensions.user_office_link.DummyUserOfficeLink import DummyUserOfficeLink
+from ispyb_core.modules import user_office
+
+
+def test_job_queue_user_office_sync(monkeypatch):
+    synced_links = []
+
+    def sync_changes(user_office_link):
+        synced_links.append(user_office_link)
+        return user_office_link.get_changes(None)
+
+    monkeypatch.setattr(user_office, "sync_changes", sync_changes)
+    app = Flask(__name__)
+    job_queue = JobQueue(app)
+    user_office_link = DummyUserOfficeLink()
+
+    with app.app_context():
+        job = job_queue.submit("user_office_sync", user_office_link.sync_all)
+    job = job_queue.wait(job["id"], timeout=5)
+
+    assert job["status"] == JOB_FINISHED
+    assert job["error"] is None
+    assert synced_links == [user_office_link]
+    assert job_queue.get("unknown") is None
+
+
+def test_job_queue_failed_job():
+    def failing_job():
+        raise RuntimeError("User office not available")
+
+    app = Flask(__name__)
+    job_queue = JobQueue(app)
+    job = job_queue.submit("failing", failing_job, app=app)
+    job = job_queue.wait(job["id"], timeout=5)
+
+    assert job["status"] == JOB_FAILED
+    assert job["error"] == "User office not available"
+
+
+def test_job_queue_schedule():
+    app = Flask(__name__)
+    job_queue = JobQueue(app)
+    calls = []
+
+    job_queue.schedule("periodic", 0.05, lambda: calls.append(1), app)
+    time.sleep(0.3)
+    job_queue.unschedule("periodic")
+
+    assert len(calls) >= 2
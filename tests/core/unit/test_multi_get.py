@@ -0,0 +1,19 @@
+import pytest
+
+from app.extensions.flask_sqlalchemy import multi_get
+from ispyb_core import models
+
+
+def test_parse_ids():
+    id_name, id_attribute = multi_get.get_id_attribute(models.Proposal)
+    assert id_name == "proposalId"
+
+    assert multi_get.parse_ids("3, 1,3", id_attribute) == [3, 1]
+    assert multi_get.parse_ids([2, "4"], id_attribute) == [2, 4]
+
+    with pytest.raises(ValueError):
+        multi_get.parse_ids("1,a", id_attribute)
+    with pytest.raises(ValueError):
+        multi_get.parse_ids("", id_attribute)
+    with pytest.raises(ValueError):
+        multi_get.parse_ids("1,2,3", id_attribute, max_ids=2)
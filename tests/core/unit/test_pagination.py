@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import Session
+
+from app.extensions.flask_sqlalchemy import pagination
+
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "Item"
+
+    itemId = Column(Integer, primary_key=True)
+    startTime = Column(DateTime)
+
+
+def test_cursor_round_trip():
+    keyset_columns = pagination.get_keyset_columns(Item, "startTime")
+    values = [datetime(2020, 1, 2, 3, 4, 5), 42]
+
+    cursor = pagination.encode_cursor(values)
+
+    assert [name for name, _, _ in keyset_columns] == ["startTime", "itemId"]
+    assert pagination.decode_cursor(cursor, keyset_columns) == values
+
+
+def test_invalid_cursor():
+    keyset_columns = pagination.get_keyset_columns(Item)
+
+    for cursor in ("not a cursor", pagination.encode_cursor([1, 2])):
+        try:
+            pagination.decode_cursor(cursor, keyset_columns)
+            assert False, "Cursor %s accepted" % cursor
+        except ValueError:
+            pass
+
+
+def test_malformed_cursor():
+    keyset_columns = pagination.get_keyset_columns(Item, "startTime")
+
+    for values in ([[1], 1], [{"a": 1}, 1], [1, 1], ["2020-01-02", [1]]):
+        try:
+            pagination.decode_cursor(pagination.encode_cursor(values), keyset_columns)
+            assert False, "Cursor values %s accepted" % values
+        except ValueError:
+            pass
+
+
+def test_next_cursor():
+    keyset_columns = pagination.get_keyset_columns(Item)
+    items = [Item(itemId=1), Item(itemId=2)]
+
+    assert pagination.get_next_cursor(items, keyset_columns, 3) is None
+    cursor = pagination.get_next_cursor(items, keyset_columns, 2)
+    assert pagination.decode_cursor(cursor, keyset_columns) == [2]
+
+
+def test_keyset_null_values():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(bind=engine)
+    start_times = [None, datetime(2020, 1, 2), None, datetime(2020, 1, 1), None]
+    for item_id, start_time in enumerate(start_times, 1):
+        session.add(Item(itemId=item_id, startTime=start_time))
+    session.flush()
+
+    for descending in (False, True):
+        keyset_columns = pagination.get_keyset_columns(Item, "startTime", descending)
+        expected_ids = [
+            item.itemId
+            for item in pagination.apply_keyset(session.query(Item), keyset_columns)
+        ]
+        item_ids = []
+        cursor_values = None
+        while True:
+            query = pagination.apply_keyset(
+                session.query(Item), keyset_columns, cursor_values
+            )
+            items = query.limit(2).all()
+            item_ids.extend(item.itemId for item in items)
+            cursor = pagination.get_next_cursor(items, keyset_columns, 2)
+            if cursor is None:
+                break
+            cursor_values = pagination.decode_cursor(cursor, keyset_columns)
+
+        assert item_ids == expected_ids
+        assert sorted(item_ids) == [1, 2, 3, 4, 5]
+
+
+def test_parse_order_by():
+    dict_schema = {"itemId": None, "startTime": None, "comments": None}
+    sort_keys = frozenset(["itemId", "startTime"])
+
+    assert pagination.parse_order_by(None, dict_schema, sort_keys) == (None, False)
+    assert pagination.parse_order_by("-startTime", dict_schema, sort_keys) == (
+        "startTime",
+        True,
+    )
+
+    for order_by in ("comments", "unknown", "startTime,itemId"):
+        try:
+            pagination.parse_order_by(order_by, dict_schema, sort_keys)
+            assert False, "order_by %s accepted" % order_by
+        except ValueError:
+            pass
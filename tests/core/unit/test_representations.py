@@ -0,0 +1,22 @@
+import json
+import datetime
+import decimal
+
+from app.extensions.api import representations
+
+
+def test_json_serializers():
+    data = {
+        "startTime": datetime.datetime(2020, 1, 1, 12, 30),
+        "resolution": decimal.Decimal("1.5"),
+        "rows": [1, "a", None],
+    }
+    expected = {
+        "startTime": "2020-01-01T12:30:00",
+        "resolution": 1.5,
+        "rows": [1, "a", None],
+    }
+
+    for name in ("json", "orjson"):
+        serializer = representations.get_json_serializer(name)
+        assert json.loads(serializer(data)) == expected
@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from ispyb_core import schemas
+
+
+def test_get_json_schema():
+    assert "crystal" in schemas.get_schema_names()
+
+    json_schema = schemas.get_json_schema("crystal")
+    assert "CrystalSchema" in json_schema["definitions"]
+    assert schemas.get_json_schema("crystal") is json_schema
+
+    with pytest.raises(ValueError):
+        schemas.get_json_schema("models")
+
+
+def test_get_serialized_json_schema():
+    assert isinstance(schemas.get_schema_names(), tuple)
+
+    body, etag = schemas.get_serialized_json_schema("crystal")
+    assert json.loads(body) == schemas.get_json_schema("crystal")
+    assert schemas.get_serialized_json_schema("crystal") == (body, etag)
+
+    body, etag = schemas.get_serialized_schema_names()
+    assert json.loads(body) == list(schemas.get_schema_names())
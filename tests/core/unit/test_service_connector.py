@@ -0,0 +1,69 @@
+import asyncio
+
+from flask import Flask
+
+import ispyb_service_connector
+
+
+def test_service_connector_cache(monkeypatch):
+    requests = []
+
+    def request_service(service_name, path, params=None):
+        requests.append((path, params))
+        if path == "/schemas/available_names":
+            return 200, ["crystal"]
+        if params:
+            ids = params["crystalId__in"].split(",")
+            rows = [{"crystalId": int(crystal_id)} for crystal_id in ids]
+            return 200, {"data": {"total": len(rows), "rows": rows}}
+        return 200, {"crystalId": int(path.rsplit("/", 1)[-1])}
+
+    monkeypatch.setattr(ispyb_service_connector, "request_service", request_service)
+    ispyb_service_connector._availability_cache.clear()
+    ispyb_service_connector._resource_cache.clear()
+
+    app = Flask(__name__)
+    with app.app_context():
+        for _ in range(3):
+            status_code, data = ispyb_service_connector.get_ispyb_resource(
+                "ispyb_core", "/samples/crystals/1"
+            )
+            assert status_code == 200
+            assert data == {"crystalId": 1}
+        assert len(requests) == 2
+
+        status_code, crystals = ispyb_service_connector.get_ispyb_resources(
+            "ispyb_core", "/samples/crystals", "crystalId", [1, 2, 3]
+        )
+        assert status_code == 200
+        assert sorted(crystals) == [1, 2, 3]
+        assert requests[-1] == (
+            "/samples/crystals",
+            {"crystalId__in": "2,3", "limit": 2},
+        )
+
+        ispyb_service_connector.get_ispyb_resource("ispyb_core", "/samples/crystals/3")
+        assert len(requests) == 3
+
+
+def test_service_connector_async(monkeypatch):
+    def request_service(service_name, path, params=None):
+        if path == "/schemas/available_names":
+            return 200, ["crystal"]
+        return 200, {"crystalId": int(path.rsplit("/", 1)[-1])}
+
+    monkeypatch.setattr(ispyb_service_connector, "request_service", request_service)
+    ispyb_service_connector._availability_cache.clear()
+    ispyb_service_connector._resource_cache.clear()
+
+    async def get_crystals(app):
+        return await ispyb_service_connector.gather_ispyb_resources(
+            "ispyb_core",
+            ["/samples/crystals/%d" % index for index in range(1, 4)],
+            app=app,
+        )
+
+    app = Flask(__name__)
+    results = asyncio.run(get_crystals(app))
+
+    assert results == [(200, {"crystalId": index}) for index in range(1, 4)]
@@ -0,0 +1,54 @@
+from ispyb_core.modules import user_office
+
+
+def test_diff_items():
+    items_by_key = {
+        ("MX", "1"): {"proposalCode": "MX", "proposalNumber": "1", "title": "A"},
+        ("MX", "2"): {"proposalCode": "MX", "proposalNumber": "2", "title": "B"},
+        ("MX", "3"): {"proposalCode": "MX", "proposalNumber": "3", "title": "C"},
+    }
+    existing_rows = {
+        ("MX", "1"): {
+            "proposalId": 1,
+            "proposalCode": "MX",
+            "proposalNumber": "1",
+            "title": "A",
+        },
+        ("MX", "2"): {
+            "proposalId": 2,
+            "proposalCode": "MX",
+            "proposalNumber": "2",
+            "title": "Old",
+        },
+    }
+
+    new_items, modified_items = user_office.diff_items(
+        items_by_key, existing_rows, "proposalId"
+    )
+
+    assert [item["proposalNumber"] for item in new_items] == ["3"]
+    assert modified_items == [
+        {"proposalCode": "MX", "proposalNumber": "2", "title": "B", "proposalId": 2}
+    ]
+
+
+def test_diff_items_none_values():
+    items_by_key = {
+        ("MX", "1"): {"proposalCode": "MX", "proposalNumber": "1", "title": None},
+        ("MX", "2"): {"proposalCode": "MX", "proposalNumber": "2", "title": None},
+    }
+    existing_rows = {
+        ("MX", "1"): {
+            "proposalId": 1,
+            "proposalCode": "MX",
+            "proposalNumber": "1",
+            "title": "A",
+        },
+    }
+
+    new_items, modified_items = user_office.diff_items(
+        items_by_key, existing_rows, "proposalId"
+    )
+
+    assert new_items == [{"proposalCode": "MX", "proposalNumber": "2", "title": None}]
+    assert modified_items == []
@@ -19,6 +19,8 @@
 #  along with py-ispyb. If not, see <http://www.gnu.org/licenses/>.
 
 
+import json
+
 from tests.ssx.data import sample_delivery_device_list
 
 
@@ -43,3 +45,19 @@ def test_sample_delivery_devices(ispyb_ssx_app, ispyb_ssx_token):
         assert response.json
         assert response.json["type"] == sample_deliver_device["type"]
         assert response.content_type == mimetype
+
+
+def test_sample_delivery_devices_ndjson(ispyb_ssx_app, ispyb_ssx_token):
+    client = ispyb_ssx_app.test_client()
+    route = ispyb_ssx_app.config["API_ROOT"] + "/samples/delivery_devices"
+    headers = {
+        "Authorization": "Bearer " + ispyb_ssx_token,
+        "Accept": "application/x-ndjson",
+    }
+
+    response = client.get(route, headers=headers)
+    assert response.status_code == 200, "Wrong status code"
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines, "No data returned"
+    assert all(json.loads(line)["type"] for line in lines)